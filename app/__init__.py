@@ -2,25 +2,36 @@ from flask import Flask
 from dotenv import load_dotenv
 
 from .extensions import db, ma, limiter, cache
+from .cli import deploy_db_command, migrate_cli
+from .dbpool import configure_pool
+from .ratelimit import init_ratelimit
+from .replicas import init_replicas
+from .serialization import FastJSONProvider
 from .blueprints.customers import customers_bp
 from .blueprints.mechanics import mechanics_bp
 from .blueprints.service_tickets import service_tickets_bp
 from .blueprints.inventory import inventory_bp
 
-from flask_swagger_ui import get_swaggerui_blueprint
-
 # Swagger UI config
 SWAGGER_URL = "/api/docs"           # URL where Swagger UI will be served
 API_URL = "/static/swagger.yaml"    # Path to swagger.yaml (inside app/static)
 
 
-swaggerui_blueprint = get_swaggerui_blueprint(
-    SWAGGER_URL,
-    API_URL,
-    config={
-        "app_name": "Mechanic Shop Advanced API"
-    },
-)
+def register_api_docs(app):
+    """
+    Register the Swagger UI blueprint. Imported here, so apps built with
+    API_DOCS_ENABLED off (tests, benchmarks) never load it.
+    """
+    from flask_swagger_ui import get_swaggerui_blueprint
+
+    swaggerui_blueprint = get_swaggerui_blueprint(
+        SWAGGER_URL,
+        API_URL,
+        config={
+            "app_name": "Mechanic Shop Advanced API"
+        },
+    )
+    app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
 
 
 def create_app(config_name: str = "DevelopmentConfig"):
@@ -32,22 +43,36 @@ def create_app(config_name: str = "DevelopmentConfig"):
     load_dotenv()
 
     app = Flask(__name__)
+    # orjson-backed jsonify / request.get_json (see app/serialization.py)
+    app.json = FastJSONProvider(app)
 
     # Load configuration from config.py (DevelopmentConfig, TestingConfig, ProductionConfig)
     app.config.from_object(f"config.{config_name}")
 
+    # Pool with checkout wait / churn counters (see app/dbpool.py)
+    configure_pool(app)
+    # Read replicas as extra binds + per-request routing (REPLICA_DATABASE_URIS)
+    init_replicas(app)
+
     # Initialize extensions with this app
     db.init_app(app)
     ma.init_app(app)
-    limiter.init_app(app)
+    init_ratelimit(app, limiter)  # limiter.init_app + check timing
     cache.init_app(app)
+    # `flask db ...`; Flask-Migrate / Alembic are imported only when it runs
+    app.cli.add_command(migrate_cli)
+    app.cli.add_command(deploy_db_command)
 
-    # Import models so db.create_all() can see them
+    # Import models so migrations (and the tests' db.create_all()) can see them
     from . import models  # noqa: F401
+    # Registers the commit hooks that invalidate tagged cache entries
+    from . import caching  # noqa: F401
+    # Registers the flush hooks that keep Mechanic.ticket_count in sync
+    from . import ticket_counts  # noqa: F401
+    # Registers the full-text search DDL (FTS5 / tsvector) with create_all
+    from . import search  # noqa: F401
 
-    # Ensure tables exist in the current database
-    with app.app_context():
-        db.create_all()
+    # Tables are no longer created here: run `flask db upgrade` (see README)
 
     # Register blueprints for API resources
     app.register_blueprint(customers_bp, url_prefix="/customers")
@@ -55,7 +80,14 @@ def create_app(config_name: str = "DevelopmentConfig"):
     app.register_blueprint(service_tickets_bp, url_prefix="/service-tickets")
     app.register_blueprint(inventory_bp, url_prefix="/inventory")
 
+    # Opt-in request timing / SQL metrics (INSTRUMENTATION_ENABLED)
+    if app.config.get("INSTRUMENTATION_ENABLED"):
+        from .instrumentation import init_instrumentation
+
+        init_instrumentation(app)
+
     # Register Swagger UI blueprint
-    app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
+    if app.config.get("API_DOCS_ENABLED", True):
+        register_api_docs(app)
 
     return app
@@ -0,0 +1,218 @@
+import asyncio
+import io
+import sys
+
+from a2wsgi import WSGIMiddleware
+from flask import request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.exceptions import HTTPException
+
+from app import create_app
+from app.extensions import db
+from app.streaming import wants_stream
+
+# ASGI entry point (asgi_app.py, served by uvicorn). GET/HEAD endpoints with
+# an @async_view twin run as coroutines on SQLAlchemy's asyncio engine
+# (aiosqlite / asyncpg), so a worker keeps serving other requests while they
+# wait on the database. Everything else, streamed exports included, is
+# handed to the regular Flask app on a thread pool (ASGI_SYNC_THREADS).
+# Async views still go through the Flask request hooks: rate limits, ETags /
+# caching, instrumentation. Those talk to blocking backends (rate limit
+# storage, cache, replica health checks), so they run on worker threads
+# (asyncio.to_thread), never on the event loop; the request context travels
+# along in the contextvars.
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+_async_views = {}
+
+
+def async_view(endpoint: str):
+    """
+    Register an async implementation of the Flask view `endpoint` for
+    GET/HEAD. It is called as view(session, **view_args) with an AsyncSession.
+    """
+
+    def decorator(f):
+        _async_views[endpoint] = f
+        return f
+
+    return decorator
+
+
+def async_engine_url(url):
+    """
+    The asyncio driver URL for a database URL (sqlite -> aiosqlite,
+    postgresql -> asyncpg).
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "postgres":
+        backend = "postgresql"
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def async_engine_options(options: dict, url) -> dict:
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the asyncio engine: same pool profile,
+    connect_args translated to asyncpg's names.
+    """
+    options = {key: value for key, value in (options or {}).items() if key != "poolclass"}
+    connect_args = dict(options.pop("connect_args", {}))
+
+    if url.get_backend_name() == "postgresql":
+        server_settings = {}
+        if "application_name" in connect_args:
+            server_settings["application_name"] = connect_args.pop("application_name")
+        # libpq "-c name=value" options become server settings
+        for setting in connect_args.pop("options", "").split("-c")[1:]:
+            name, _, value = setting.strip().partition("=")
+            server_settings[name] = value
+        if "connect_timeout" in connect_args:
+            connect_args["timeout"] = connect_args.pop("connect_timeout")
+        connect_args["server_settings"] = server_settings
+
+    options["connect_args"] = connect_args
+    return options
+
+
+def _environ(scope) -> dict:
+    """
+    A WSGI environ for an ASGI http scope without a body (GET/HEAD).
+    """
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf8").decode("latin1"),
+        "PATH_INFO": scope["path"].encode("utf8").decode("latin1"),
+        "QUERY_STRING": scope["query_string"].decode("latin1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "REMOTE_ADDR": client[0],
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(b""),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin1")
+        if name == "content-type":
+            key = "CONTENT_TYPE"
+        elif name == "content-length":
+            key = "CONTENT_LENGTH"
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        value = value.decode("latin1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class AsyncApp:
+    """
+    ASGI application around a Flask app: async views where registered,
+    the Flask app (on a thread pool) for everything else.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(flask_app, workers=flask_app.config["ASGI_SYNC_THREADS"])
+        self.views = dict(_async_views)
+
+        with flask_app.app_context():
+            # Resolved by Flask-SQLAlchemy (relative SQLite paths -> instance folder)
+            url = async_engine_url(db.engine.url)
+        self.engine = create_async_engine(
+            url, **async_engine_options(flask_app.config.get("SQLALCHEMY_ENGINE_OPTIONS"), url)
+        )
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        if scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+            response = await self._dispatch(scope)
+            if response is not None:
+                await self._send(scope, response, send)
+                return
+
+        await self.wsgi(scope, receive, send)
+
+    def _match(self, environ):
+        try:
+            endpoint, _ = self.flask_app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            return None
+        return self.views.get(endpoint)
+
+    async def _dispatch(self, scope):
+        """
+        Run the async view for this request like Flask's full_dispatch_request
+        would. None when there is none (or a stream was asked for).
+        """
+        environ = _environ(scope)
+        view = self._match(environ)
+        if view is None:
+            return None
+
+        app = self.flask_app
+        ctx = app.request_context(environ)
+        ctx.push()
+        error = None
+        try:
+            if wants_stream():
+                return None
+            try:
+                rv = await asyncio.to_thread(app.preprocess_request)
+                if rv is None:
+                    async with self.sessionmaker() as session:
+                        rv = await view(session, **request.view_args)
+            except Exception as e:
+                rv = app.handle_user_exception(e)
+            return await asyncio.to_thread(app.finalize_request, rv)
+        except Exception as e:
+            error = e
+            return app.handle_exception(e)
+        finally:
+            ctx.pop(error)
+
+    async def _send(self, scope, response, send):
+        headers = [
+            (name.lower().encode("latin1"), value.encode("latin1"))
+            for name, value in response.headers.items()
+        ]
+        body = b"" if scope["method"] == "HEAD" else response.get_data()
+        await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+        response.close()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_asgi_app(config_name: str = "DevelopmentConfig"):
+    """
+    ASGI application factory: create_app(config_name) plus the async views.
+    """
+    # Register the @async_view twins of the read-heavy GET views
+    from app.blueprints.inventory import async_routes as _inventory  # noqa: F401
+    from app.blueprints.mechanics import async_routes as _mechanics  # noqa: F401
+    from app.blueprints.service_tickets import async_routes as _tickets  # noqa: F401
+
+    return AsyncApp(create_app(config_name))
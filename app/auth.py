@@ -1,16 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from functools import wraps
 
-from flask import request, jsonify, current_app
-from jose import jwt, JWTError
+from flask import request, jsonify, current_app, has_app_context
+from sqlalchemy import event, select
 
+from .extensions import db
 from .models import Customer
 
 
+class TTLCache:
+    """
+    Small thread-safe LRU cache where every entry also has a deadline
+    (unix time). Expired entries are treated as missing.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, deadline = entry
+            if deadline <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, deadline: float = None):
+        expires = time.time() + self.ttl
+        if deadline is not None:
+            expires = min(expires, deadline)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def _auth_caches() -> dict:
+    """
+    Per-app caches used by token_required:
+    - "tokens": raw token -> customer_id (skips jwt.decode for repeat tokens)
+    - "customers": customer_id -> True (skips the existence lookup)
+    """
+    caches = current_app.extensions.get("auth_cache")
+    if caches is None:
+        size = current_app.config.get("AUTH_CACHE_SIZE", 1024)
+        ttl = current_app.config.get("AUTH_CACHE_TTL", 60)
+        caches = {"tokens": TTLCache(size, ttl), "customers": TTLCache(size, ttl)}
+        current_app.extensions["auth_cache"] = caches
+    return caches
+
+
+@event.listens_for(Customer, "after_delete")
+def _forget_deleted_customer(mapper, connection, target):
+    # Deleted customers must stop authenticating right away.
+    # (Bulk query.delete() bypasses ORM events; lookups then expire with AUTH_CACHE_TTL.)
+    if has_app_context():
+        _auth_caches()["customers"].discard(target.id)
+
+
 def encode_token(customer_id: int) -> str:
     """
     Encode a JWT token specific to a customer_id.
     """
+    # python-jose (and its crypto backends) load on first use, not at boot
+    from jose import jwt
+
     secret = current_app.config["SECRET_KEY"]
     algorithm = current_app.config.get("JWT_ALGORITHM", "HS256")
     minutes = current_app.config.get("JWT_EXPIRE_MINUTES", 60)
@@ -29,6 +102,11 @@ def token_required(f):
     """
     Decorator that validates Bearer token and injects customer_id
     into the route function: def my_route(customer_id, ...).
+
+    Verified tokens and "customer exists" results are cached per app
+    (AUTH_CACHE_SIZE / AUTH_CACHE_TTL), so repeat calls skip both the
+    signature check and the DB round trip. With JWT_TRUST_CLAIMS the
+    signed customer_id is trusted and the DB is never consulted.
     """
 
     @wraps(f)
@@ -39,20 +117,31 @@ def token_required(f):
             return jsonify({"error": "Authorization header missing or invalid"}), 401
 
         token = auth_header.split(" ", 1)[1]
-        secret = current_app.config["SECRET_KEY"]
-        algorithm = current_app.config.get("JWT_ALGORITHM", "HS256")
-
-        try:
-            payload = jwt.decode(token, secret, algorithms=[algorithm])
-            customer_id = payload.get("customer_id")
-            if not customer_id:
-                return jsonify({"error": "Token missing customer_id"}), 401
-        except JWTError:
-            return jsonify({"error": "Invalid or expired token"}), 401
-
-        customer = Customer.query.get(customer_id)
-        if not customer:
-            return jsonify({"error": "Customer not found"}), 404
+        caches = _auth_caches()
+
+        customer_id = caches["tokens"].get(token)
+        if customer_id is None:
+            secret = current_app.config["SECRET_KEY"]
+            algorithm = current_app.config.get("JWT_ALGORITHM", "HS256")
+            from jose import jwt, JWTError
+
+            try:
+                payload = jwt.decode(token, secret, algorithms=[algorithm])
+                customer_id = payload.get("customer_id")
+                if not customer_id:
+                    return jsonify({"error": "Token missing customer_id"}), 401
+            except JWTError:
+                return jsonify({"error": "Invalid or expired token"}), 401
+
+            # Never cache a token past its own expiry
+            caches["tokens"].set(token, customer_id, deadline=payload.get("exp"))
+
+        if not current_app.config.get("JWT_TRUST_CLAIMS", False):
+            if not caches["customers"].get(customer_id):
+                query = select(Customer.id).where(Customer.id == customer_id)
+                if db.session.execute(query).first() is None:
+                    return jsonify({"error": "Customer not found"}), 404
+                caches["customers"].set(customer_id, True)
 
         return f(customer_id=customer_id, *args, **kwargs)
 
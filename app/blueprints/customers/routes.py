@@ -4,9 +4,22 @@ from sqlalchemy import select
 
 from app.extensions import db, limiter
 from app.auth import encode_token, token_required
+from app.bulk import BulkError, bulk_insert, bulk_payload
+from app.caching import cached_view, etag_view
+from app.costs import COST_TAGS, cost_row, costs_cache_disabled, customer_spend
 from app.models import Customer, ServiceTicket
+from app.loading import ticket_list_options
+from app.pagination import PaginationError, keyset_paginate, wants_cursor_page
+from app.passwords import (
+    PasswordPoolBusy,
+    hash_password,
+    hash_passwords,
+    password_needs_rehash,
+    verify_password,
+)
 from . import customers_bp
-from .schemas import customer_schema, customers_schema, login_schema
+from .schemas import customer_schema, customers_bulk_schema, customers_schema, login_schema
+from app.blueprints.service_tickets.filters import TicketQueryError, limit_arg, ticket_filters
 from app.blueprints.service_tickets.schemas import service_tickets_schema
 
 
@@ -28,15 +41,71 @@ def create_customer():
     if existing:
         return jsonify({"error": "Email already registered"}), 400
 
-    customer = Customer(name=name, email=email, password=password)
+    try:
+        password_hash = hash_password(password)
+    except PasswordPoolBusy:
+        return jsonify({"error": "Server busy, try again shortly"}), 503
+
+    customer = Customer(name=name, email=email, password=password_hash)
     db.session.add(customer)
     db.session.commit()
     return customer_schema.jsonify(customer), 201
 
 
+# BULK CREATE CUSTOMERS
+# POST a JSON array. All-or-nothing: errors are reported per array index
+@customers_bp.route("/bulk", methods=["POST"])
+def create_customers_bulk():
+    try:
+        items = bulk_payload()
+    except BulkError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Types and formats per item (e.g. an email that isn't a string or isn't
+    # an address), then duplicates among the rows that passed
+    try:
+        rows = customers_bulk_schema.load(items)
+        errors = {}
+    except ValidationError as e:
+        rows, errors = e.valid_data, dict(e.messages)
+
+    emails = set()
+    for index, row in enumerate(rows):
+        if index in errors:
+            continue
+        if row["email"] in emails:
+            errors[index] = "Duplicate email in request"
+        emails.add(row["email"])
+
+    # One IN query for every email that's already registered
+    taken = set(db.session.scalars(select(Customer.email).where(Customer.email.in_(emails))))
+    for index, row in enumerate(rows):
+        if index not in errors and row["email"] in taken:
+            errors[index] = "Email already registered"
+
+    if errors:
+        return jsonify({"errors": errors}), 400
+
+    # KDF runs in parallel on the hashing pool
+    for row, password_hash in zip(rows, hash_passwords([r["password"] for r in rows])):
+        row["password"] = password_hash
+
+    ids = bulk_insert(Customer, rows)
+    return jsonify({"created": len(ids), "ids": ids}), 201
+
+
 # GET CUSTOMERS (with pagination)
+# ?page=&per_page= for classic pages, ?after=<cursor>&limit=N for keyset pages
 @customers_bp.route("/", methods=["GET"])
+@etag_view("customers")  # 304 when nothing changed
 def get_customers():
+    if wants_cursor_page():
+        try:
+            result = keyset_paginate(select(Customer), Customer.id, customers_schema)
+        except PaginationError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(result), 200
+
     try:
         page = int(request.args.get("page", 1))
         per_page = int(request.args.get("per_page", 5))
@@ -69,9 +138,19 @@ def login():
     password = data["password"]
 
     customer = Customer.query.filter_by(email=email).first()
-    if not customer or customer.password != password:
+    try:
+        # Unknown email: still runs the KDF (dummy hash), same timing as a wrong password
+        valid = verify_password(customer.password if customer else None, password)
+        if valid and password_needs_rehash(customer.password):
+            # Plain-text row or PASSWORD_HASH_METHOD changed: upgrade it now
+            customer.password = hash_password(password)
+            db.session.commit()
+    except PasswordPoolBusy:
+        return jsonify({"error": "Server busy, try again shortly"}), 503
+
+    if not valid:
         return jsonify({"error": "Invalid email or password"}), 401
- 
+
     token = encode_token(customer.id)
 
     response = {
@@ -86,7 +165,29 @@ def login():
 # AUTH-PROTECTED: GET MY TICKETS
 @customers_bp.route("/my-tickets", methods=["GET"])
 @token_required
+@etag_view("service_tickets")
 def my_tickets(customer_id):
-    query = select(ServiceTicket).where(ServiceTicket.customer_id == customer_id)
+    query = (
+        select(ServiceTicket)
+        .where(ServiceTicket.customer_id == customer_id)
+        .options(*ticket_list_options())
+    )
     tickets = db.session.execute(query).scalars().all()
     return service_tickets_schema.jsonify(tickets), 200
+
+
+# CUSTOMER SPEND: parts total of each customer's tickets, biggest first
+# Takes the GET /service-tickets/ filters (e.g. created_after / created_before,
+# customer_id for one customer) and ?limit=N
+@customers_bp.route("/spend", methods=["GET"])
+@etag_view(*COST_TAGS, "customers")
+@cached_view(*COST_TAGS, "customers", timeout=300, unless=costs_cache_disabled)
+def get_customer_spend():
+    try:
+        filters = ticket_filters(request.args)
+        limit = limit_arg(request.args)
+    except TicketQueryError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rows = db.session.execute(customer_spend(filters).limit(limit))
+    return jsonify([cost_row(row) for row in rows]), 200
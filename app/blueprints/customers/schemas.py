@@ -1,10 +1,14 @@
 # app/blueprints/customers/schemas.py
 
+from marshmallow import validate
+from marshmallow_sqlalchemy import auto_field
+
 from app.extensions import ma
+from app.instrumentation import TimedSchema
 from app.models import Customer
 
 
-class CustomerSchema(ma.SQLAlchemyAutoSchema):
+class CustomerSchema(TimedSchema):
     class Meta:
         model = Customer
         load_instance = True
@@ -16,6 +20,25 @@ customer_schema = CustomerSchema()
 customers_schema = CustomerSchema(many=True)
 
 
+class CustomerBulkSchema(TimedSchema):
+    """
+    Rows for POST /customers/bulk: plain dicts including the password
+    (hashed before the insert).
+    """
+
+    class Meta:
+        model = Customer
+        load_instance = False
+        fields = ("name", "email", "password")
+
+    name = auto_field(validate=validate.Length(min=1))
+    email = auto_field(validate=validate.Email())
+    password = auto_field(load_only=True, validate=validate.Length(min=1))
+
+
+customers_bulk_schema = CustomerBulkSchema(many=True)
+
+
 class LoginSchema(ma.Schema):
     email = ma.Email(required=True)
     password = ma.String(required=True)
@@ -0,0 +1,27 @@
+from sqlalchemy import select
+
+from app.asgi import async_view
+from app.caching import etag_view
+from app.models import Inventory
+from app.pagination import collection_response_async
+from .routes import inventory_item_response
+from .schemas import inventory_list_schema
+
+# Async twins of the read-heavy GET views in routes.py, served by the ASGI
+# entry point (app/asgi.py). Same URLs, same responses: the query and
+# response helpers are shared, only the database calls are awaited.
+
+
+# GET ALL INVENTORY
+@async_view("inventory_bp.get_inventory")
+@etag_view("inventory")
+async def get_inventory(session):
+    return await collection_response_async(
+        session, select(Inventory), Inventory.id, inventory_list_schema
+    )
+
+
+# GET SINGLE INVENTORY ITEM (ETag = row version, as in routes.py)
+@async_view("inventory_bp.get_inventory_item")
+async def get_inventory_item(session, item_id):
+    return inventory_item_response(await session.get(Inventory, item_id))
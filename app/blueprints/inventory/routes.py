@@ -1,11 +1,18 @@
 from flask import request, jsonify
 from marshmallow import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.extensions import db
 from app.auth import token_required
+from app.bulk import BulkError, bulk_insert, bulk_payload
+from app.caching import etag_view
+from app.concurrency import if_match_fails, precondition_failed, with_version
 from app.models import Inventory
+from app.pagination import collection_response
+from app.streaming import stream_collection, wants_stream
 from . import inventory_bp
-from .schemas import inventory_schema, inventory_list_schema
+from .schemas import inventory_schema, inventory_list_schema, inventory_bulk_schema
 
 
 # CREATE INVENTORY ITEM
@@ -24,23 +31,53 @@ def create_inventory_item(customer_id):
     return inventory_schema.jsonify(item), 201
 
 
-# GET ALL INVENTORY
+# BULK CREATE INVENTORY ITEMS (e.g. a whole parts catalog)
+# POST a JSON array. All-or-nothing: errors are reported per array index
+@inventory_bp.route("/bulk", methods=["POST"])
+@token_required
+def create_inventory_bulk(customer_id):
+    try:
+        rows = inventory_bulk_schema.load(bulk_payload())
+    except BulkError as e:
+        return jsonify({"error": str(e)}), 400
+    except ValidationError as e:
+        return jsonify({"errors": e.messages}), 400
+
+    ids = bulk_insert(Inventory, rows)
+    return jsonify({"created": len(ids), "ids": ids}), 201
+
+
+# GET ALL INVENTORY (?after=<cursor>&limit=N for keyset pages)
+# ?stream=true or Accept: application/x-ndjson streams the full export
 @inventory_bp.route("/", methods=["GET"])
+@etag_view("inventory")  # 304 when nothing changed
 def get_inventory():
-    items = Inventory.query.all()
-    return inventory_list_schema.jsonify(items), 200
+    if wants_stream():
+        return stream_collection(select(Inventory).order_by(Inventory.id), inventory_list_schema)
+
+    return collection_response(select(Inventory), Inventory.id, inventory_list_schema)
+
+
+def inventory_item_response(item):
+    """
+    GET response for one item (or None), tagged with its row version.
+    Shared with the async view in async_routes.py.
+    """
+    if not item:
+        return jsonify({"error": "Inventory item not found"}), 404
+    response = with_version((inventory_schema.jsonify(item), 200), item.version_id)
+    return response.make_conditional(request)
 
 
 # GET SINGLE INVENTORY ITEM
+# The ETag is the row version (what If-Match on PUT expects); If-None-Match -> 304
 @inventory_bp.route("/<int:item_id>", methods=["GET"])
 def get_inventory_item(item_id):
-    item = db.session.get(Inventory, item_id)
-    if not item:
-        return jsonify({"error": "Inventory item not found"}), 404
-    return inventory_schema.jsonify(item), 200
+    return inventory_item_response(db.session.get(Inventory, item_id))
 
 
 # UPDATE INVENTORY ITEM
+# Optimistic concurrency: If-Match: "<version>" (the ETag), 412 if it changed
 @inventory_bp.route("/<int:item_id>", methods=["PUT"])
 @token_required
 def update_inventory_item(customer_id, item_id):
@@ -48,6 +85,9 @@ def update_inventory_item(customer_id, item_id):
     if not item:
         return jsonify({"error": "Inventory item not found"}), 404
 
+    if if_match_fails(item.version_id):
+        return precondition_failed("Inventory item was modified", item.version_id)
+
     json_data = request.get_json() or {}
 
     try:
@@ -55,11 +95,16 @@ def update_inventory_item(customer_id, item_id):
     except ValidationError as e:
         return jsonify(e.messages), 400
 
-    db.session.commit()
-    return inventory_schema.jsonify(item), 200
+    try:
+        db.session.commit()
+    except StaleDataError:
+        # Another request (or an add-part taking stock) committed in between
+        db.session.rollback()
+        return precondition_failed("Inventory item was modified")
+    return with_version((inventory_schema.jsonify(item), 200), item.version_id)
 
 
-# DELETE INVENTORY ITEM
+# DELETE INVENTORY ITEM (If-Match as for updates)
 @inventory_bp.route("/<int:item_id>", methods=["DELETE"])
 @token_required
 def delete_inventory_item(customer_id, item_id):
@@ -67,6 +112,14 @@ def delete_inventory_item(customer_id, item_id):
     if not item:
         return jsonify({"error": "Inventory item not found"}), 404
 
+    if if_match_fails(item.version_id):
+        return precondition_failed("Inventory item was modified", item.version_id)
+
     db.session.delete(item)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except StaleDataError:
+        # Changed or deleted by another request since we read it
+        db.session.rollback()
+        return precondition_failed("Inventory item was modified")
     return jsonify({"message": f"Inventory item {item_id} deleted"}), 200
@@ -1,12 +1,22 @@
-from app.extensions import ma
+from marshmallow import validate
+from marshmallow_sqlalchemy import auto_field
+
+from app.instrumentation import TimedSchema
 from app.models import Inventory
 
 
-class InventorySchema(ma.SQLAlchemyAutoSchema):
+class InventorySchema(TimedSchema):
     class Meta:
         model = Inventory
         load_instance = True
+        # Served as the ETag instead (app/concurrency.py)
+        exclude = ("version_id",)
+
+    # Units on hand (null = not tracked); add-part takes from it
+    stock = auto_field(validate=validate.Range(min=0))
 
 
 inventory_schema = InventorySchema()
 inventory_list_schema = InventorySchema(many=True)
+# Loads plain dicts for bulk inserts instead of one model instance per row
+inventory_bulk_schema = InventorySchema(many=True, load_instance=False)
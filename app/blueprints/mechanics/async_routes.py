@@ -0,0 +1,34 @@
+from flask import jsonify, request
+from sqlalchemy import select
+
+from app.asgi import async_view
+from app.caching import cached_view, etag_view
+from app.models import Mechanic
+from app.pagination import collection_response_async
+from app.blueprints.service_tickets.filters import TicketQueryError
+from .routes import ticket_count_query, ticket_count_rows
+from .schemas import mechanics_schema
+
+# Async twins of the read-heavy GET views in routes.py, served by the ASGI
+# entry point (app/asgi.py). Same URLs, same responses: the query and
+# response helpers are shared, only the database calls are awaited.
+
+
+# GET ALL MECHANICS
+@async_view("mechanics_bp.get_mechanics")
+@etag_view("mechanics")
+@cached_view("mechanics", timeout=60)
+async def get_mechanics(session):
+    return await collection_response_async(session, select(Mechanic), Mechanic.id, mechanics_schema)
+
+
+# MECHANICS ORDERED BY NUMBER OF TICKETS WORKED
+@async_view("mechanics_bp.mechanics_by_ticket_count")
+@etag_view("mechanics", "mechanic_service_ticket")
+@cached_view("mechanics", "mechanic_service_ticket", timeout=60)
+async def mechanics_by_ticket_count(session):
+    try:
+        query = ticket_count_query(request.args)
+    except TicketQueryError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(ticket_count_rows(await session.execute(query))), 200
@@ -1,11 +1,19 @@
 from flask import request, jsonify
 from marshmallow import ValidationError
-from sqlalchemy import func
-
-from app.extensions import db, cache
-from app.models import Mechanic, mechanic_service_ticket
+from sqlalchemy import select
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.extensions import db
+from app.caching import cached_view, etag_view
+from app.concurrency import if_match_fails, precondition_failed, with_version
+from app.bulk import BulkError, bulk_insert, bulk_payload
+from app.costs import COST_TAGS, cost_row, costs_cache_disabled, mechanic_revenue
+from app.models import Mechanic
+from app.pagination import collection_response
+from app.streaming import stream_collection, wants_stream
 from . import mechanics_bp
-from .schemas import mechanic_schema, mechanics_schema
+from app.blueprints.service_tickets.filters import TicketQueryError, limit_arg, ticket_filters
+from .schemas import mechanic_schema, mechanics_schema, mechanics_bulk_schema
 
 
 # CREATE MECHANIC
@@ -23,21 +31,56 @@ def create_mechanic():
     return mechanic_schema.jsonify(mechanic), 201
 
 
-# GET ALL MECHANICS (cached)
+# BULK CREATE MECHANICS
+# POST a JSON array. All-or-nothing: errors are reported per array index
+@mechanics_bp.route("/bulk", methods=["POST"])
+def create_mechanics_bulk():
+    try:
+        rows = mechanics_bulk_schema.load(bulk_payload())
+    except BulkError as e:
+        return jsonify({"error": str(e)}), 400
+    except ValidationError as e:
+        return jsonify({"errors": e.messages}), 400
+
+    ids = bulk_insert(Mechanic, rows)
+    return jsonify({"created": len(ids), "ids": ids}), 201
+
+
+# GET ALL MECHANICS (cached, ?after=<cursor>&limit=N for keyset pages)
+# ?stream=true or Accept: application/x-ndjson streams the full export (never cached)
+# Cache entries are tagged "mechanics" and dropped on any commit that touches them
 @mechanics_bp.route("/", methods=["GET"])
-@cache.cached(timeout=60)  # Advanced: caching
+@etag_view("mechanics")  # 304 when nothing changed
+@cached_view("mechanics", timeout=60, unless=wants_stream)  # Advanced: caching
 def get_mechanics():
-    mechanics = Mechanic.query.all()
-    return mechanics_schema.jsonify(mechanics), 200
+    if wants_stream():
+        return stream_collection(select(Mechanic).order_by(Mechanic.id), mechanics_schema)
+
+    return collection_response(select(Mechanic), Mechanic.id, mechanics_schema)
+
+
+# GET SINGLE MECHANIC
+# The ETag is the row version (what If-Match on PUT / DELETE expects); If-None-Match -> 304
+@mechanics_bp.route("/<int:id>", methods=["GET"])
+def get_mechanic(id: int):
+    mechanic = db.session.get(Mechanic, id)
+    if not mechanic:
+        return jsonify({"error": "Mechanic not found"}), 404
+    response = with_version((mechanic_schema.jsonify(mechanic), 200), mechanic.version_id)
+    return response.make_conditional(request)
 
 
 # UPDATE MECHANIC
+# Optimistic concurrency: If-Match: "<version>" (the ETag), 412 if it changed
 @mechanics_bp.route("/<int:id>", methods=["PUT"])
 def update_mechanic(id: int):
     mechanic = db.session.get(Mechanic, id)
     if not mechanic:
         return jsonify({"error": "Mechanic not found"}), 404
 
+    if if_match_fails(mechanic.version_id):
+        return precondition_failed("Mechanic was modified", mechanic.version_id)
+
     json_data = request.get_json() or {}
 
     try:
@@ -45,46 +88,90 @@ def update_mechanic(id: int):
     except ValidationError as e:
         return jsonify(e.messages), 400
 
-    db.session.commit()
-    return mechanic_schema.jsonify(mechanic), 200
+    try:
+        db.session.commit()
+    except StaleDataError:
+        # Another request committed between our read and our UPDATE
+        db.session.rollback()
+        return precondition_failed("Mechanic was modified")
+    return with_version((mechanic_schema.jsonify(mechanic), 200), mechanic.version_id)
 
 
-# DELETE MECHANIC
+# DELETE MECHANIC (If-Match as for updates)
 @mechanics_bp.route("/<int:id>", methods=["DELETE"])
 def delete_mechanic(id: int):
     mechanic = db.session.get(Mechanic, id)
     if not mechanic:
         return jsonify({"error": "Mechanic not found"}), 404
 
+    if if_match_fails(mechanic.version_id):
+        return precondition_failed("Mechanic was modified", mechanic.version_id)
+
     db.session.delete(mechanic)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except StaleDataError:
+        # Changed or deleted by another request since we read it
+        db.session.rollback()
+        return precondition_failed("Mechanic was modified")
     return jsonify({"message": f"Mechanic {id} deleted"}), 200
 
 
-# ADVANCED QUERY: mechanics ordered by number of tickets worked
-@mechanics_bp.route("/by-ticket-count", methods=["GET"])
-def mechanics_by_ticket_count():
-    results = (
-        db.session.query(
-            Mechanic,
-            func.count(mechanic_service_ticket.c.service_ticket_id).label("ticket_count"),
-        )
-        .outerjoin(
-            mechanic_service_ticket,
-            Mechanic.id == mechanic_service_ticket.c.mechanic_id,
-        )
-        .group_by(Mechanic.id)
-        .order_by(func.count(mechanic_service_ticket.c.service_ticket_id).desc())
-        .all()
-    )
-
-    data = [
+def ticket_count_query(args):
+    """
+    Mechanics by ticket count, highest first, for ?limit=N (optional).
+    Shared with the async view in async_routes.py.
+    """
+    query = select(
+        Mechanic.id,
+        Mechanic.name,
+        Mechanic.specialization,
+        Mechanic.ticket_count,
+    ).order_by(Mechanic.ticket_count.desc(), Mechanic.id)
+
+    limit = limit_arg(args)
+    return query.limit(limit) if limit is not None else query
+
+
+def ticket_count_rows(rows) -> list:
+    """
+    Response body for the rows of ticket_count_query().
+    """
+    return [
         {
-            "id": mechanic.id,
-            "name": mechanic.name,
-            "specialization": mechanic.specialization,
-            "ticket_count": ticket_count,
+            "id": row.id,
+            "name": row.name,
+            "specialization": row.specialization,
+            "ticket_count": row.ticket_count,
         }
-        for mechanic, ticket_count in results
+        for row in rows
     ]
-    return jsonify(data), 200
+
+
+# ADVANCED QUERY: mechanics ordered by number of tickets worked
+# Reads the materialized Mechanic.ticket_count (indexed), ?limit=N for the top N
+@mechanics_bp.route("/by-ticket-count", methods=["GET"])
+@etag_view("mechanics", "mechanic_service_ticket")
+@cached_view("mechanics", "mechanic_service_ticket", timeout=60)
+def mechanics_by_ticket_count():
+    try:
+        query = ticket_count_query(request.args)
+    except TicketQueryError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(ticket_count_rows(db.session.execute(query))), 200
+
+
+# REVENUE PER MECHANIC: parts total of the tickets each mechanic worked,
+# highest first. Takes the GET /service-tickets/ filters and ?limit=N
+@mechanics_bp.route("/revenue", methods=["GET"])
+@etag_view(*COST_TAGS, "mechanics", "mechanic_service_ticket")
+@cached_view(*COST_TAGS, "mechanics", "mechanic_service_ticket", timeout=300, unless=costs_cache_disabled)
+def get_mechanic_revenue():
+    try:
+        filters = ticket_filters(request.args)
+        limit = limit_arg(request.args)
+    except TicketQueryError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rows = db.session.execute(mechanic_revenue(filters).limit(limit))
+    return jsonify([cost_row(row) for row in rows]), 200
@@ -1,12 +1,18 @@
-from app.extensions import ma
+from app.instrumentation import TimedSchema
 from app.models import Mechanic
 
 
-class MechanicSchema(ma.SQLAlchemyAutoSchema):
+class MechanicSchema(TimedSchema):
     class Meta:
         model = Mechanic
         load_instance = True
+        # Maintained by the server, never set by clients
+        dump_only = ("ticket_count",)
+        # Served as the ETag instead (app/concurrency.py)
+        exclude = ("version_id",)
 
 
 mechanic_schema = MechanicSchema()
 mechanics_schema = MechanicSchema(many=True)
+# Loads plain dicts for bulk inserts instead of one model instance per row
+mechanics_bulk_schema = MechanicSchema(many=True, load_instance=False)
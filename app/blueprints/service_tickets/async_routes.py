@@ -0,0 +1,28 @@
+from flask import jsonify, request
+from sqlalchemy import select
+
+from app.asgi import async_view
+from app.caching import etag_view
+from app.models import ServiceTicket
+from app.pagination import collection_response_async
+from .filters import TicketQueryError
+from .routes import ticket_list_args, ticket_list_loading
+
+# Async twins of the read-heavy GET views in routes.py, served by the ASGI
+# entry point (app/asgi.py). Same URLs, same responses: the query and
+# response helpers are shared, only the database calls are awaited.
+# Streamed exports (?stream=true / NDJSON) stay on the Flask view.
+
+
+# GET ALL TICKETS (same filters, sort, fields and cursor pages as routes.py)
+@async_view("service_tickets_bp.get_tickets")
+@etag_view("service_tickets")
+async def get_tickets(session):
+    try:
+        filters, order_by, fields = ticket_list_args(request.args)
+    except TicketQueryError as e:
+        return jsonify({"error": str(e)}), 400
+    schema, options = ticket_list_loading(fields)
+
+    stmt = select(ServiceTicket).where(*filters).options(*options)
+    return await collection_response_async(session, stmt, ServiceTicket.id, schema, order_by)
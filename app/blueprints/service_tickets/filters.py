@@ -0,0 +1,115 @@
+from datetime import datetime
+
+from sqlalchemy import exists
+
+from app.models import ServiceTicket, mechanic_service_ticket
+
+TICKET_COLUMNS = ("id", "description", "vehicle", "status", "created_at", "customer_id")
+TICKET_RELATIONSHIPS = ("customer", "mechanics", "parts", "part_quantities")
+
+# ?sort= keys (prefix with "-" for descending)
+SORT_COLUMNS = {
+    "id": ServiceTicket.id,
+    "created_at": ServiceTicket.created_at,
+    "status": ServiceTicket.status,
+}
+
+
+class TicketQueryError(ValueError):
+    """Raised when a filter / sort / fields query param is invalid."""
+
+
+def _int_arg(args, name):
+    try:
+        return int(args[name])
+    except ValueError as e:
+        raise TicketQueryError(f"{name} must be an integer") from e
+
+
+def _datetime_arg(args, name):
+    try:
+        return datetime.fromisoformat(args[name])
+    except ValueError as e:
+        raise TicketQueryError(f"{name} must be an ISO 8601 date/time") from e
+
+
+def ticket_filters(args) -> list:
+    """
+    WHERE clauses for GET /service-tickets/. Each one maps to an index:
+    status, customer_id, vehicle, created_at, and the association table PK
+    for mechanic_id.
+    """
+    clauses = []
+
+    if "status" in args:
+        statuses = [s for s in args["status"].split(",") if s]
+        clauses.append(ServiceTicket.status.in_(statuses))
+
+    if "customer_id" in args:
+        clauses.append(ServiceTicket.customer_id == _int_arg(args, "customer_id"))
+
+    if "mechanic_id" in args:
+        link = mechanic_service_ticket
+        clauses.append(
+            exists().where(
+                link.c.mechanic_id == _int_arg(args, "mechanic_id"),
+                link.c.service_ticket_id == ServiceTicket.id,
+            ).correlate(ServiceTicket)  # not the outer query's own link rows (/mechanics/revenue)
+        )
+
+    if "vehicle" in args:
+        clauses.append(ServiceTicket.vehicle == args["vehicle"])
+
+    if "created_after" in args:
+        clauses.append(ServiceTicket.created_at >= _datetime_arg(args, "created_after"))
+
+    if "created_before" in args:
+        clauses.append(ServiceTicket.created_at < _datetime_arg(args, "created_before"))
+
+    return clauses
+
+
+def limit_arg(args):
+    """
+    ?limit=N as an int (None when absent).
+    """
+    if "limit" not in args:
+        return None
+    limit = _int_arg(args, "limit")
+    if limit < 1:
+        raise TicketQueryError("limit must be at least 1")
+    return limit
+
+
+def ticket_sort(args) -> list:
+    """
+    ORDER BY for ?sort=created_at,-id (id is always the final tie-breaker).
+    """
+    order_by = []
+    names = []
+    for key in [k for k in args.get("sort", "").split(",") if k]:
+        name = key.lstrip("-")
+        column = SORT_COLUMNS.get(name)
+        if column is None:
+            raise TicketQueryError(f"Cannot sort by {name!r}")
+        order_by.append(column.desc() if key.startswith("-") else column.asc())
+        names.append(name)
+
+    if "id" not in names:
+        order_by.append(ServiceTicket.id.asc())
+    return order_by
+
+
+def ticket_fields(args):
+    """
+    Sparse fieldset from ?fields=id,status,mechanics (None = every field).
+    Returned sorted so equivalent requests share one projected schema.
+    """
+    if "fields" not in args:
+        return None
+
+    fields = {f for f in args["fields"].split(",") if f}
+    unknown = fields - set(TICKET_COLUMNS) - set(TICKET_RELATIONSHIPS)
+    if unknown or not fields:
+        raise TicketQueryError(f"Unknown fields: {', '.join(sorted(unknown)) or '(none given)'}")
+    return tuple(sorted(fields))
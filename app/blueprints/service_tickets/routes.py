@@ -1,11 +1,33 @@
 from flask import request, jsonify
 from marshmallow import ValidationError
+from sqlalchemy import delete, exists, insert, literal, select, update
 
 from app.extensions import db
 from app.auth import token_required
-from app.models import ServiceTicket, Mechanic, Inventory
+from app.bulk import BulkError, bulk_insert, bulk_payload
+from app.caching import cached_view, etag_view
+from app.concurrency import if_match_versions, precondition_failed, with_version
+from app.costs import COST_TAGS, cost_row, costs_cache_disabled, ticket_costs
+from app.models import ServiceTicket, Mechanic, Inventory, mechanic_service_ticket
+from app.loading import (
+    ticket_detail_options,
+    ticket_list_options,
+    ticket_projection_columns,
+    ticket_projection_options,
+)
+from app.ticket_counts import refresh_ticket_counts
+from app.pagination import collection_response, wants_cursor_page
+from app.search import search_ticket_ids
+from app.stock import add_ticket_part, reserve_stock
+from app.streaming import stream_collection, wants_stream
 from . import service_tickets_bp
-from .schemas import service_ticket_schema, service_tickets_schema
+from .filters import TicketQueryError, ticket_fields, ticket_filters, ticket_sort
+from .schemas import (
+    service_ticket_schema,
+    service_tickets_bulk_schema,
+    service_tickets_projection,
+    service_tickets_schema,
+)
 
 
 # CREATE SERVICE TICKET (requires logged-in customer)
@@ -33,52 +55,239 @@ def create_ticket(customer_id):
     return service_ticket_schema.jsonify(ticket), 201
 
 
+# BULK CREATE SERVICE TICKETS (e.g. a whole fleet) for the logged-in customer
+# POST a JSON array. All-or-nothing: errors are reported per array index
+@service_tickets_bp.route("/bulk", methods=["POST"])
+@token_required
+def create_tickets_bulk(customer_id):
+    try:
+        rows = service_tickets_bulk_schema.load(bulk_payload())
+    except BulkError as e:
+        return jsonify({"error": str(e)}), 400
+    except ValidationError as e:
+        return jsonify({"errors": e.messages}), 400
+
+    for row in rows:
+        row.setdefault("vehicle", None)
+        row.setdefault("status", "open")
+        row["customer_id"] = customer_id
+
+    ids = bulk_insert(ServiceTicket, rows)
+    return jsonify({"created": len(ids), "ids": ids}), 201
+
+
+def ticket_list_args(args):
+    """
+    Filters, ORDER BY and sparse fieldset (or None) of a GET / request.
+    Shared with the async view in async_routes.py. Raises TicketQueryError,
+    also for ?sort= on a cursor page (those are always in id order).
+    """
+    filters = ticket_filters(args)
+    order_by = ticket_sort(args)
+    fields = ticket_fields(args)
+    if "sort" in args and wants_cursor_page() and not wants_stream():
+        raise TicketQueryError("sort can't be combined with cursor pagination")
+    return filters, order_by, fields
+
+
+def ticket_list_loading(fields):
+    """
+    (schema, loader options) for a ticket list with sparse fieldset `fields`.
+    """
+    if fields:
+        return service_tickets_projection(fields), ticket_projection_options(fields)
+    return service_tickets_schema, ticket_list_options()
+
+
 # GET ALL TICKETS (could be admin-only in real life)
+# Filters: ?status=open,in_progress &customer_id= &mechanic_id= &vehicle=
+#          &created_after= &created_before= (ISO 8601)
+# ?sort=-created_at,id   ?fields=id,status,mechanics (sparse fieldset)
+# ?after=<cursor>&limit=N for keyset pages
+# ?stream=true or Accept: application/x-ndjson streams the full export
 @service_tickets_bp.route("/", methods=["GET"])
+@etag_view("service_tickets")  # 304 when nothing changed (dashboard polling)
 def get_tickets():
-    tickets = ServiceTicket.query.all()
-    return service_tickets_schema.jsonify(tickets), 200
+    try:
+        filters, order_by, fields = ticket_list_args(request.args)
+    except TicketQueryError as e:
+        return jsonify({"error": str(e)}), 400
+    schema, options = ticket_list_loading(fields)
+
+    if wants_stream():
+        stmt = select(ServiceTicket).where(*filters).order_by(*order_by)
+        if fields:
+            # Columns on the streamed query itself, relationships per batch
+            stmt = stmt.options(ticket_projection_columns(fields))
+        return stream_collection(stmt, schema, batch_options=options)
+
+    stmt = select(ServiceTicket).where(*filters).options(*options)
+    return collection_response(stmt, ServiceTicket.id, schema, order_by)
+
+
+# GET SINGLE TICKET
+# The ETag is the row version (what If-Match on /edit expects); If-None-Match -> 304
+@service_tickets_bp.route("/<int:ticket_id>", methods=["GET"])
+def get_ticket(ticket_id):
+    ticket = db.session.get(ServiceTicket, ticket_id, options=ticket_detail_options())
+    if not ticket:
+        return jsonify({"error": "Service ticket not found"}), 404
+    response = with_version((service_ticket_schema.jsonify(ticket), 200), ticket.version_id)
+    return response.make_conditional(request)
+
+
+# FULL-TEXT SEARCH: description, vehicle and part names, best match first
+# GET '/search?q=brake honda&page=1&per_page=20'
+@service_tickets_bp.route("/search", methods=["GET"])
+@etag_view("service_tickets", "inventory")
+def search_tickets():
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify({"error": "q is required"}), 400
+
+    try:
+        page = int(request.args.get("page", 1))
+        per_page = min(int(request.args.get("per_page", 20)), 100)
+    except ValueError:
+        return jsonify({"error": "page and per_page must be integers"}), 400
+    if page < 1 or per_page < 1:
+        return jsonify({"error": "page and per_page must be at least 1"}), 400
+
+    # One extra id tells us whether there's a next page without a COUNT(*)
+    ids = search_ticket_ids(q, limit=per_page + 1, offset=(page - 1) * per_page)
+    has_more = len(ids) > per_page
+    ids = ids[:per_page]
+
+    stmt = select(ServiceTicket).where(ServiceTicket.id.in_(ids)).options(*ticket_list_options())
+    by_id = {t.id: t for t in db.session.execute(stmt).scalars()}
+    tickets = [by_id[i] for i in ids if i in by_id]
+
+    result = {
+        "items": service_tickets_schema.dump(tickets),
+        "page": page,
+        "per_page": per_page,
+        "has_more": has_more,
+    }
+    return jsonify(result), 200
+
+
+# PARTS COST OF TICKETS: totals over every ticket matching the
+# GET '/' filters (status, customer_id, mechanic_id, vehicle,
+# created_after / created_before), summed in SQL
+@service_tickets_bp.route("/costs", methods=["GET"])
+@etag_view(*COST_TAGS)
+@cached_view(*COST_TAGS, timeout=300, unless=costs_cache_disabled)
+def get_ticket_costs():
+    try:
+        filters = ticket_filters(request.args)
+    except TicketQueryError as e:
+        return jsonify({"error": str(e)}), 400
+
+    row = db.session.execute(ticket_costs(filters)).one()
+    return jsonify(cost_row(row)), 200
+
+
+# PARTS COST OF ONE TICKET
+@service_tickets_bp.route("/<int:ticket_id>/cost", methods=["GET"])
+@etag_view(*COST_TAGS)
+@cached_view(*COST_TAGS, timeout=300, unless=costs_cache_disabled)
+def get_ticket_cost(ticket_id):
+    row = db.session.execute(ticket_costs([ServiceTicket.id == ticket_id])).one()
+    if not row.tickets:
+        return jsonify({"error": "Service ticket not found"}), 404
+
+    data = cost_row(row)
+    del data["tickets"]
+    return jsonify({"ticket_id": ticket_id, **data}), 200
 
 
 # ADVANCED UPDATE: EDIT MECHANICS ON A TICKET
 # PUT '/<int:ticket_id>/edit' : Takes in remove_ids, and add_ids
+# Optimistic concurrency: If-Match: "<version>" (the ETag), 412 if it changed
 @service_tickets_bp.route("/<int:ticket_id>/edit", methods=["PUT"])
 @token_required  # requires customer to be logged in
 def edit_ticket_mechanics(customer_id, ticket_id):
-    ticket = db.session.get(ServiceTicket, ticket_id)
-    if not ticket:
-        return jsonify({"error": "Service ticket not found"}), 404
+    # Bump the ticket version up front, as a compare-and-set on the version
+    # named by If-Match (if any). One UPDATE both checks and claims it, so
+    # there is no read-then-write window and no lock taken ahead of time.
+    claim = update(ServiceTicket).where(
+        ServiceTicket.id == ticket_id, ServiceTicket.customer_id == customer_id
+    )
+    expected = if_match_versions()
+    if expected is not None:
+        claim = claim.where(ServiceTicket.version_id.in_(expected))
+    claimed = db.session.execute(
+        claim.values(version_id=ServiceTicket.version_id + 1).execution_options(synchronize_session=False)
+    ).rowcount
 
-    # (Optionally: check ownership)
-    if ticket.customer_id != customer_id:
-        return jsonify({"error": "Not authorized to modify this ticket"}), 403
+    if not claimed:
+        # Find out why (only on the failure path)
+        db.session.rollback()
+        ticket = db.session.get(ServiceTicket, ticket_id)
+        if not ticket:
+            return jsonify({"error": "Service ticket not found"}), 404
+        if ticket.customer_id != customer_id:
+            return jsonify({"error": "Not authorized to modify this ticket"}), 403
+        return precondition_failed("Service ticket was modified", ticket.version_id)
 
     json_data = request.get_json() or {}
     add_ids = json_data.get("add_ids", [])
     remove_ids = json_data.get("remove_ids", [])
 
+    for ids in (add_ids, remove_ids):
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            db.session.rollback()
+            return jsonify({"error": "add_ids and remove_ids must be lists of integers"}), 400
+
+    # Set-based: one DELETE and one INSERT ... SELECT against the association
+    # table, no matter how many ids come in (no per-id lookups or list scans)
+    link = mechanic_service_ticket
+
     # Remove mechanics
     if remove_ids:
-        for mid in remove_ids:
-            mech = Mechanic.query.get(mid)
-            if mech and mech in ticket.mechanics:
-                ticket.mechanics.remove(mech)
+        db.session.execute(
+            delete(link).where(
+                link.c.service_ticket_id == ticket_id,
+                link.c.mechanic_id.in_(set(remove_ids)),
+            )
+        )
 
-    # Add mechanics
+    # Add mechanics (only ids that exist and aren't already on the ticket)
     if add_ids:
-        for mid in add_ids:
-            mech = Mechanic.query.get(mid)
-            if mech and mech not in ticket.mechanics:
-                ticket.mechanics.append(mech)
+        already_assigned = exists().where(
+            link.c.service_ticket_id == ticket_id,
+            link.c.mechanic_id == Mechanic.id,
+        )
+        new_links = select(Mechanic.id, literal(ticket_id)).where(
+            Mechanic.id.in_(set(add_ids)),
+            ~already_assigned,
+        )
+        db.session.execute(
+            insert(link).from_select(["mechanic_id", "service_ticket_id"], new_links)
+        )
+
+    # Keep the materialized Mechanic.ticket_count in step (same transaction)
+    refresh_ticket_counts(db.session, set(add_ids) | set(remove_ids))
 
     db.session.commit()
-    return service_ticket_schema.jsonify(ticket), 200
+
+    # Reload the ticket + relationships in one query for the response
+    ticket = db.session.get(
+        ServiceTicket, ticket_id, options=ticket_detail_options(), populate_existing=True
+    )
+    return with_version((service_ticket_schema.jsonify(ticket), 200), ticket.version_id)
 
 
 # ADD A PART TO A TICKET (Inventory relationship)
+# Optional body {"quantity": n} (default 1); adding a part again adds to its quantity
 @service_tickets_bp.route("/<int:ticket_id>/add-part/<int:inventory_id>", methods=["PUT"])
 @token_required
 def add_part_to_ticket(customer_id, ticket_id, inventory_id):
+    json_data = request.get_json(silent=True) or {}
+    quantity = json_data.get("quantity", 1)
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+        return jsonify({"error": "quantity must be a positive integer"}), 400
+
     ticket = db.session.get(ServiceTicket, ticket_id)
     if not ticket:
         return jsonify({"error": "Service ticket not found"}), 404
@@ -86,12 +295,17 @@ def add_part_to_ticket(customer_id, ticket_id, inventory_id):
     if ticket.customer_id != customer_id:
         return jsonify({"error": "Not authorized to modify this ticket"}), 403
 
-    part = db.session.get(Inventory, inventory_id)
-    if not part:
-        return jsonify({"error": "Inventory item not found"}), 404
+    # Conditional decrement (check + update in one statement), then upsert the link
+    if not reserve_stock(inventory_id, quantity):
+        db.session.rollback()
+        if db.session.get(Inventory, inventory_id) is None:
+            return jsonify({"error": "Inventory item not found"}), 404
+        return jsonify({"error": "Not enough stock"}), 409
 
-    if part not in ticket.parts:
-        ticket.parts.append(part)
-        db.session.commit()
+    add_ticket_part(ticket_id, inventory_id, quantity)
+    db.session.commit()
 
-    return service_ticket_schema.jsonify(ticket), 200
+    ticket = db.session.get(
+        ServiceTicket, ticket_id, options=ticket_detail_options(), populate_existing=True
+    )
+    return with_version((service_ticket_schema.jsonify(ticket), 200), ticket.version_id)
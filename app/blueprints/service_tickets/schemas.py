@@ -1,14 +1,53 @@
+from functools import lru_cache
+
+from marshmallow import validate
+from marshmallow_sqlalchemy import auto_field
+
 from app.extensions import ma
-from app.models import ServiceTicket
+from app.instrumentation import TimedSchema
+from app.models import ServiceTicket, TicketPart
+from app.serialization import CompiledSchema
+
+
+class TicketPartSchema(CompiledSchema):
+    """
+    A part on a ticket: {"id": <inventory id>, "quantity": n}.
+    """
+
+    class Meta:
+        model = TicketPart
+        fields = ("id", "quantity")
+
+    id = auto_field("inventory_id", dump_only=True)
 
 
-class ServiceTicketSchema(ma.SQLAlchemyAutoSchema):
+class ServiceTicketSchema(TimedSchema):
     class Meta:
         model = ServiceTicket
         load_instance = True
         include_fk = True
         include_relationships = True
+        # Served as the ETag instead (app/concurrency.py)
+        exclude = ("version_id",)
+
+    description = auto_field(validate=validate.Length(min=1))
+    # Both from the ticket_inventory rows (no join to inventory): the part
+    # ids as before, and the same parts with their quantities
+    parts = ma.Pluck(TicketPartSchema, "id", many=True, attribute="part_links", dump_only=True)
+    part_quantities = ma.List(ma.Nested(TicketPartSchema), attribute="part_links", dump_only=True)
 
 
 service_ticket_schema = ServiceTicketSchema()
 service_tickets_schema = ServiceTicketSchema(many=True)
+# Loads plain dicts for bulk inserts; the customer comes from the token
+service_tickets_bulk_schema = ServiceTicketSchema(
+    many=True, load_instance=False, only=("description", "vehicle", "status")
+)
+
+
+@lru_cache(maxsize=64)
+def service_tickets_projection(fields: tuple) -> ServiceTicketSchema:
+    """
+    many=True schema limited to `fields` (?fields=...), built once per combination.
+    """
+    return ServiceTicketSchema(many=True, only=fields)
@@ -0,0 +1,43 @@
+from flask import current_app, request
+from sqlalchemy import insert
+
+from app.extensions import db
+
+
+class BulkError(ValueError):
+    """Raised when a bulk request body can't be used at all."""
+
+
+def bulk_payload() -> list:
+    """
+    Return the JSON array sent to a /bulk endpoint.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, list) or not data:
+        raise BulkError("Expected a non-empty JSON array")
+
+    max_items = current_app.config.get("BULK_MAX_ITEMS", 5000)
+    if len(data) > max_items:
+        raise BulkError(f"At most {max_items} items per request")
+
+    if not all(isinstance(item, dict) for item in data):
+        raise BulkError("Every item must be a JSON object")
+    return data
+
+
+def bulk_insert(model, rows: list) -> list:
+    """
+    Insert every row with one executemany INSERT ... RETURNING id and a
+    single commit. Returns the new ids in the same order as `rows`.
+    """
+    if db.session.get_bind().dialect.name == "sqlite":
+        # sort_by_parameter_order makes SQLite fall back to one INSERT per row.
+        # The write lock is held for the whole transaction, so rowids are
+        # handed out in row order: sorting the ids restores it.
+        stmt = insert(model).returning(model.id)
+        ids = sorted(db.session.scalars(stmt, rows).all())
+    else:
+        stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+        ids = db.session.scalars(stmt, rows).all()
+    db.session.commit()
+    return ids
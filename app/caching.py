@@ -0,0 +1,259 @@
+import asyncio
+import hashlib
+import inspect
+import threading
+import uuid
+from functools import wraps
+
+from flask import Response, current_app, has_app_context, request
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from app.extensions import cache
+from app.replicas import note_recent_writes, pinned_to_primary, read_primary_if_recent
+
+# A change to an association table also changes what both sides serialize to
+TAG_ALIASES = {
+    "mechanic_service_ticket": ("mechanics", "service_tickets"),
+    "ticket_inventory": ("inventory", "service_tickets"),
+}
+
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name: str, amount: int = 1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def cache_stats() -> dict:
+    """
+    Hit/miss/invalidation counters for this process.
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _tag_key(tag: str) -> str:
+    return f"tag:{tag}"
+
+
+def tag_versions(tags) -> list:
+    """
+    Current version token of every tag. Tokens live in the cache backend
+    itself, so every worker sharing the backend sees the same versions.
+    """
+    keys = [_tag_key(tag) for tag in tags]
+    versions = list(cache.get_many(*keys)) if keys else []
+    for i, version in enumerate(versions):
+        if version is None:
+            # add() only writes if no other worker got there first
+            cache.add(keys[i], uuid.uuid4().hex, timeout=0)
+            versions[i] = cache.get(keys[i])
+    return versions
+
+
+def invalidate_tags(*tags):
+    """
+    Bump the version of each tag (plus aliases). Every cached entry built
+    with an older version becomes unreachable and simply ages out.
+    """
+    expanded = set()
+    for tag in tags:
+        expanded.add(tag)
+        expanded.update(TAG_ALIASES.get(tag, ()))
+
+    # Marked before the bump, so no reader sees the new version unmarked
+    note_recent_writes(expanded)
+    for tag in expanded:
+        cache.set(_tag_key(tag), uuid.uuid4().hex, timeout=0)
+    _count("invalidations", len(expanded))
+
+
+def _cached_response(key: str):
+    hit = cache.get(key)
+    if hit is None:
+        _count("misses")
+        return None
+    _count("hits")
+    body, status, mimetype = hit
+    response = Response(body, status=status, mimetype=mimetype)
+    response.headers["X-Cache"] = "HIT"
+    return response
+
+
+def _store_response(key: str, rv, timeout):
+    response = current_app.make_response(rv)
+    if response.status_code == 200 and not response.is_streamed:
+        cache.set(key, (response.get_data(), 200, response.mimetype), timeout=timeout)
+    response.headers["X-Cache"] = "MISS"
+    return response
+
+
+def cached_view(*tags, timeout: int = None, unless=None):
+    """
+    Cache a GET view's 200 response in the shared backend, keyed by the full
+    path + query string and the current version of each tag (table name).
+    Adds an X-Cache: HIT/MISS header. Skipped for clients pinned to the
+    primary after a write, and misses shortly after a write read from the
+    primary (see app/replicas.py). Works on async views too, with the
+    (blocking) cache backend calls run on a worker thread.
+    """
+
+    def skip() -> bool:
+        return (unless is not None and unless()) or pinned_to_primary()
+
+    def cache_key() -> str:
+        read_primary_if_recent(tags)
+        versions = tag_versions(tags)
+        return "view:" + request.full_path + ":" + ":".join(str(v) for v in versions)
+
+    def decorator(f):
+        if inspect.iscoroutinefunction(f):
+
+            @wraps(f)
+            async def decorated_async(*args, **kwargs):
+                if skip():
+                    return await f(*args, **kwargs)
+                key = await asyncio.to_thread(cache_key)
+                hit = await asyncio.to_thread(_cached_response, key)
+                if hit is not None:
+                    return hit
+                rv = await f(*args, **kwargs)
+                return await asyncio.to_thread(_store_response, key, rv, timeout)
+
+            return decorated_async
+
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if skip():
+                return f(*args, **kwargs)
+            key = cache_key()
+            hit = _cached_response(key)
+            if hit is not None:
+                return hit
+            return _store_response(key, f(*args, **kwargs), timeout)
+
+        return decorated
+
+    return decorator
+
+
+def _request_etag(tags):
+    # A replica may still be behind the tag versions read next
+    read_primary_if_recent(tags)
+    versions = tag_versions(tags)
+    if any(v is None for v in versions):
+        # Backend can't hold versions (e.g. NullCache): no validators
+        return None
+
+    fingerprint = "|".join(
+        [
+            request.full_path,
+            request.headers.get("Accept", ""),
+            request.headers.get("Authorization", ""),
+            *versions,
+        ]
+    )
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+
+def _not_modified(etag: str):
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def _with_etag(rv, etag: str):
+    response = current_app.make_response(rv)
+    if response.status_code == 200:
+        response.set_etag(etag)
+    return response
+
+
+def etag_view(*tags):
+    """
+    Conditional GETs for a view. The ETag is a hash of the request (path,
+    query string, Accept, Authorization) and the current version of each
+    tag, so If-None-Match is answered with a 304 *before* the view runs
+    any query or serialization. Works on async views too (the versions are
+    read on a worker thread).
+
+    Versions come from the cache backend, so with several workers this
+    needs a shared backend (see CACHE_TYPE) to stay correct.
+    """
+
+    def decorator(f):
+        if inspect.iscoroutinefunction(f):
+
+            @wraps(f)
+            async def decorated_async(*args, **kwargs):
+                etag = await asyncio.to_thread(_request_etag, tags)
+                if etag is None:
+                    return await f(*args, **kwargs)
+                if request.if_none_match.contains_weak(etag):
+                    return _not_modified(etag)
+                return _with_etag(await f(*args, **kwargs), etag)
+
+            return decorated_async
+
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            etag = _request_etag(tags)
+            if etag is None:
+                return f(*args, **kwargs)
+            if request.if_none_match.contains_weak(etag):
+                return _not_modified(etag)
+            return _with_etag(f(*args, **kwargs), etag)
+
+        return decorated
+
+    return decorator
+
+
+# AUTOMATIC INVALIDATION ON COMMIT
+# Tables touched by a session are collected while it flushes / executes DML,
+# then their tags are bumped once the transaction actually commits.
+
+def _pending_tags(session) -> set:
+    return session.info.setdefault("cache_tags", set())
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_flush_tags(session, flush_context, instances):
+    tags = _pending_tags(session)
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+
+        state = sa_inspect(obj)
+        tags.add(state.mapper.local_table.name)
+
+        for rel in state.mapper.relationships:
+            if rel.secondary is None:
+                continue
+            if obj in session.deleted or state.attrs[rel.key].history.has_changes():
+                tags.add(rel.secondary.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_dml_tags(orm_execute_state):
+    # Bulk insert()/update()/delete() statements skip the flush entirely
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _pending_tags(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_tags(session):
+    tags = session.info.pop("cache_tags", None)
+    if tags and has_app_context():
+        invalidate_tags(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_tags(session):
+    session.info.pop("cache_tags", None)
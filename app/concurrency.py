@@ -0,0 +1,56 @@
+from flask import current_app, jsonify, request
+
+# OPTIMISTIC CONCURRENCY
+# Mechanic, Inventory and ServiceTicket carry a version_id (SQLAlchemy's
+# version_id_col): every UPDATE of the row is
+#   UPDATE ... SET version_id = :new WHERE id = :id AND version_id = :loaded
+# and raises StaleDataError when another request committed in between, so
+# lost updates are caught without taking any locks up front.
+#
+# The version is the resource's ETag. A PUT with If-Match: "<version>" only
+# goes through if nobody changed the row since the client read it; a
+# mismatch (or a conflicting commit) is answered with 412.
+
+
+def version_etag(version: int) -> str:
+    """
+    ETag value (unquoted) for a row version.
+    """
+    return str(version)
+
+
+def if_match_fails(version: int) -> bool:
+    """
+    True when the request has an If-Match that doesn't name `version`.
+    No If-Match at all (or "*") always passes.
+    """
+    return bool(request.if_match) and not request.if_match.contains(version_etag(version))
+
+
+def if_match_versions():
+    """
+    Row versions the request's If-Match accepts, for a compare-and-set
+    `WHERE version_id IN (...)`. None = no constraint (no If-Match, or "*").
+    """
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    return [int(tag) for tag in request.if_match.as_set() if tag.isdigit()]
+
+
+def precondition_failed(message: str, version: int = None):
+    """
+    412 response, with the current ETag when it is known.
+    """
+    response = current_app.make_response((jsonify({"error": message}), 412))
+    if version is not None:
+        response.set_etag(version_etag(version))
+    return response
+
+
+def with_version(rv, version: int):
+    """
+    Make a response out of `rv` and tag it with the row version.
+    """
+    response = current_app.make_response(rv)
+    response.set_etag(version_etag(version))
+    return response
@@ -0,0 +1,90 @@
+from flask import current_app
+from sqlalchemy import func, select
+
+from app.models import Customer, Inventory, Mechanic, ServiceTicket, mechanic_service_ticket, ticket_inventory
+
+# Parts cost of service tickets, computed in SQL: SUM(inventory.price *
+# ticket_inventory.quantity), per ticket selection / customer / mechanic.
+# `filters` are WHERE clauses on ServiceTicket (see service_tickets/filters.py),
+# e.g. a created_at range. `parts` counts units. Tickets without parts count
+# with a total of 0.
+
+# Tables every cost report reads (cache / ETag tags)
+COST_TAGS = ("service_tickets", "ticket_inventory", "inventory")
+
+
+def costs_cache_disabled() -> bool:
+    """
+    `unless` for cached_view: COSTS_CACHE_ENABLED turned off.
+    """
+    return not current_app.config.get("COSTS_CACHE_ENABLED", True)
+
+
+def _totals():
+    return (
+        func.count(ServiceTicket.id.distinct()).label("tickets"),
+        func.coalesce(func.sum(ticket_inventory.c.quantity), 0).label("parts"),
+        func.coalesce(func.sum(Inventory.price * ticket_inventory.c.quantity), 0).label("parts_total"),
+    )
+
+
+def _with_parts(stmt):
+    return stmt.outerjoin(
+        ticket_inventory, ticket_inventory.c.service_ticket_id == ServiceTicket.id
+    ).outerjoin(Inventory, Inventory.id == ticket_inventory.c.inventory_id)
+
+
+def ticket_costs(filters):
+    """
+    One row: tickets, parts and parts_total over the matching tickets.
+    """
+    return _with_parts(select(*_totals()).select_from(ServiceTicket)).where(*filters)
+
+
+def customer_spend(filters):
+    """
+    Per customer with matching tickets: id, name, tickets, parts and
+    parts_total, biggest spenders first.
+    """
+    *totals, parts_total = _totals()
+    stmt = (
+        select(Customer.id, Customer.name, *totals, parts_total)
+        .select_from(ServiceTicket)
+        .join(Customer, Customer.id == ServiceTicket.customer_id)
+    )
+    return (
+        _with_parts(stmt)
+        .where(*filters)
+        .group_by(Customer.id, Customer.name)
+        .order_by(parts_total.desc(), Customer.id)
+    )
+
+
+def mechanic_revenue(filters):
+    """
+    Per mechanic with matching tickets: id, name, tickets, parts and
+    parts_total, highest first. A ticket worked by several mechanics
+    counts in full for each of them.
+    """
+    *totals, parts_total = _totals()
+    stmt = (
+        select(Mechanic.id, Mechanic.name, *totals, parts_total)
+        .select_from(ServiceTicket)
+        .join(mechanic_service_ticket, mechanic_service_ticket.c.service_ticket_id == ServiceTicket.id)
+        .join(Mechanic, Mechanic.id == mechanic_service_ticket.c.mechanic_id)
+    )
+    return (
+        _with_parts(stmt)
+        .where(*filters)
+        .group_by(Mechanic.id, Mechanic.name)
+        .order_by(parts_total.desc(), Mechanic.id)
+    )
+
+
+def cost_row(row) -> dict:
+    """
+    JSON body for a result row; money rounded to cents.
+    """
+    data = dict(row._mapping)
+    data["parts_total"] = round(float(data["parts_total"]), 2)
+    return data
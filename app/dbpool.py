@@ -0,0 +1,108 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that also counts how long checkouts wait for a free
+    connection, how often they time out, and how many physical
+    connections it has opened (churn).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "checkouts": 0,
+            "wait_seconds": 0.0,
+            "wait_seconds_max": 0.0,
+            "timeouts": 0,
+            "connects": 0,
+        }
+        event.listen(self, "connect", self._on_connect)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._stats_lock:
+            self.stats["connects"] += 1
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeout:
+            with self._stats_lock:
+                self.stats["timeouts"] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.stats["checkouts"] += 1
+                self.stats["wait_seconds"] += waited
+                self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], waited)
+
+
+def pool_stats(engine) -> dict:
+    """
+    Current usage of an engine's pool: size, checked out / idle
+    connections, overflow in use, plus TimedQueuePool's wait counters.
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {}
+
+    stats = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # overflow() counts from -size; only connections beyond pool_size matter
+        "overflow": max(pool.overflow(), 0),
+    }
+    if isinstance(pool, TimedQueuePool):
+        with pool._stats_lock:
+            stats.update(pool.stats)
+    return stats
+
+
+def timed_pool_options(uri: str, options: dict) -> dict:
+    """
+    `options` plus poolclass=TimedQueuePool wherever SQLAlchemy would use
+    a QueuePool anyway (server databases and file-based SQLite).
+    """
+    options = dict(options or {})
+    if ":memory:" not in uri and uri not in ("sqlite://", "sqlite:///"):
+        options.setdefault("poolclass", TimedQueuePool)
+    return options
+
+
+def configure_pool(app):
+    """
+    Use TimedQueuePool for the app's database. Call before db.init_app().
+    """
+    uri = app.config.get("SQLALCHEMY_DATABASE_URI") or ""
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = timed_pool_options(
+        uri, app.config.get("SQLALCHEMY_ENGINE_OPTIONS")
+    )
+
+
+def warm_pool(engine, connections: int):
+    """
+    Open `connections` physical connections up front (all checked out at
+    once, then returned), so the first requests of a fresh worker don't
+    pay for the connect. Run it after the fork, see gunicorn.conf.py.
+    """
+    if isinstance(engine.pool, QueuePool):
+        # Overflow connections are closed on return, so only pool_size sticks
+        connections = min(connections, engine.pool.size())
+    if connections <= 0:
+        return
+    held = []
+    try:
+        for _ in range(connections):
+            held.append(engine.connect())
+    finally:
+        for conn in held:
+            conn.close()
@@ -4,13 +4,28 @@ from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_caching import Cache
 
-db = SQLAlchemy()
+from .ratelimit import end_check
+from .replicas import RoutingSession
+
+# Sends reads of GET/HEAD requests to the read replicas, see app/replicas.py
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 ma = Marshmallow()
 
-# Global default rate limit comes from config: RATELIMIT_DEFAULT
+# Global default rate limit comes from config: RATELIMIT_DEFAULT.
+# Storage and strategy too (RATELIMIT_STORAGE_URI / RATELIMIT_STRATEGY), so every
+# worker can count against one shared store. Fails open (RATELIMIT_SWALLOW_ERRORS);
+# checks are timed by app/ratelimit.py, which also ends the timing on a breach.
 limiter = Limiter(
     key_func=get_remote_address,
-    storage_uri="memory://",
+    on_breach=end_check,
 )
 
 cache = Cache()
+
+
+def include_in_migrations(name, type_, parent_names) -> bool:
+    """
+    Keep autogenerate away from the full-text search tables (service_tickets_fts*),
+    which are created by hand-written DDL (app/search.py, migration 0004).
+    """
+    return not (type_ == "table" and name.startswith("service_tickets_fts"))
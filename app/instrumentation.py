@@ -0,0 +1,307 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from app.caching import cache_stats
+from app.dbpool import pool_stats
+from app.extensions import db, limiter
+from app.ratelimit import ratelimit_stats
+from app.replicas import replica_engines, replica_stats
+from app.serialization import CompiledSchema, FastJSONProvider
+
+# Opt-in (INSTRUMENTATION_ENABLED). For every request this records wall time,
+# SQL query count + time, serialization time (schema dump + JSON encoding),
+# the SQL issued *during* serialization (lazy loads = N+1) and response size.
+# Each response gets a Server-Timing header; per-route totals are served at
+# GET /metrics in Prometheus text format. Numbers are per process.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestMetrics:
+    """
+    Per-route counters and a latency histogram, keyed by (endpoint, method).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._statuses = {}
+
+    def record(self, endpoint: str, method: str, status: int, sample: dict):
+        with self._lock:
+            route = self._routes.get((endpoint, method))
+            if route is None:
+                route = self._routes[(endpoint, method)] = {
+                    "count": 0,
+                    "seconds": 0.0,
+                    "buckets": [0] * len(LATENCY_BUCKETS),
+                    "sql_queries": 0,
+                    "sql_seconds": 0.0,
+                    "serialize_seconds": 0.0,
+                    "serialize_queries": 0,
+                    "response_bytes": 0,
+                }
+            route["count"] += 1
+            route["seconds"] += sample["wall"]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if sample["wall"] <= bound:
+                    route["buckets"][i] += 1
+            route["sql_queries"] += sample["sql_queries"]
+            route["sql_seconds"] += sample["sql_seconds"]
+            route["serialize_seconds"] += sample["serialize_seconds"]
+            route["serialize_queries"] += sample["serialize_queries"]
+            route["response_bytes"] += sample["response_bytes"]
+
+            key = (endpoint, method, status)
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+
+    def snapshot(self) -> tuple:
+        with self._lock:
+            routes = {
+                key: dict(route, buckets=list(route["buckets"]))
+                for key, route in self._routes.items()
+            }
+            return routes, dict(self._statuses)
+
+
+def _metrics() -> RequestMetrics:
+    return current_app.extensions["request_metrics"]
+
+
+def _sample():
+    return g.get("_instrumentation")
+
+
+@contextmanager
+def phase(name: str):
+    """
+    Attribute the time (and SQL) of a block to a phase of the current
+    request. Only "serialize" is tracked; a no-op outside instrumented requests.
+    """
+    sample = _sample() if has_request_context() else None
+    if sample is None or sample["in_phase"]:
+        yield
+        return
+
+    sample["in_phase"] = name
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        sample[f"{name}_seconds"] += time.perf_counter() - start
+        sample["in_phase"] = None
+
+
+class TimedSchema(CompiledSchema):
+    """
+    Base for the resource schemas: dump() counts as serialization time.
+    """
+
+    def dump(self, obj, *, many=None):
+        with phase("serialize"):
+            return super().dump(obj, many=many)
+
+
+class TimedJSONProvider(FastJSONProvider):
+    """
+    JSON encoding also counts as serialization time.
+    """
+
+    def dumps(self, obj, **kwargs):
+        with phase("serialize"):
+            return super().dumps(obj, **kwargs)
+
+
+# SQL TIMING
+# Attached to the app's own engines by init_instrumentation(); only requests
+# with an active sample are recorded. The start time rides on the statement's
+# execution context, so a statement that fails leaves nothing behind.
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and has_request_context() and _sample() is not None:
+        context._instrumentation_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_instrumentation_start", None)
+    if start is None or not has_request_context():
+        return
+    sample = _sample()
+    if sample is None:
+        return
+    sample["sql_queries"] += 1
+    sample["sql_seconds"] += time.perf_counter() - start
+    if sample["in_phase"] == "serialize":
+        sample["serialize_queries"] += 1
+
+
+def _time_sql(engine):
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# REQUEST HOOKS
+
+def _start_request():
+    g._instrumentation = {
+        "start": time.perf_counter(),
+        "in_phase": None,
+        "sql_queries": 0,
+        "sql_seconds": 0.0,
+        "serialize_seconds": 0.0,
+        "serialize_queries": 0,
+    }
+
+
+def _finish_request(response):
+    sample = _sample()
+    if sample is None:
+        return response
+
+    sample["wall"] = time.perf_counter() - sample["start"]
+    # Streamed bodies are produced after this point: size unknown
+    sample["response_bytes"] = response.content_length or 0
+    ratelimit_seconds = g.get("ratelimit_seconds", 0.0)
+
+    response.headers["Server-Timing"] = ", ".join(
+        [
+            f"app;dur={sample['wall'] * 1000:.2f}",
+            f'db;dur={sample["sql_seconds"] * 1000:.2f};desc="{sample["sql_queries"]} queries"',
+            f"serialize;dur={sample['serialize_seconds'] * 1000:.2f}",
+            f"ratelimit;dur={ratelimit_seconds * 1000:.2f}",
+        ]
+    )
+
+    _metrics().record(
+        request.endpoint or "unmatched", request.method, response.status_code, sample
+    )
+    return response
+
+
+# PROMETHEUS EXPOSITION
+
+def _labels(**labels) -> str:
+    pairs = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def render_metrics() -> str:
+    """
+    All metrics in Prometheus text exposition format (version 0.0.4).
+    """
+    routes, statuses = _metrics().snapshot()
+    lines = []
+
+    def family(name: str, kind: str, help_text: str):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    family("http_requests_total", "counter", "Requests by route, method and status.")
+    for (endpoint, method, status), count in sorted(statuses.items()):
+        lines.append(
+            f"http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}"
+        )
+
+    family("http_request_duration_seconds", "histogram", "Wall time per request.")
+    for (endpoint, method), route in sorted(routes.items()):
+        for bound, count in zip(LATENCY_BUCKETS, route["buckets"]):
+            labels = _labels(endpoint=endpoint, method=method, le=bound)
+            lines.append(f"http_request_duration_seconds_bucket{labels} {count}")
+        labels = _labels(endpoint=endpoint, method=method, le="+Inf")
+        lines.append(f"http_request_duration_seconds_bucket{labels} {route['count']}")
+        labels = _labels(endpoint=endpoint, method=method)
+        lines.append(f"http_request_duration_seconds_sum{labels} {route['seconds']:.6f}")
+        lines.append(f"http_request_duration_seconds_count{labels} {route['count']}")
+
+    per_route = [
+        ("db_queries_total", "sql_queries", "SQL statements executed."),
+        ("db_query_duration_seconds_total", "sql_seconds", "Time spent in SQL."),
+        ("serialization_duration_seconds_total", "serialize_seconds", "Schema dump + JSON encoding."),
+        ("serialization_db_queries_total", "serialize_queries", "SQL issued while serializing (lazy loads)."),
+        ("http_response_bytes_total", "response_bytes", "Response body bytes (non-streamed)."),
+    ]
+    for name, field, help_text in per_route:
+        family(name, "counter", help_text)
+        for (endpoint, method), route in sorted(routes.items()):
+            value = route[field]
+            value = f"{value:.6f}" if isinstance(value, float) else value
+            lines.append(f"{name}{_labels(endpoint=endpoint, method=method)} {value}")
+
+    cache = cache_stats()
+    family("cache_requests_total", "counter", "Response cache lookups.")
+    lines.append(f'cache_requests_total{{result="hit"}} {cache["hits"]}')
+    lines.append(f'cache_requests_total{{result="miss"}} {cache["misses"]}')
+    family("cache_invalidations_total", "counter", "Cache tag version bumps.")
+    lines.append(f"cache_invalidations_total {cache['invalidations']}")
+
+    limits = ratelimit_stats()
+    family("ratelimit_check_duration_seconds", "summary", "Time spent checking rate limits.")
+    lines.append(f"ratelimit_check_duration_seconds_sum {limits['check_seconds']:.6f}")
+    lines.append(f"ratelimit_check_duration_seconds_count {limits['checks']}")
+    family("ratelimit_check_max_seconds", "gauge", "Slowest rate limit check.")
+    lines.append(f"ratelimit_check_max_seconds {limits['check_seconds_max']:.6f}")
+    family("ratelimit_storage_failures_total", "counter", "Limit checks that failed open.")
+    lines.append(f"ratelimit_storage_failures_total {limits['failures']}")
+
+    pools = {
+        bind or "default": pool_stats(engine) for bind, engine in db.engines.items()
+    }
+    pools.update(
+        (name, pool_stats(engine)) for name, engine in replica_engines(current_app).items()
+    )
+    pool_metrics = [
+        ("db_pool_size", "gauge", "size", "Configured pool size."),
+        ("db_pool_checked_out", "gauge", "checked_out", "Connections in use."),
+        ("db_pool_checked_in", "gauge", "checked_in", "Idle connections in the pool."),
+        ("db_pool_overflow", "gauge", "overflow", "Connections open beyond pool_size."),
+        ("db_pool_checkouts_total", "counter", "checkouts", "Connection checkouts."),
+        ("db_pool_wait_seconds_total", "counter", "wait_seconds", "Time spent waiting for a connection."),
+        ("db_pool_wait_max_seconds", "gauge", "wait_seconds_max", "Longest wait for a connection."),
+        ("db_pool_timeouts_total", "counter", "timeouts", "Checkouts that hit pool_timeout."),
+        ("db_pool_connects_total", "counter", "connects", "Physical connections opened."),
+    ]
+    for name, kind, field, help_text in pool_metrics:
+        family(name, kind, help_text)
+        for bind, stats in sorted(pools.items()):
+            if field in stats:
+                value = stats[field]
+                value = f"{value:.6f}" if isinstance(value, float) else value
+                lines.append(f"{name}{_labels(bind=bind)} {value}")
+
+    replicas = replica_stats()
+    family("db_read_requests_total", "counter", "Read requests by the database they read from.")
+    lines.append(f'db_read_requests_total{{target="replica"}} {replicas["replica"]}')
+    lines.append(f'db_read_requests_total{{target="primary"}} {replicas["primary"]}')
+    family("db_replica_health_failures_total", "counter", "Failed replica health checks.")
+    lines.append(f"db_replica_health_failures_total {replicas['health_failures']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view():
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+def init_instrumentation(app):
+    """
+    Turn instrumentation on for `app`: timing hooks, Server-Timing
+    headers, the timed JSON provider and GET /metrics.
+    """
+    app.extensions["request_metrics"] = RequestMetrics()
+    app.json = TimedJSONProvider(app)
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines + list(replica_engines(app).values()):
+        _time_sql(engine)
+
+    # First before_request hook, so the rate limit check is inside the wall time
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_request)
+    app.after_request(_finish_request)
+
+    app.add_url_rule("/metrics", "metrics", limiter.exempt(metrics_view))
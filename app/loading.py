@@ -0,0 +1,59 @@
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from app.models import ServiceTicket
+
+
+def ticket_relations(strategy=selectinload):
+    """
+    Loader options that fetch a ticket's customer, mechanics and parts (the
+    ticket_inventory rows with quantities, no join to inventory) up front,
+    so ServiceTicketSchema (include_relationships=True) never lazy-loads
+    them one ticket at a time.
+
+    The many-to-one customer is always joined (one row per ticket, so it's
+    safe with LIMIT and yield_per). For the collections:
+    - selectinload (default): for lists. One extra IN query per relationship,
+      no matter how many tickets, and it plays nicely with LIMIT.
+    - joinedload: for a single ticket. Everything comes back in one query.
+    """
+    return (
+        joinedload(ServiceTicket.customer),
+        strategy(ServiceTicket.mechanics),
+        strategy(ServiceTicket.part_links),
+    )
+
+
+def ticket_list_options():
+    return ticket_relations(selectinload)
+
+
+def ticket_detail_options():
+    return ticket_relations(joinedload)
+
+
+def ticket_projection_columns(fields):
+    """
+    load_only() for the columns of a sparse fieldset (plus the id).
+    """
+    columns = [
+        getattr(ServiceTicket, f)
+        for f in fields
+        if f not in ("customer", "mechanics", "parts", "part_quantities")
+    ]
+    return load_only(ServiceTicket.id, *columns)
+
+
+def ticket_projection_options(fields):
+    """
+    For a sparse fieldset (?fields=...): load_only() the requested columns
+    and eager-load only the relationships that were asked for.
+    """
+    options = [ticket_projection_columns(fields)]
+
+    if "customer" in fields:
+        options.append(joinedload(ServiceTicket.customer))
+    if "mechanics" in fields:
+        options.append(selectinload(ServiceTicket.mechanics))
+    if "parts" in fields or "part_quantities" in fields:
+        options.append(selectinload(ServiceTicket.part_links))
+    return options
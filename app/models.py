@@ -13,6 +13,8 @@ mechanic_service_ticket = db.Table(
         db.ForeignKey("service_tickets.id"),
         primary_key=True,
     ),
+    # PK covers mechanic -> tickets; this covers ticket -> mechanics
+    db.Index("ix_mechanic_service_ticket_ticket", "service_ticket_id", "mechanic_id"),
 )
 
 # Many-to-many: Inventory <-> ServiceTickets (parts per ticket)
@@ -25,6 +27,10 @@ ticket_inventory = db.Table(
         db.ForeignKey("service_tickets.id"),
         primary_key=True,
     ),
+    # Units of the part used on the ticket (see app/stock.py)
+    db.Column("quantity", db.Integer, nullable=False, default=1, server_default="1"),
+    # PK covers inventory -> tickets; this covers ticket -> parts
+    db.Index("ix_ticket_inventory_ticket", "service_ticket_id", "inventory_id"),
 )
 
 
@@ -34,7 +40,7 @@ class Customer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     email = db.Column(db.String(255), unique=True, nullable=False)
-    password = db.Column(db.String(255), nullable=False)  # plain for demo only
+    password = db.Column(db.String(255), nullable=False)  # KDF hash, see app/passwords.py
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     service_tickets = db.relationship(
@@ -54,6 +60,12 @@ class Mechanic(db.Model):
     name = db.Column(db.String(255), nullable=False)
     specialization = db.Column(db.String(255), nullable=True)
     is_active = db.Column(db.Boolean, default=True)
+    # Materialized len(service_tickets); kept in sync by app.ticket_counts
+    ticket_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Optimistic concurrency: bumped on every UPDATE, served as the ETag (app/concurrency.py)
+    version_id = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version_id}
 
     service_tickets = db.relationship(
         "ServiceTicket",
@@ -65,16 +77,25 @@ class Mechanic(db.Model):
         return f"<Mechanic id={self.id} name={self.name!r}>"
 
 
+# Leaderboard (/mechanics/by-ticket-count) is an ordered index scan
+db.Index("ix_mechanics_ticket_count", Mechanic.ticket_count.desc(), Mechanic.id)
+
+
 class ServiceTicket(db.Model):
     __tablename__ = "service_tickets"
 
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.String(500), nullable=False)
-    vehicle = db.Column(db.String(255), nullable=True)
-    status = db.Column(db.String(50), default="open")
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    vehicle = db.Column(db.String(255), nullable=True, index=True)
+    status = db.Column(db.String(50), default="open", index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    version_id = db.Column(db.Integer, nullable=False, default=1, server_default="1")  # see Mechanic
 
-    customer_id = db.Column(db.Integer, db.ForeignKey("customers.id"), nullable=False)
+    __mapper_args__ = {"version_id_col": version_id}
+
+    customer_id = db.Column(
+        db.Integer, db.ForeignKey("customers.id"), nullable=False, index=True
+    )
     customer = db.relationship("Customer", back_populates="service_tickets")
 
     mechanics = db.relationship(
@@ -89,16 +110,40 @@ class ServiceTicket(db.Model):
         back_populates="tickets",
     )
 
+    # The same rows with their quantities, for serializing (read-only: parts
+    # are added through `parts` or app.stock.add_ticket_part)
+    part_links = db.relationship(
+        "TicketPart",
+        viewonly=True,
+        order_by=ticket_inventory.c.inventory_id,
+    )
+
     def __repr__(self) -> str:
         return f"<ServiceTicket id={self.id} status={self.status!r}>"
 
 
+class TicketPart(db.Model):
+    """
+    A ticket_inventory row: `quantity` units of a part on a ticket.
+    """
+
+    __table__ = ticket_inventory
+
+    def __repr__(self) -> str:
+        return f"<TicketPart ticket={self.service_ticket_id} part={self.inventory_id} x{self.quantity}>"
+
+
 class Inventory(db.Model):
     __tablename__ = "inventory"
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     price = db.Column(db.Float, nullable=False)
+    # Units on hand; NULL = not stock-tracked. Decremented by app.stock
+    stock = db.Column(db.Integer, nullable=True)
+    version_id = db.Column(db.Integer, nullable=False, default=1, server_default="1")  # see Mechanic
+
+    __mapper_args__ = {"version_id_col": version_id}
 
     tickets = db.relationship(
         "ServiceTicket",
@@ -0,0 +1,151 @@
+import base64
+import json
+
+from flask import jsonify, request
+from sqlalchemy import func, select
+
+from app.extensions import db
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class PaginationError(ValueError):
+    """Raised when ?after= / ?limit= query params can't be used."""
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Build an opaque cursor pointing just past the row with id=last_id.
+    """
+    raw = json.dumps({"id": last_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Turn a cursor from encode_cursor back into the last seen id.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        return int(data["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise PaginationError("Invalid cursor") from e
+
+
+def wants_cursor_page() -> bool:
+    """
+    True when the client asked for cursor mode (?after= or ?limit=).
+    """
+    return "after" in request.args or "limit" in request.args
+
+
+def parse_cursor_args():
+    """
+    Read after/limit/include_total from the query string.
+    Returns (after_id or None, limit, include_total).
+    """
+    after = request.args.get("after")
+    after_id = decode_cursor(after) if after else None
+
+    try:
+        limit = int(request.args.get("limit", DEFAULT_LIMIT))
+    except ValueError as e:
+        raise PaginationError("limit must be an integer") from e
+    if limit < 1:
+        raise PaginationError("limit must be at least 1")
+    limit = min(limit, MAX_LIMIT)
+
+    include_total = request.args.get("include_total", "").lower() in ("1", "true", "yes")
+    return after_id, limit, include_total
+
+
+def keyset_statements(stmt, id_column):
+    """
+    Page query for `stmt` ordered by `id_column`, plus the COUNT(*) query
+    when the client passed ?include_total=true (else None), and the limit.
+
+    Uses WHERE id > :after ORDER BY id LIMIT :limit + 1 instead of OFFSET,
+    so page 10,000 costs the same as page 1.
+    """
+    after_id, limit, include_total = parse_cursor_args()
+
+    page_stmt = stmt
+    if after_id is not None:
+        page_stmt = page_stmt.where(id_column > after_id)
+    page_stmt = page_stmt.order_by(id_column).limit(limit + 1)
+
+    count_stmt = None
+    if include_total:
+        count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+    return page_stmt, count_stmt, limit
+
+
+def keyset_result(rows, limit: int, schema, total=None) -> dict:
+    """
+    The page body for the `limit + 1` rows fetched by keyset_statements.
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    result = {
+        "items": schema.dump(rows),
+        "limit": limit,
+        "next_cursor": encode_cursor(rows[-1].id) if has_more else None,
+    }
+    if total is not None:
+        result["total"] = total
+    return result
+
+
+def keyset_paginate(stmt, id_column, schema) -> dict:
+    """
+    Run `stmt` as one keyset page ordered by `id_column` (see keyset_statements).
+    """
+    page_stmt, count_stmt, limit = keyset_statements(stmt, id_column)
+    rows = db.session.execute(page_stmt).scalars().unique().all()
+    total = db.session.execute(count_stmt).scalar_one() if count_stmt is not None else None
+    return keyset_result(rows, limit, schema, total)
+
+
+async def keyset_paginate_async(session, stmt, id_column, schema) -> dict:
+    """
+    keyset_paginate() on an AsyncSession (see app/asgi.py).
+    """
+    page_stmt, count_stmt, limit = keyset_statements(stmt, id_column)
+    rows = (await session.execute(page_stmt)).scalars().unique().all()
+    total = (await session.execute(count_stmt)).scalar_one() if count_stmt is not None else None
+    return keyset_result(rows, limit, schema, total)
+
+
+def collection_response(stmt, id_column, schema, order_by=()):
+    """
+    GET response for a collection: one keyset page when the client asked for
+    cursor mode (see wants_cursor_page), else every row of `stmt` in
+    `order_by` order. A bad cursor / limit is a 400.
+    """
+    if wants_cursor_page():
+        try:
+            result = keyset_paginate(stmt, id_column, schema)
+        except PaginationError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(result), 200
+
+    rows = db.session.execute(stmt.order_by(*order_by)).scalars().all()
+    return schema.jsonify(rows), 200
+
+
+async def collection_response_async(session, stmt, id_column, schema, order_by=()):
+    """
+    collection_response() on an AsyncSession (see app/asgi.py).
+    """
+    if wants_cursor_page():
+        try:
+            result = await keyset_paginate_async(session, stmt, id_column, schema)
+        except PaginationError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(result), 200
+
+    rows = (await session.execute(stmt.order_by(*order_by))).scalars().all()
+    return schema.jsonify(rows), 200
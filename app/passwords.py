@@ -0,0 +1,125 @@
+import hmac
+import itertools
+import re
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# "<method>$<salt>$<hex digest>" as written by werkzeug's generate_password_hash
+HASH_FORMAT = re.compile(r"^(pbkdf2|scrypt):[^$]+\$[^$]+\$[0-9a-f]+$")
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Raised when every hashing worker and queue slot is taken."""
+
+
+class PasswordHasher:
+    """
+    Caps the KDFs running at once in this process: at most `workers` run,
+    up to `queue` more wait for a turn, and any beyond that are rejected
+    (PasswordPoolBusy -> 503) instead of piling up. The KDF runs in the
+    calling thread, so this only matters with several request threads per
+    process (gunicorn gthread workers, the ASGI thread pool); a sync worker
+    serves one request at a time and is busy for the whole hash either way.
+    """
+
+    def __init__(self, workers: int, queue: int):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self._running = threading.BoundedSemaphore(workers)
+
+    def _call(self, fn, *args):
+        with self._running:
+            return fn(*args)
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolBusy("Password hashing pool is saturated")
+        try:
+            return self._call(fn, *args)
+        finally:
+            self._slots.release()
+
+    def map(self, fn, *iterables) -> list:
+        # Batch jobs (bulk imports) wait their turn instead of being rejected.
+        # hashlib's scrypt/pbkdf2 release the GIL, so a batch is hashed on
+        # `workers` threads in parallel.
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-kdf") as pool:
+            return list(pool.map(self._call, itertools.repeat(fn), *iterables))
+
+
+def _hasher() -> PasswordHasher:
+    hasher = current_app.extensions.get("password_hasher")
+    if hasher is None:
+        hasher = PasswordHasher(
+            current_app.config.get("PASSWORD_HASH_WORKERS", 4),
+            current_app.config.get("PASSWORD_HASH_QUEUE", 16),
+        )
+        current_app.extensions["password_hasher"] = hasher
+    return hasher
+
+
+def _method() -> str:
+    return current_app.config.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash a password with the configured method (PASSWORD_HASH_METHOD).
+    """
+    return _hasher().run(generate_password_hash, password, _method())
+
+
+def hash_passwords(passwords: list) -> list:
+    """
+    Hash many passwords in parallel on the pool (bulk customer imports).
+    """
+    method = _method()
+    return _hasher().map(generate_password_hash, passwords, [method] * len(passwords))
+
+
+def _dummy_hash() -> str:
+    """
+    Hash of a random password with the configured method, made once per
+    method. Checked against when there is no real hash to check, and its
+    prefix is the method as werkzeug writes it (defaults filled in).
+    """
+    method = _method()
+    hashes = current_app.extensions.setdefault("password_dummy_hashes", {})
+    if method not in hashes:
+        hashes[method] = _hasher().run(generate_password_hash, secrets.token_hex(16), method)
+    return hashes[method]
+
+
+def verify_password(stored, password: str) -> bool:
+    """
+    Check a password against a stored hash. Rows from before hashing
+    (plain text) still verify, and password_needs_rehash() flags them.
+
+    `stored` None (no such account) runs the KDF against a dummy hash and
+    returns False, so a login takes as long for an unknown email as for a
+    registered one and doesn't reveal which emails exist.
+    """
+    if stored is None:
+        _hasher().run(check_password_hash, _dummy_hash(), password)
+        return False
+    if not HASH_FORMAT.match(stored):
+        # Same cost as a hashed row, for the same reason
+        _hasher().run(check_password_hash, _dummy_hash(), password)
+        return hmac.compare_digest(stored.encode(), password.encode())
+    return _hasher().run(check_password_hash, stored, password)
+
+
+def password_needs_rehash(stored: str) -> bool:
+    """
+    True for plain-text rows and hashes made with a different method/cost.
+    Compared with a hash werkzeug made from PASSWORD_HASH_METHOD, so a
+    method given without its cost (e.g. "scrypt") still matches the
+    "scrypt:32768:8:1$..." hashes it produces.
+    """
+    if not HASH_FORMAT.match(stored):
+        return True
+    return stored.split("$", 1)[0] != _dummy_hash().split("$", 1)[0]
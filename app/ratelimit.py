@@ -0,0 +1,238 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qs
+
+from flask import g, has_request_context
+from limits.storage import MovingWindowSupport, Storage
+
+_stats = {"checks": 0, "check_seconds": 0.0, "check_seconds_max": 0.0, "failures": 0}
+_stats_lock = threading.Lock()
+
+
+def ratelimit_stats() -> dict:
+    """
+    Limit-check counters for this process: number of checks, total and
+    worst check latency (seconds), and storage errors the limiter let
+    through (RATELIMIT_SWALLOW_ERRORS) or fell back to memory on.
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _record_check(seconds: float):
+    with _stats_lock:
+        _stats["checks"] += 1
+        _stats["check_seconds"] += seconds
+        _stats["check_seconds_max"] = max(_stats["check_seconds_max"], seconds)
+    if has_request_context():
+        # Per-request share, reported in the Server-Timing header
+        g.ratelimit_seconds = g.get("ratelimit_seconds", 0.0) + seconds
+
+
+class _FailureCounter(logging.Handler):
+    # Flask-Limiter logs a warning or an error (and carries on) whenever the
+    # storage fails under RATELIMIT_SWALLOW_ERRORS / IN_MEMORY_FALLBACK
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+
+    def emit(self, record):
+        with _stats_lock:
+            _stats["failures"] += 1
+
+
+_failure_counter = _FailureCounter()
+
+
+# CHECK TIMING
+# The limiter's before_request hook runs between these two; a breached
+# limit raises out of it, so on_breach ends the timing instead. Limits set
+# with @limiter.limit on a route are checked inside the view.
+
+def _start_check():
+    g._ratelimit_start = time.perf_counter()
+
+
+def end_check(request_limit=None):
+    """
+    Stop timing the limit check of the current request (also the
+    limiter's on_breach callback). A no-op when none is running.
+    """
+    if not has_request_context():
+        return None
+    start = g.pop("_ratelimit_start", None)
+    if start is not None:
+        _record_check(time.perf_counter() - start)
+    return None
+
+
+def init_ratelimit(app, limiter):
+    """
+    limiter.init_app(app), with every check timed and storage failures
+    counted in ratelimit_stats().
+    """
+    if not app.config.get("RATELIMIT_ENABLED", limiter.enabled):
+        limiter.init_app(app)
+        return
+
+    # before_request hooks run in order: ours go right around the limiter's
+    app.before_request(_start_check)
+    limiter.init_app(app)
+    app.before_request(end_check)
+
+    if _failure_counter not in limiter.logger.handlers:
+        limiter.logger.addHandler(_failure_counter)
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """
+    Rate limit storage in a SQLite file, shared by every worker on the host
+    (the in-memory storage counts per worker). Same URI style as
+    SQLAlchemy: sqlite:///relative.db or sqlite:////absolute/path.db.
+
+    `?timeout=` (seconds, default 0.05) bounds how long a check waits on a
+    locked file before raising, which the limiter turns into a fail-open.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+    PRUNE_EVERY = 1000  # operations between sweeps of expired rows
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        self.path, _, query = uri[len("sqlite:///"):].partition("?")
+        self.timeout = float(parse_qs(query).get("timeout", [options.get("timeout", 0.05)])[0])
+        self._local = threading.local()
+        self._ops = 0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._create_tables()
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, and a new one after a fork (gunicorn --preload)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _create_tables(self):
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ratelimit_counters ("
+            "key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ratelimit_events ("
+            "key TEXT NOT NULL, at REAL NOT NULL, expires REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_ratelimit_events_key_at ON ratelimit_events (key, at)"
+        )
+
+    def _maybe_prune(self, conn: sqlite3.Connection, now: float):
+        self._ops += 1
+        if self._ops % self.PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM ratelimit_counters WHERE expires <= ?", (now,))
+            conn.execute("DELETE FROM ratelimit_events WHERE expires <= ?", (now,))
+
+    # FIXED WINDOW COUNTERS
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "DELETE FROM ratelimit_counters WHERE key = ? AND expires <= ?", (key, now)
+            )
+            value = conn.execute(
+                "INSERT INTO ratelimit_counters (key, value, expires) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = value + excluded.value "
+                "RETURNING value",
+                (key, amount, now + expiry),
+            ).fetchone()[0]
+            self._maybe_prune(conn, now)
+        return value
+
+    def get(self, key: str) -> int:
+        row = self._connection().execute(
+            "SELECT value FROM ratelimit_counters WHERE key = ? AND expires > ?",
+            (key, time.time()),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT expires FROM ratelimit_counters WHERE key = ? AND expires > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    # MOVING WINDOW
+
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            # IMMEDIATE takes the write lock up front, so count + insert is atomic
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "DELETE FROM ratelimit_events WHERE key = ? AND at <= ?", (key, now - expiry)
+            )
+            (count,) = conn.execute(
+                "SELECT count(*) FROM ratelimit_events WHERE key = ?", (key,)
+            ).fetchone()
+            if count + amount > limit:
+                return False
+            conn.executemany(
+                "INSERT INTO ratelimit_events (key, at, expires) VALUES (?, ?, ?)",
+                [(key, now, now + expiry)] * amount,
+            )
+            self._maybe_prune(conn, now)
+        return True
+
+    def get_moving_window(self, key: str, limit: int, expiry: int) -> tuple:
+        now = time.time()
+        oldest, count = self._connection().execute(
+            "SELECT min(at), count(*) FROM ("
+            "SELECT at FROM ratelimit_events WHERE key = ? AND at > ? "
+            "ORDER BY at DESC LIMIT ?)",
+            (key, now - expiry, limit),
+        ).fetchone()
+        return (oldest, count) if count else (now, 0)
+
+    # HOUSEKEEPING
+
+    def check(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cleared = conn.execute("DELETE FROM ratelimit_counters").rowcount
+            cleared += conn.execute("DELETE FROM ratelimit_events").rowcount
+        return cleared
+
+    def clear(self, key: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM ratelimit_counters WHERE key = ?", (key,))
+            conn.execute("DELETE FROM ratelimit_events WHERE key = ?", (key,))
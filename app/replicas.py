@@ -0,0 +1,275 @@
+import hashlib
+import itertools
+import os
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.dbpool import timed_pool_options
+from config import engine_options
+
+# Read replicas (REPLICA_DATABASE_URIS). During a GET/HEAD request db.session
+# reads from one replica, picked round-robin among the healthy ones. Flushes,
+# insert()/update()/delete() and everything outside such requests use the
+# primary. A client that just committed a write is pinned to the primary for
+# REPLICA_STICKY_SECONDS, so it reads its own writes despite replication lag.
+# Cached / ETagged views also read from the primary for REPLICA_STICKY_SECONDS
+# after one of their tables changed, so a lagging replica's old rows never get
+# cached or ETagged under the new tag versions (see read_primary_if_recent).
+
+READ_METHODS = ("GET", "HEAD")
+
+_stats = {"replica": 0, "primary": 0, "health_failures": 0, "recent_write_reads": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name: str, amount: int = 1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def replica_stats() -> dict:
+    """
+    Read requests routed to a replica / kept on the primary, failed
+    health checks, and replica reads moved to the primary because their
+    tables had just changed, for this process.
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+class ReplicaSet:
+    """
+    Round-robin over the replica engines (name -> Engine), skipping any that
+    failed its last health check (SELECT 1, re-run at most every
+    `check_interval` seconds).
+    """
+
+    def __init__(self, engines: dict, check_interval: float):
+        self.engines = dict(engines)
+        self.names = list(self.engines)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._next = itertools.count()
+        # name -> (healthy, monotonic time of the last check)
+        self._health = {name: (True, float("-inf")) for name in self.names}
+
+    def is_healthy(self, name: str) -> bool:
+        healthy, checked_at = self._health[name]
+        if time.monotonic() - checked_at < self.check_interval:
+            return healthy
+
+        with self._lock:
+            healthy, checked_at = self._health[name]
+            if time.monotonic() - checked_at < self.check_interval:
+                return healthy
+            # Claim this round: other threads keep the last status meanwhile
+            self._health[name] = (healthy, time.monotonic())
+
+        try:
+            with self.engines[name].connect() as conn:
+                conn.execute(text("SELECT 1"))
+            healthy = True
+        except SQLAlchemyError:
+            healthy = False
+            _count("health_failures")
+        self._health[name] = (healthy, time.monotonic())
+        return healthy
+
+    def pick(self):
+        """
+        Next healthy replica engine, or None when all of them are down.
+        """
+        for _ in range(len(self.names)):
+            name = self.names[next(self._next) % len(self.names)]
+            if self.is_healthy(name):
+                return self.engines[name]
+        return None
+
+
+class RoutingSession(Session):
+    """
+    db.session class. Reads use session.info["read_bind"] when a request
+    set one (see _route_request); writes always go to the primary.
+    A session created with bind=<Connection> uses only that connection,
+    as plain SQLAlchemy sessions do (the test fixtures rely on it).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.bind is not None:
+            return self.bind
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase):
+            read_bind = self.info.get("read_bind")
+            if read_bind is not None:
+                return read_bind
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+# READ-YOUR-WRITES
+# Pins live in the cache backend, so with several workers this needs a
+# shared backend (see CACHE_TYPE), like the cache tag versions.
+
+def _sticky_key() -> str:
+    # The token identifies a customer across addresses; else the address
+    client = request.headers.get("Authorization") or request.remote_addr or ""
+    return "replica:sticky:" + hashlib.sha1(client.encode()).hexdigest()
+
+
+def _is_pinned() -> bool:
+    from app.extensions import cache
+
+    return cache.get(_sticky_key()) is not None
+
+
+def pinned_to_primary() -> bool:
+    """
+    True while the current client reads from the primary after a write.
+    Response caches must not answer such requests: a cached body may
+    predate the write (it may have been read from a lagging replica).
+    """
+    return has_request_context() and g.get("replica_pinned", False)
+
+
+def _pin_to_primary():
+    from app.extensions import cache
+
+    cache.set(_sticky_key(), 1, timeout=current_app.config["REPLICA_STICKY_SECONDS"])
+
+
+# FRESHLY WRITTEN TABLES
+# Marks live in the cache backend next to the tag versions they guard.
+
+def _recent_key(tag: str) -> str:
+    return f"replica:recent:{tag}"
+
+
+def note_recent_writes(tags):
+    """
+    Remember for REPLICA_STICKY_SECONDS that `tags` (tables) just changed
+    on the primary. Called whenever cache tags are bumped.
+    """
+    if not tags or "replicas" not in current_app.extensions:
+        return
+    from app.extensions import cache
+
+    cache.set_many(
+        {_recent_key(tag): 1 for tag in tags},
+        timeout=current_app.config["REPLICA_STICKY_SECONDS"],
+    )
+
+
+def read_primary_if_recent(tags):
+    """
+    For views cached / ETagged by `tags`: if this request reads from a
+    replica and one of the tags changed within REPLICA_STICKY_SECONDS, read
+    from the primary instead. Otherwise a replica that hasn't caught up yet
+    would have its old rows cached (and ETagged) under the new tag version,
+    and served to everyone until the next write.
+    """
+    if not has_request_context() or "replicas" not in current_app.extensions:
+        return
+    session = current_app.extensions["sqlalchemy"].session
+    if session.info.get("read_bind") is None:
+        return
+
+    from app.extensions import cache
+
+    if any(mark is not None for mark in cache.get_many(*[_recent_key(tag) for tag in tags])):
+        session.info.pop("read_bind", None)
+        _count("recent_write_reads")
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _note_flush(session, flush_context):
+    session.info["replica_wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _note_dml(orm_execute_state):
+    # Bulk insert()/update()/delete() statements skip the flush entirely
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["replica_wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _pin_after_write(session):
+    if not session.info.pop("replica_wrote", False):
+        return
+    # The rest of this request reads what it just wrote, too
+    session.info.pop("read_bind", None)
+    if has_request_context() and "replicas" in current_app.extensions:
+        _pin_to_primary()
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_write(session):
+    session.info.pop("replica_wrote", None)
+
+
+# REQUEST HOOKS
+
+def _route_request():
+    if request.method not in READ_METHODS:
+        return
+
+    g.replica_pinned = _is_pinned()
+    if g.replica_pinned:
+        _count("primary")
+        return
+
+    replica = current_app.extensions["replicas"].pick()
+    if replica is None:
+        _count("primary")
+        return
+    current_app.extensions["sqlalchemy"].session.info["read_bind"] = replica
+    _count("replica")
+
+
+def _clear_route(exc):
+    # The session outlives the request when a test holds the app context
+    current_app.extensions["sqlalchemy"].session.info.pop("read_bind", None)
+
+
+def replica_engines(app) -> dict:
+    """
+    The app's replica engines by name (replica_0, ...); empty without replicas.
+    """
+    replicas = app.extensions.get("replicas")
+    return replicas.engines if replicas is not None else {}
+
+
+def _resolve_sqlite_path(app, uri: str) -> str:
+    # Relative SQLite paths live in the instance folder, as for the primary
+    url = make_url(uri)
+    if url.drivername.startswith("sqlite") and url.database and url.database != ":memory:":
+        if not os.path.isabs(url.database):
+            url = url.set(database=os.path.join(app.instance_path, url.database))
+    return url.render_as_string(hide_password=False)
+
+
+def init_replicas(app):
+    """
+    Create an engine per REPLICA_DATABASE_URIS entry and route read
+    requests to them. A no-op without replicas.
+
+    Replicas are not Flask-SQLAlchemy binds: no model lives on them, and
+    create_all() / migrations must only ever run against the primary.
+    """
+    uris = app.config.get("REPLICA_DATABASE_URIS") or []
+    if not uris:
+        return
+
+    engines = {}
+    for i, uri in enumerate(uris):
+        uri = _resolve_sqlite_path(app, uri)
+        engines[f"replica_{i}"] = create_engine(uri, **timed_pool_options(uri, engine_options(uri)))
+
+    app.extensions["replicas"] = ReplicaSet(engines, app.config["REPLICA_HEALTH_INTERVAL"])
+    app.before_request(_route_request)
+    app.teardown_request(_clear_route)
@@ -0,0 +1,143 @@
+import re
+
+from sqlalchemy import DDL, event, text
+
+from app.extensions import db
+from app.models import ticket_inventory
+
+# One search document per ticket: description, vehicle and the names of its parts.
+# SQLite: an FTS5 table keyed by rowid = ticket id, ranked with bm25().
+# Postgres: a tsvector per ticket with a GIN index, ranked with ts_rank_cd().
+# Triggers keep the index current on every insert/update/delete, so
+# there's never a full rebuild. The same DDL ships in migration 0004.
+
+SQLITE_PARTS_FOR = (
+    "SELECT coalesce(group_concat(i.name, ' '), '') FROM ticket_inventory ti "
+    "JOIN inventory i ON i.id = ti.inventory_id WHERE ti.service_ticket_id = {ticket}"
+)
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS service_tickets_fts "
+    "USING fts5(description, vehicle, parts, tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS service_tickets_fts_ai AFTER INSERT ON service_tickets BEGIN "
+    "INSERT INTO service_tickets_fts (rowid, description, vehicle, parts) "
+    "VALUES (new.id, new.description, coalesce(new.vehicle, ''), ''); END",
+    "CREATE TRIGGER IF NOT EXISTS service_tickets_fts_au "
+    "AFTER UPDATE OF description, vehicle ON service_tickets BEGIN "
+    "UPDATE service_tickets_fts SET description = new.description, "
+    "vehicle = coalesce(new.vehicle, '') WHERE rowid = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS service_tickets_fts_ad AFTER DELETE ON service_tickets BEGIN "
+    "DELETE FROM service_tickets_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS service_tickets_fts_parts_ai AFTER INSERT ON ticket_inventory BEGIN "
+    "UPDATE service_tickets_fts SET parts = ("
+    + SQLITE_PARTS_FOR.format(ticket="new.service_ticket_id")
+    + ") WHERE rowid = new.service_ticket_id; END",
+    "CREATE TRIGGER IF NOT EXISTS service_tickets_fts_parts_ad AFTER DELETE ON ticket_inventory BEGIN "
+    "UPDATE service_tickets_fts SET parts = ("
+    + SQLITE_PARTS_FOR.format(ticket="old.service_ticket_id")
+    + ") WHERE rowid = old.service_ticket_id; END",
+    "CREATE TRIGGER IF NOT EXISTS service_tickets_fts_inventory_au "
+    "AFTER UPDATE OF name ON inventory BEGIN "
+    "UPDATE service_tickets_fts SET parts = ("
+    + SQLITE_PARTS_FOR.format(ticket="service_tickets_fts.rowid")
+    + ") WHERE rowid IN (SELECT service_ticket_id FROM ticket_inventory "
+    "WHERE inventory_id = new.id); END",
+]
+
+POSTGRES_DDL = [
+    "CREATE TABLE IF NOT EXISTS service_tickets_fts ("
+    "ticket_id INTEGER PRIMARY KEY REFERENCES service_tickets (id) ON DELETE CASCADE, "
+    "document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_service_tickets_fts_document "
+    "ON service_tickets_fts USING GIN (document)",
+    "CREATE OR REPLACE FUNCTION service_tickets_fts_refresh(tid INTEGER) RETURNS void AS $$ "
+    "INSERT INTO service_tickets_fts (ticket_id, document) "
+    "SELECT t.id, "
+    "setweight(to_tsvector('english', coalesce(t.description, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(t.vehicle, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(("
+    "SELECT string_agg(i.name, ' ') FROM ticket_inventory ti "
+    "JOIN inventory i ON i.id = ti.inventory_id WHERE ti.service_ticket_id = t.id"
+    "), '')), 'C') "
+    "FROM service_tickets t WHERE t.id = tid "
+    "ON CONFLICT (ticket_id) DO UPDATE SET document = EXCLUDED.document; "
+    "$$ LANGUAGE sql",
+    "CREATE OR REPLACE FUNCTION service_tickets_fts_ticket_trg() RETURNS trigger AS $$ "
+    "BEGIN PERFORM service_tickets_fts_refresh(NEW.id); RETURN NULL; END "
+    "$$ LANGUAGE plpgsql",
+    "CREATE OR REPLACE FUNCTION service_tickets_fts_parts_trg() RETURNS trigger AS $$ "
+    "BEGIN "
+    "IF TG_OP = 'DELETE' THEN PERFORM service_tickets_fts_refresh(OLD.service_ticket_id); "
+    "ELSE PERFORM service_tickets_fts_refresh(NEW.service_ticket_id); END IF; "
+    "RETURN NULL; END "
+    "$$ LANGUAGE plpgsql",
+    "CREATE OR REPLACE FUNCTION service_tickets_fts_inventory_trg() RETURNS trigger AS $$ "
+    "BEGIN PERFORM service_tickets_fts_refresh(ti.service_ticket_id) "
+    "FROM ticket_inventory ti WHERE ti.inventory_id = NEW.id; RETURN NULL; END "
+    "$$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS service_tickets_fts_ticket ON service_tickets",
+    "CREATE TRIGGER service_tickets_fts_ticket "
+    "AFTER INSERT OR UPDATE OF description, vehicle ON service_tickets "
+    "FOR EACH ROW EXECUTE FUNCTION service_tickets_fts_ticket_trg()",
+    "DROP TRIGGER IF EXISTS service_tickets_fts_parts ON ticket_inventory",
+    "CREATE TRIGGER service_tickets_fts_parts AFTER INSERT OR DELETE ON ticket_inventory "
+    "FOR EACH ROW EXECUTE FUNCTION service_tickets_fts_parts_trg()",
+    "DROP TRIGGER IF EXISTS service_tickets_fts_inventory ON inventory",
+    "CREATE TRIGGER service_tickets_fts_inventory AFTER UPDATE OF name ON inventory "
+    "FOR EACH ROW EXECUTE FUNCTION service_tickets_fts_inventory_trg()",
+]
+
+DROP_DDL = "DROP TABLE IF EXISTS service_tickets_fts"
+
+
+# db.create_all() / drop_all() (tests, fresh dev databases) build the index too.
+# ticket_inventory is created last / dropped first, so every table exists here.
+for statement in SQLITE_DDL:
+    event.listen(ticket_inventory, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_DDL:
+    event.listen(ticket_inventory, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+event.listen(
+    ticket_inventory,
+    "before_drop",
+    DDL(DROP_DDL).execute_if(dialect=("sqlite", "postgresql")),
+)
+
+
+def _fts5_query(q: str) -> str:
+    """
+    Turn free text into a safe FTS5 query: every word must match, as a prefix.
+    """
+    words = re.findall(r"\w+", q)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_ticket_ids(q: str, limit: int, offset: int = 0) -> list:
+    """
+    Ids of tickets matching `q`, best match first. Description hits weigh
+    more than vehicle hits, which weigh more than part names.
+    """
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        match = _fts5_query(q)
+        if not match:
+            return []
+        stmt = text(
+            "SELECT rowid FROM service_tickets_fts WHERE service_tickets_fts MATCH :match "
+            "ORDER BY bm25(service_tickets_fts, 10.0, 5.0, 1.0), rowid "
+            "LIMIT :limit OFFSET :offset"
+        )
+        params = {"match": match, "limit": limit, "offset": offset}
+    elif dialect == "postgresql":
+        stmt = text(
+            "SELECT ticket_id FROM service_tickets_fts, "
+            "websearch_to_tsquery('english', :q) AS query "
+            "WHERE document @@ query "
+            "ORDER BY ts_rank_cd(document, query) DESC, ticket_id "
+            "LIMIT :limit OFFSET :offset"
+        )
+        params = {"q": q, "limit": limit, "offset": offset}
+    else:
+        raise RuntimeError(f"Full-text search is not available on {dialect}")
+
+    return list(db.session.execute(stmt, params).scalars())
@@ -0,0 +1,145 @@
+import keyword
+from collections.abc import Mapping
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+from marshmallow import fields
+from marshmallow_sqlalchemy.fields import Related, RelatedList
+
+from app.extensions import ma
+
+# Hot lists spend most of their time in marshmallow's per-row, per-field
+# dispatch and in the stdlib JSON encoder. CompiledSchema turns each schema
+# into one generated `obj -> dict` function (built once per schema instance);
+# FastJSONProvider encodes with orjson. Output is unchanged.
+
+
+def _related_key(field):
+    """
+    The single primary key attribute a Related field dumps, or None
+    (composite keys keep the generic path).
+    """
+    keys = [prop.key for prop in field.related_keys]
+    return keys[0] if len(keys) == 1 else None
+
+
+def _related_list(values, key):
+    if values is None:
+        return None
+    return [getattr(value, key, None) for value in values]
+
+
+def _nested_list(values, serializer):
+    if values is None:
+        return None
+    return [serializer(value) for value in values]
+
+
+def _nested_serializer(field):
+    """
+    Compiled serializer of a List(Nested(<CompiledSchema>)) field's schema,
+    or None.
+    """
+    inner = field.inner
+    if not isinstance(inner, fields.Nested) or not isinstance(inner.schema, CompiledSchema):
+        return None
+    return compile_serializer(inner.schema)
+
+
+def compile_serializer(schema):
+    """
+    Generate `obj -> dict` for `schema`: one dict display that reads each
+    attribute directly and hands it to the field's own _serialize(), so the
+    values are exactly what dump() produces. Related / RelatedList fields
+    (ids of related rows) are inlined, with their key resolved once, and a
+    List(Nested(...)) of another compiled schema calls its serializer. None
+    when the schema needs the full dump machinery (pre/post_dump hooks,
+    dotted attributes).
+    """
+    if schema._hooks.get("pre_dump") or schema._hooks.get("post_dump"):
+        return None
+
+    namespace = {"_related_list": _related_list, "_nested_list": _nested_list}
+    items = []
+    for i, (name, field) in enumerate(schema.dump_fields.items()):
+        attr = field.attribute or name
+        if not attr.isidentifier() or keyword.iskeyword(attr):
+            return None
+        key = repr(field.data_key or name)
+
+        if isinstance(field, RelatedList) and _related_key(field.inner):
+            items.append(f"{key}: _related_list(obj.{attr}, {_related_key(field.inner)!r})")
+        elif isinstance(field, fields.List) and _nested_serializer(field):
+            namespace[f"_s{i}"] = _nested_serializer(field)
+            items.append(f"{key}: _nested_list(obj.{attr}, _s{i})")
+        elif isinstance(field, Related) and _related_key(field):
+            items.append(f"{key}: getattr(obj.{attr}, {_related_key(field)!r}, None)")
+        else:
+            namespace[f"_f{i}"] = field._serialize
+            items.append(f"{key}: _f{i}(obj.{attr}, {attr!r}, obj)")
+
+    source = "def serialize(obj):\n    return {" + ", ".join(items) + "}\n"
+    exec(compile(source, f"<serializer {type(schema).__name__}>", "exec"), namespace)
+    return namespace["serialize"]
+
+
+class CompiledSchema(ma.SQLAlchemyAutoSchema):
+    """
+    dump() of model instances through compile_serializer(). Plain dicts,
+    objects missing one of the attributes (and schemas it can't compile)
+    go through marshmallow as before.
+    """
+
+    _serializer = None
+
+    def dump(self, obj, *, many=None):
+        serializer = self._serializer
+        if serializer is None:
+            serializer = self._serializer = compile_serializer(self) or False
+        if serializer is False:
+            return super().dump(obj, many=many)
+
+        many = self.many if many is None else bool(many)
+        if not many:
+            if isinstance(obj, Mapping):
+                return super().dump(obj, many=False)
+            try:
+                return serializer(obj)
+            except AttributeError:
+                # Not a full model instance: marshmallow leaves missing keys out
+                return super().dump(obj, many=False)
+
+        items = obj if isinstance(obj, (list, tuple)) else list(obj)
+        if items and isinstance(items[0], Mapping):
+            return super().dump(items, many=True)
+        try:
+            return [serializer(item) for item in items]
+        except AttributeError:
+            return super().dump(items, many=True)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask's JSON provider on orjson: same output (sorted keys, indented in
+    debug, Flask's defaults for dates / decimals / UUIDs), encoded natively.
+    Non-ASCII is emitted as UTF-8 instead of \\u escapes.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if set(kwargs) - {"sort_keys", "indent", "separators"}:
+            # e.g. a custom cls / default: leave it to the stdlib encoder
+            return super().dumps(obj, **kwargs)
+
+        # Datetimes are passed through to keep Flask's HTTP-date format
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        # separators: orjson output is always compact
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
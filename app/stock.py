@@ -0,0 +1,73 @@
+from sqlalchemy import insert, or_, update
+
+from app.extensions import db
+from app.models import Inventory, ServiceTicket, ticket_inventory
+
+# Stock is reserved with one conditional UPDATE: the check and the decrement
+# happen in the same statement, so concurrent add-part requests can't both
+# take the last unit (no read-modify-write, only the item's row is locked).
+# Items with stock NULL are not stock-tracked and can always be added.
+# The item's version_id (its ETag) moves with the stock, and the ticket's
+# with its parts.
+
+
+def reserve_stock(inventory_id: int, quantity: int) -> bool:
+    """
+    Take `quantity` units of an item out of stock. False (nothing changed)
+    when the item doesn't exist or has fewer units left.
+    """
+    stmt = (
+        update(Inventory)
+        .where(
+            Inventory.id == inventory_id,
+            or_(Inventory.stock.is_(None), Inventory.stock >= quantity),
+        )
+        .values(stock=Inventory.stock - quantity, version_id=Inventory.version_id + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).rowcount == 1
+
+
+def add_ticket_part(ticket_id: int, inventory_id: int, quantity: int):
+    """
+    Put `quantity` units of a part on a ticket: inserts the ticket_inventory
+    row, or adds to its quantity if the part is already on the ticket.
+    Bumps the ticket's version_id, as its output changes.
+    """
+    db.session.execute(
+        update(ServiceTicket)
+        .where(ServiceTicket.id == ticket_id)
+        .values(version_id=ServiceTicket.version_id + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+    link = ticket_inventory.c
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as upsert
+
+        stmt = upsert(ticket_inventory).values(
+            service_ticket_id=ticket_id, inventory_id=inventory_id, quantity=quantity
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[link.inventory_id, link.service_ticket_id],
+            set_={"quantity": link.quantity + stmt.excluded.quantity},
+        )
+        db.session.execute(stmt)
+        return
+
+    added = db.session.execute(
+        update(ticket_inventory)
+        .where(link.service_ticket_id == ticket_id, link.inventory_id == inventory_id)
+        .values(quantity=link.quantity + quantity)
+    ).rowcount
+    if not added:
+        db.session.execute(
+            insert(ticket_inventory).values(
+                service_ticket_id=ticket_id, inventory_id=inventory_id, quantity=quantity
+            )
+        )
@@ -0,0 +1,77 @@
+from flask import Response, current_app, request, stream_with_context
+from sqlalchemy import inspect, select
+
+from app.extensions import db
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500
+
+
+def wants_ndjson() -> bool:
+    """
+    True when the client prefers NDJSON (Accept: application/x-ndjson).
+    """
+    best = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def wants_stream() -> bool:
+    """
+    True for ?stream=true (chunked JSON array) or an NDJSON Accept header.
+    """
+    stream = request.args.get("stream", "").lower() in ("1", "true", "yes")
+    return stream or wants_ndjson()
+
+
+def _load_batch(batch: list, options):
+    """
+    Run `options` (relationship loaders) for one batch of already loaded
+    objects: a single `WHERE pk IN (...)` query fills them in place.
+    """
+    mapper = inspect(batch[0]).mapper
+    pk = mapper.primary_key[0]
+    ids = [mapper.primary_key_from_instance(obj)[0] for obj in batch]
+    db.session.execute(select(mapper).where(pk.in_(ids)).options(*options)).scalars().all()
+
+
+def stream_collection(
+    stmt, schema, batch_size: int = STREAM_BATCH_SIZE, batch_options=()
+) -> Response:
+    """
+    Stream every row of `stmt` without holding the whole result in memory.
+
+    Rows are fetched with yield_per and dumped `batch_size` at a time, so
+    peak memory depends on the batch size, not the table size. `schema`
+    must be a many=True schema. The body is a JSON array sent in chunks,
+    or one JSON object per line when the client asked for NDJSON.
+
+    Relationship loaders go in `batch_options`, not on `stmt`: they run
+    once per batch. (Collection eager loaders on a yield_per query fail
+    as soon as any do_orm_execute hook is registered, see app/caching.py.)
+    """
+    ndjson = wants_ndjson()
+    dumps = current_app.json.dumps
+
+    def generate():
+        result = db.session.execute(stmt.execution_options(yield_per=batch_size)).scalars()
+
+        if not ndjson:
+            yield "["
+
+        first = True
+        for batch in result.partitions():
+            if batch_options:
+                _load_batch(batch, batch_options)
+            rows = schema.dump(batch)
+            if ndjson:
+                yield "".join(dumps(row) + "\n" for row in rows)
+            else:
+                chunk = ",".join(dumps(row) for row in rows)
+                yield chunk if first else "," + chunk
+                first = False
+
+        if not ndjson:
+            yield "]"
+
+    mimetype = NDJSON_MIMETYPE if ndjson else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
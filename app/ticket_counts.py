@@ -0,0 +1,94 @@
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session, attributes
+
+from app.models import Mechanic, ServiceTicket, mechanic_service_ticket
+
+
+def ticket_count_update(mechanic_ids=None):
+    """
+    UPDATE that recounts Mechanic.ticket_count for the given ids (all
+    mechanics when None). Each recount is an index range scan on the
+    association table's (mechanic_id, service_ticket_id) primary key.
+    Only rows whose count changes are written, and their version_id (the
+    mechanic's ETag, ticket_count is part of its output) moves with it.
+    """
+    link = mechanic_service_ticket
+    assigned = (
+        select(func.count())
+        .where(link.c.mechanic_id == Mechanic.id)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Mechanic)
+        .where(Mechanic.ticket_count.is_distinct_from(assigned))
+        .values(ticket_count=assigned, version_id=Mechanic.version_id + 1)
+    )
+    if mechanic_ids is not None:
+        stmt = stmt.where(Mechanic.id.in_(set(mechanic_ids)))
+    return stmt.execution_options(synchronize_session=False)
+
+
+def refresh_ticket_counts(session, mechanic_ids=None):
+    """
+    Bring ticket_count up to date for the given mechanics (or all of them,
+    e.g. to backfill an existing database) inside the current transaction.
+    """
+    if mechanic_ids is not None and not mechanic_ids:
+        return
+    session.execute(ticket_count_update(mechanic_ids))
+    _expire_counts(session, mechanic_ids)
+
+
+def _expire_counts(session, mechanic_ids):
+    # Loaded mechanics reload the new count and version on next access
+    # (a stale version_id would make their next UPDATE fail as a conflict)
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Mechanic) and (mechanic_ids is None or obj.id in mechanic_ids):
+            session.expire(obj, ["ticket_count", "version_id"])
+
+
+# KEEPING COUNTS IN SYNC FOR ORM CHANGES
+# (ticket.mechanics.append(...), deleting a ticket, ...). Mechanics whose
+# assignments changed are collected before the flush and recounted after it.
+
+def _pending_mechanics(session) -> set:
+    return session.info.setdefault("ticket_count_mechanics", set())
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_assignments(session, flush_context, instances):
+    pending = _pending_mechanics(session)
+
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, ServiceTicket):
+            history = attributes.get_history(obj, "mechanics")
+            pending.update(history.added)
+            pending.update(history.deleted)
+        elif isinstance(obj, Mechanic):
+            history = attributes.get_history(obj, "service_tickets")
+            if history.added or history.deleted:
+                pending.add(obj)
+
+    for obj in session.deleted:
+        if isinstance(obj, ServiceTicket):
+            # The flush deletes this ticket's association rows too
+            pending.update(obj.mechanics)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _recount_changed_mechanics(session, flush_context):
+    pending = session.info.pop("ticket_count_mechanics", None)
+    if not pending:
+        return
+
+    ids = {m.id for m in pending if m.id is not None and m not in session.deleted}
+    if not ids:
+        return
+
+    session.connection().execute(ticket_count_update(ids))
+    _expire_counts(session, ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_mechanics(session):
+    session.info.pop("ticket_count_mechanics", None)
@@ -0,0 +1,6 @@
+from app.asgi import create_asgi_app
+
+# ASGI app object: `gunicorn -k uvicorn.workers.UvicornWorker asgi_app:app`
+# or `uvicorn asgi_app:app --workers 4` (async DB reads, see app/asgi.py).
+# flask_app.py (WSGI, gunicorn) is unchanged.
+app = create_asgi_app("ProductionConfig")
@@ -0,0 +1,85 @@
+"""
+Login throughput at each password hashing cost.
+
+For every method it creates one customer, then fires concurrent
+POST /customers/login requests through the real app (test client,
+threads) and reports logins/second and p50/p95 latency.
+
+    python -m benchmarks.login_hashing
+    python -m benchmarks.login_hashing --logins 200 --concurrency 8 \
+        --method pbkdf2:sha256:600000 --method scrypt:16384:8:1
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+from app.extensions import db
+
+DEFAULT_METHODS = [
+    "pbkdf2:sha256:100000",
+    "pbkdf2:sha256:600000",
+    "scrypt:16384:8:1",
+    "scrypt:32768:8:1",
+]
+
+
+def bench(method: str, logins: int, concurrency: int, workers: int) -> dict:
+    app = create_app("BenchmarkConfig")
+    app.config.update(
+        PASSWORD_HASH_METHOD=method,
+        PASSWORD_HASH_WORKERS=workers,
+        PASSWORD_HASH_QUEUE=logins,  # measure throughput, not rejections
+    )
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+    client = app.test_client()
+    credentials = {"email": "bench@example.com", "password": "correct horse"}
+    client.post("/customers/", json={"name": "Bench", **credentials})
+
+    def login(_):
+        start = time.perf_counter()
+        status = client.post("/customers/login", json=credentials).status_code
+        return status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        db.drop_all()
+
+    latencies = sorted(duration for _, duration in results)
+    return {
+        "method": method,
+        "ok": sum(1 for status, _ in results if status == 200),
+        "logins_per_s": logins / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--method", action="append", help="werkzeug hash method (repeatable)")
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4, help="PASSWORD_HASH_WORKERS")
+    args = parser.parse_args()
+
+    print(f"{'method':<24} {'ok':>5} {'logins/s':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    for method in args.method or DEFAULT_METHODS:
+        row = bench(method, args.logins, args.concurrency, args.workers)
+        print(
+            f"{row['method']:<24} {row['ok']:>5} {row['logins_per_s']:>10.1f} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Seed a scratch database with configurable volumes for benchmarking.
+
+    python -m benchmarks.seed --customers 1000 --mechanics 100 \
+        --parts 500 --tickets 20000 --mechanics-per-ticket 2 --parts-per-ticket 3
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.models import (
+    Customer,
+    Inventory,
+    Mechanic,
+    ServiceTicket,
+    mechanic_service_ticket,
+    ticket_inventory,
+)
+from app.passwords import hash_password
+from app.ticket_counts import refresh_ticket_counts
+
+# Every seeded customer can log in with its email and this password
+PASSWORD = "benchpass"
+
+VEHICLES = ["Toyota Camry", "Honda Civic", "Ford F-150", "Tesla Model 3", "VW Golf", "BMW 330i"]
+JOBS = ["Brake pads", "Oil change", "Timing belt", "Coolant leak", "Tire rotation", "Alternator"]
+SPECIALIZATIONS = ["Brakes", "Engines", "Electrical", "Tires", "General"]
+STATUSES = ["open", "in_progress", "closed"]
+CHUNK = 5000
+
+
+def _insert(target, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(insert(target), rows[start:start + CHUNK])
+
+
+def seed(
+    customers: int = 200,
+    mechanics: int = 50,
+    parts: int = 200,
+    tickets: int = 2000,
+    mechanics_per_ticket: int = 2,
+    parts_per_ticket: int = 3,
+    random_seed: int = 42,
+) -> dict:
+    """
+    Drop and recreate every table, then bulk insert the requested volumes.
+    Must run inside an app context. Ticket i belongs to customer
+    (i % customers) + 1, so customer 1 always owns tickets.
+    """
+    rng = random.Random(random_seed)
+    now = datetime.utcnow()
+
+    db.drop_all()
+    db.create_all()
+
+    # One KDF run, shared by every row
+    password = hash_password(PASSWORD)
+    _insert(
+        Customer,
+        [
+            {"name": f"Customer {i}", "email": f"customer{i}@bench.test", "password": password}
+            for i in range(1, customers + 1)
+        ],
+    )
+    _insert(
+        Mechanic,
+        [
+            {"name": f"Mechanic {i}", "specialization": rng.choice(SPECIALIZATIONS)}
+            for i in range(1, mechanics + 1)
+        ],
+    )
+    _insert(
+        Inventory,
+        [
+            {"name": f"Part {i} {rng.choice(JOBS).lower()}", "price": round(rng.uniform(5, 500), 2)}
+            for i in range(1, parts + 1)
+        ],
+    )
+    _insert(
+        ServiceTicket,
+        [
+            {
+                "description": f"{rng.choice(JOBS)} #{i}",
+                "vehicle": rng.choice(VEHICLES),
+                "status": rng.choice(STATUSES),
+                "created_at": now - timedelta(minutes=tickets - i),
+                "customer_id": (i % customers) + 1,
+            }
+            for i in range(tickets)
+        ],
+    )
+
+    mechanic_links, part_links = [], []
+    for ticket_id in range(1, tickets + 1):
+        for mechanic_id in rng.sample(range(1, mechanics + 1), min(mechanics_per_ticket, mechanics)):
+            mechanic_links.append({"mechanic_id": mechanic_id, "service_ticket_id": ticket_id})
+        for inventory_id in rng.sample(range(1, parts + 1), min(parts_per_ticket, parts)):
+            part_links.append({"inventory_id": inventory_id, "service_ticket_id": ticket_id})
+    _insert(mechanic_service_ticket, mechanic_links)
+    _insert(ticket_inventory, part_links)
+
+    refresh_ticket_counts(db.session)
+    db.session.commit()
+
+    return {
+        "customers": customers,
+        "mechanics": mechanics,
+        "parts": parts,
+        "tickets": tickets,
+        "mechanic_links": len(mechanic_links),
+        "part_links": len(part_links),
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--mechanics", type=int, default=50)
+    parser.add_argument("--parts", type=int, default=200)
+    parser.add_argument("--tickets", type=int, default=2000)
+    parser.add_argument("--mechanics-per-ticket", type=int, default=2)
+    parser.add_argument("--parts-per-ticket", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+
+
+def volumes(args) -> dict:
+    return {
+        "customers": args.customers,
+        "mechanics": args.mechanics,
+        "parts": args.parts,
+        "tickets": args.tickets,
+        "mechanics_per_ticket": args.mechanics_per_ticket,
+        "parts_per_ticket": args.parts_per_ticket,
+        "random_seed": args.seed,
+    }
+
+
+def main():
+    from app import create_app
+
+    parser = argparse.ArgumentParser(description="Seed the benchmark database")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    app = create_app("BenchmarkConfig")
+    with app.app_context():
+        print(seed(**volumes(args)))
+
+
+if __name__ == "__main__":
+    main()
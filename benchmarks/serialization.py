@@ -0,0 +1,123 @@
+"""
+Serialization speed: marshmallow + stdlib json against the compiled
+serializers + orjson (app/serialization.py).
+
+Builds N in-memory model instances per resource (tickets with their
+customer, mechanics and parts) and times, per resource: schema dump,
+JSON encoding, and both together. No database involved.
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --rows 20000 --repeat 7
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from flask.json.provider import DefaultJSONProvider
+from marshmallow import Schema
+
+from app import create_app
+from app.blueprints.customers.schemas import customers_schema
+from app.blueprints.inventory.schemas import inventory_list_schema
+from app.blueprints.mechanics.schemas import mechanics_schema
+from app.blueprints.service_tickets.schemas import service_tickets_schema
+from app.models import Customer, Inventory, Mechanic, ServiceTicket, TicketPart
+from app.serialization import FastJSONProvider
+
+
+def build(rows: int) -> dict:
+    start = datetime(2024, 1, 1)
+    customers = [
+        Customer(id=i, name=f"Customer {i}", email=f"c{i}@example.com", password="x",
+                 created_at=start + timedelta(minutes=i))
+        for i in range(1, rows + 1)
+    ]
+    mechanics = [
+        Mechanic(id=i, name=f"Mechanic {i}", specialization="Engine", is_active=True, ticket_count=i % 50)
+        for i in range(1, rows + 1)
+    ]
+    parts = [Inventory(id=i, name=f"Part {i}", price=i * 1.25) for i in range(1, rows + 1)]
+    tickets = []
+    for i in range(1, rows + 1):
+        ticket = ServiceTicket(
+            id=i, description=f"Ticket {i}", vehicle="Honda Civic", status="open",
+            created_at=start + timedelta(hours=i), customer_id=customers[i - 1].id,
+        )
+        ticket.customer = customers[i - 1]
+        ticket.mechanics = mechanics[i % rows:i % rows + 2]
+        ticket.parts = parts[i % rows:i % rows + 3]
+        ticket.part_links = [
+            TicketPart(service_ticket_id=i, inventory_id=part.id, quantity=1) for part in ticket.parts
+        ]
+        tickets.append(ticket)
+    return {"tickets": tickets, "customers": customers, "mechanics": mechanics, "inventory": parts}
+
+
+SCHEMAS = {
+    "tickets": service_tickets_schema,
+    "customers": customers_schema,
+    "mechanics": mechanics_schema,
+    "inventory": inventory_list_schema,
+}
+
+
+def best_of(repeat: int, fn) -> float:
+    """
+    Fastest of `repeat` runs, in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def bench(name: str, objects: list, repeat: int, stdlib, fast) -> dict:
+    schema = SCHEMAS[name]
+
+    def marshmallow_dump():
+        # The plain marshmallow path, bypassing CompiledSchema.dump
+        return Schema.dump(schema, objects, many=True)
+
+    def compiled_dump():
+        return schema.dump(objects, many=True)
+
+    data = marshmallow_dump()
+    assert compiled_dump() == data, f"{name}: compiled output differs"
+
+    return {
+        "name": name,
+        "dump_old": best_of(repeat, marshmallow_dump),
+        "dump_new": best_of(repeat, compiled_dump),
+        "json_old": best_of(repeat, lambda: stdlib.dumps(data)),
+        "json_new": best_of(repeat, lambda: fast.dumps(data)),
+        "total_old": best_of(repeat, lambda: stdlib.dumps(marshmallow_dump())),
+        "total_new": best_of(repeat, lambda: fast.dumps(compiled_dump())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="instances per resource")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    app = create_app("BenchmarkConfig")
+    stdlib, fast = DefaultJSONProvider(app), FastJSONProvider(app)
+    objects = build(args.rows)
+
+    print(f"{args.rows} rows, best of {args.repeat} (ms); old = marshmallow + json, new = compiled + orjson")
+    print(f"{'resource':<10} {'dump old':>9} {'dump new':>9} {'json old':>9} {'json new':>9} "
+          f"{'total old':>10} {'total new':>10} {'speedup':>8}")
+    for name in SCHEMAS:
+        row = bench(name, objects[name], args.repeat, stdlib, fast)
+        print(
+            f"{name:<10} {row['dump_old']:>9.1f} {row['dump_new']:>9.1f} {row['json_old']:>9.1f} "
+            f"{row['json_new']:>9.1f} {row['total_old']:>10.1f} {row['total_new']:>10.1f} "
+            f"{row['total_old'] / row['total_new']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
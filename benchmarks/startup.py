@@ -0,0 +1,81 @@
+"""
+Boot time: how long a fresh interpreter takes to import the app and run
+create_app(), i.e. what every gunicorn worker (without --preload) and
+every test process pays before serving anything.
+
+Each run is a new Python process. Reports the median import / create_app
+/ total times and fails (exit 1) when the total is over --budget-ms or
+when a module that should load lazily was imported at boot.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --config ProductionConfig --runs 10 --budget-ms 600
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Only needed by `flask db ...` (app/cli.py) and on first token use (app/auth.py)
+DEFERRED_MODULES = ("flask_migrate", "alembic", "jose")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app(sys.argv[1])
+created = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "modules": sorted({name.split(".")[0] for name in sys.modules} & set(sys.argv[2:])),
+}))
+"""
+
+
+def probe(config_name: str) -> dict:
+    """
+    Import the app and build it in a fresh interpreter.
+    """
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, config_name, *DEFERRED_MODULES],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["total_ms"] = result["import_ms"] + result["create_app_ms"]
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--config", default="BenchmarkConfig", help="config class passed to create_app")
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to time (median is kept)")
+    parser.add_argument("--budget-ms", type=float, default=600, help="max median import + create_app time")
+    args = parser.parse_args(argv)
+
+    runs = [probe(args.config) for _ in range(args.runs)]
+    median = {key: statistics.median(run[key] for run in runs) for key in ("import_ms", "create_app_ms", "total_ms")}
+    loaded = sorted({name for run in runs for name in run["modules"]})
+
+    print(
+        f"{args.config}, median of {args.runs}: import {median['import_ms']:.0f} ms, "
+        f"create_app {median['create_app_ms']:.0f} ms, total {median['total_ms']:.0f} ms "
+        f"(budget {args.budget_ms:.0f} ms)"
+    )
+
+    failures = []
+    if median["total_ms"] > args.budget_ms:
+        failures.append(f"boot took {median['total_ms']:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+    if loaded:
+        failures.append(f"imported at boot, should load lazily: {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
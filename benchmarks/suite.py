@@ -0,0 +1,503 @@
+"""
+Benchmark / load-test suite covering every blueprint route.
+
+Seeds the benchmark database (BenchmarkConfig, BENCH_DATABASE_URI), drives
+every route and records p50/p95/p99 latency, throughput and SQL queries
+per request to JSON. With --baseline the run is gated against an earlier
+result and exits 1 on a regression.
+
+    # in-process, through the Flask test client (also counts SQL queries)
+    python -m benchmarks.suite --tickets 5000 --out benchmarks/baseline.json
+
+    # real server: gunicorn workers + a threaded local load generator
+    python -m benchmarks.suite --target gunicorn --workers 4 --concurrency 16
+
+    # regression gate
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --max-regression 0.25
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from benchmarks.seed import PASSWORD, add_arguments, seed, volumes
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# SCENARIOS
+# build(ctx, i) -> (path, json body or None). prepare(ctx, i) runs before the
+# timed request (e.g. to create the row a DELETE removes) and isn't measured.
+
+def scenario(name, method, build, auth=False, prepare=None) -> dict:
+    return {"name": name, "method": method, "build": build, "auth": auth, "prepare": prepare}
+
+
+def _unique(ctx, i) -> str:
+    return f"{ctx.run_id}-{i}-{threading.get_ident()}"
+
+
+def _create(ctx, path: str, body: dict) -> int:
+    status, data = ctx.driver.request("POST", path, body, ctx.auth_headers)
+    if status != 201:
+        raise RuntimeError(f"Setup POST {path} failed with {status}: {data}")
+    return data["id"]
+
+
+SCENARIOS = [
+    # customers
+    scenario(
+        "customers.create",
+        "POST",
+        lambda ctx, i: ("/customers/", {
+            "name": "Bench", "email": f"new-{_unique(ctx, i)}@bench.test", "password": PASSWORD,
+        }),
+    ),
+    scenario(
+        "customers.bulk_create",
+        "POST",
+        lambda ctx, i: ("/customers/bulk", [
+            {"name": "Bulk", "email": f"bulk-{_unique(ctx, i)}-{n}@bench.test", "password": PASSWORD}
+            for n in range(20)
+        ]),
+    ),
+    scenario("customers.list", "GET", lambda ctx, i: ("/customers/", None)),
+    scenario("customers.list_cursor", "GET", lambda ctx, i: ("/customers/?limit=20", None)),
+    scenario(
+        "customers.login",
+        "POST",
+        lambda ctx, i: ("/customers/login", {"email": "customer1@bench.test", "password": PASSWORD}),
+    ),
+    scenario("customers.my_tickets", "GET", lambda ctx, i: ("/customers/my-tickets", None), auth=True),
+    scenario("customers.spend", "GET", lambda ctx, i: ("/customers/spend?limit=10", None)),
+    # mechanics
+    scenario(
+        "mechanics.create",
+        "POST",
+        lambda ctx, i: ("/mechanics/", {"name": f"Mech {i}", "specialization": "General"}),
+    ),
+    scenario(
+        "mechanics.bulk_create",
+        "POST",
+        lambda ctx, i: ("/mechanics/bulk", [{"name": f"Bulk {n}"} for n in range(50)]),
+    ),
+    scenario("mechanics.list", "GET", lambda ctx, i: ("/mechanics/", None)),
+    scenario("mechanics.list_cursor", "GET", lambda ctx, i: ("/mechanics/?limit=20", None)),
+    scenario("mechanics.by_ticket_count", "GET", lambda ctx, i: ("/mechanics/by-ticket-count?limit=10", None)),
+    scenario("mechanics.revenue", "GET", lambda ctx, i: ("/mechanics/revenue?limit=10", None)),
+    scenario(
+        "mechanics.update",
+        "PUT",
+        lambda ctx, i: (f"/mechanics/{i % ctx.volumes['mechanics'] + 1}", {"specialization": f"Spec {i}"}),
+    ),
+    scenario(
+        "mechanics.delete",
+        "DELETE",
+        lambda ctx, i: (f"/mechanics/{ctx.prepared[i]}", None),
+        prepare=lambda ctx, i: _create(ctx, "/mechanics/", {"name": "Doomed"}),
+    ),
+    # inventory
+    scenario(
+        "inventory.create",
+        "POST",
+        lambda ctx, i: ("/inventory/", {"name": f"Part {i}", "price": 9.99}),
+        auth=True,
+    ),
+    scenario(
+        "inventory.bulk_create",
+        "POST",
+        lambda ctx, i: ("/inventory/bulk", [{"name": f"Bulk {n}", "price": 1.5} for n in range(50)]),
+        auth=True,
+    ),
+    scenario("inventory.list", "GET", lambda ctx, i: ("/inventory/", None)),
+    scenario("inventory.list_cursor", "GET", lambda ctx, i: ("/inventory/?limit=20", None)),
+    scenario("inventory.get", "GET", lambda ctx, i: (f"/inventory/{i % ctx.volumes['parts'] + 1}", None)),
+    scenario(
+        "inventory.update",
+        "PUT",
+        lambda ctx, i: (f"/inventory/{i % ctx.volumes['parts'] + 1}", {"price": 10 + i % 50}),
+        auth=True,
+    ),
+    scenario(
+        "inventory.delete",
+        "DELETE",
+        lambda ctx, i: (f"/inventory/{ctx.prepared[i]}", None),
+        auth=True,
+        prepare=lambda ctx, i: _create(ctx, "/inventory/", {"name": "Doomed", "price": 1}),
+    ),
+    # service tickets
+    scenario(
+        "service_tickets.create",
+        "POST",
+        lambda ctx, i: ("/service-tickets/", {"description": f"Brake job {i}", "vehicle": "Civic"}),
+        auth=True,
+    ),
+    scenario(
+        "service_tickets.bulk_create",
+        "POST",
+        lambda ctx, i: ("/service-tickets/bulk", [
+            {"description": f"Bulk job {n}", "vehicle": "Van"} for n in range(50)
+        ]),
+        auth=True,
+    ),
+    scenario("service_tickets.list", "GET", lambda ctx, i: ("/service-tickets/", None)),
+    scenario("service_tickets.list_cursor", "GET", lambda ctx, i: ("/service-tickets/?limit=20", None)),
+    scenario(
+        "service_tickets.list_filtered",
+        "GET",
+        lambda ctx, i: ("/service-tickets/?status=open&sort=-created_at&fields=id,description,status", None),
+    ),
+    scenario("service_tickets.stream", "GET", lambda ctx, i: ("/service-tickets/?stream=true", None)),
+    scenario("service_tickets.search", "GET", lambda ctx, i: ("/service-tickets/search?q=brake", None)),
+    scenario(
+        "service_tickets.costs",
+        "GET",
+        lambda ctx, i: ("/service-tickets/costs?created_after=2024-01-01&status=open", None),
+    ),
+    scenario(
+        "service_tickets.cost",
+        "GET",
+        lambda ctx, i: (f"/service-tickets/{i % ctx.volumes['tickets'] + 1}/cost", None),
+    ),
+    scenario(
+        "service_tickets.edit_mechanics",
+        "PUT",
+        # Alternately assign / unassign one mechanic on the customer's ticket
+        lambda ctx, i: (
+            f"/service-tickets/{ctx.ticket_id}/edit",
+            {"add_ids": [1 + i % ctx.volumes["mechanics"]]} if i % 2 == 0
+            else {"remove_ids": [1 + (i - 1) % ctx.volumes["mechanics"]]},
+        ),
+        auth=True,
+    ),
+    scenario(
+        "service_tickets.add_part",
+        "PUT",
+        lambda ctx, i: (f"/service-tickets/{ctx.ticket_id}/add-part/{i % ctx.volumes['parts'] + 1}", None),
+        auth=True,
+    ),
+]
+
+
+# DRIVERS
+
+class ClientDriver:
+    """
+    Requests through the Flask test client; also counts SQL per request.
+    """
+
+    counts_queries = True
+
+    def __init__(self, app):
+        self.app = app
+        self.client = app.test_client()
+        self.queries = 0
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.queries += 1
+
+    def request(self, method, path, body=None, headers=None):
+        response = self.client.open(path, method=method, json=body, headers=headers or {})
+        data = response.get_data()  # drains streamed bodies too
+        return response.status_code, _parse(data, response.mimetype)
+
+
+class HTTPDriver:
+    """
+    Plain keep-alive HTTP/1.1, one connection per load-generator thread.
+    """
+
+    counts_queries = False
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+
+        while True:
+            conn = getattr(self._local, "conn", None)
+            reused = conn is not None
+            if conn is None:
+                conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self._local.conn = None
+                # Servers with keep-alive timeouts (uvicorn) close idle connections
+                if not reused:
+                    raise
+        mimetype = (response.getheader("Content-Type") or "").split(";")[0]
+        return response.status, _parse(data, mimetype)
+
+
+def _parse(data: bytes, mimetype: str):
+    if mimetype == "application/json" and data:
+        return json.loads(data)
+    return None
+
+
+class Context:
+    def __init__(self, driver, volumes: dict):
+        self.driver = driver
+        self.volumes = volumes
+        self.run_id = int(time.time() * 1000)
+        self.prepared = {}
+        # Ticket 1 belongs to customer 1 (see benchmarks.seed)
+        self.ticket_id = 1
+        status, data = driver.request(
+            "POST", "/customers/login", {"email": "customer1@bench.test", "password": PASSWORD}
+        )
+        if status != 200:
+            raise RuntimeError(f"Benchmark login failed with {status}: {data}")
+        self.auth_headers = {"Authorization": f"Bearer {data['token']}"}
+
+
+# MEASUREMENT
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_scenario(ctx: Context, spec: dict, iterations: int, warmup: int, concurrency: int) -> dict:
+    driver = ctx.driver
+    headers = ctx.auth_headers if spec["auth"] else None
+
+    def call(i):
+        if spec["prepare"] is not None:
+            ctx.prepared[i] = spec["prepare"](ctx, i)
+        path, body = spec["build"](ctx, i)
+        queries_before = getattr(driver, "queries", 0)
+        start = time.perf_counter()
+        status, _ = driver.request(spec["method"], path, body, headers)
+        elapsed = time.perf_counter() - start
+        return status, elapsed, getattr(driver, "queries", 0) - queries_before
+
+    for i in range(warmup):
+        call(-1 - i)
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(call, range(iterations)))
+    else:
+        results = [call(i) for i in range(iterations)]
+    wall = time.perf_counter() - start
+
+    latencies = sorted(elapsed * 1000 for _, elapsed, _ in results)
+    result = {
+        "method": spec["method"],
+        "path": spec["build"](ctx, 0)[0],
+        "requests": iterations,
+        "statuses": {str(code): n for code, n in sorted(Counter(s for s, _, _ in results).items())},
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "throughput_rps": round(iterations / wall, 2),
+    }
+    if driver.counts_queries:
+        # Sequential in-process calls: the count is exact per request
+        result["queries"] = max(queries for _, _, queries in results)
+    return result
+
+
+def run_suite(driver, volumes: dict, iterations: int, warmup: int = 3, concurrency: int = 1,
+              only=None) -> dict:
+    ctx = Context(driver, volumes)
+    scenarios = {}
+    for spec in SCENARIOS:
+        if only and not any(spec["name"].startswith(prefix) for prefix in only):
+            continue
+        scenarios[spec["name"]] = run_scenario(ctx, spec, iterations, warmup, concurrency)
+    return scenarios
+
+
+# REGRESSION GATE
+
+def compare(baseline: dict, current: dict, max_regression: float = 0.25, slack_ms: float = 1.0) -> list:
+    """
+    Regressions of `current` against `baseline` (both suite JSON results):
+    p95 slower than baseline * (1 + max_regression) + slack_ms, throughput
+    below baseline * (1 - max_regression), or more SQL queries per request.
+    """
+    failures = []
+    for key in ("target", "workers", "concurrency", "volumes"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            failures.append(f"baseline was recorded with a different {key}; re-record it")
+    if failures:
+        return failures
+
+    for name, base in baseline["scenarios"].items():
+        cur = current["scenarios"].get(name)
+        if cur is None:
+            continue
+        allowed_p95 = base["p95_ms"] * (1 + max_regression) + slack_ms
+        if cur["p95_ms"] > allowed_p95:
+            failures.append(f"{name}: p95 {cur['p95_ms']:.2f}ms > {allowed_p95:.2f}ms allowed")
+        allowed_rps = base["throughput_rps"] * (1 - max_regression)
+        if cur["throughput_rps"] < allowed_rps:
+            failures.append(
+                f"{name}: throughput {cur['throughput_rps']:.1f}/s < {allowed_rps:.1f}/s allowed"
+            )
+        if "queries" in base and "queries" in cur and cur["queries"] > base["queries"]:
+            failures.append(f"{name}: {cur['queries']} queries > {base['queries']} in baseline")
+    return failures
+
+
+# GUNICORN TARGET
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(workers: int, port: int, asgi: bool = False) -> subprocess.Popen:
+    """
+    gunicorn on `port`: sync workers running the Flask app, or with
+    asgi=True uvicorn workers running the ASGI entry point (app/asgi.py).
+    """
+    if asgi:
+        app = ["--worker-class", "uvicorn.workers.UvicornWorker", "app.asgi:create_asgi_app('BenchmarkConfig')"]
+    else:
+        app = ["app:create_app('BenchmarkConfig')"]
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn",
+            "--workers", str(workers),
+            "--bind", f"127.0.0.1:{port}",
+            "--log-level", "warning",
+            *app,
+        ],
+        cwd=ROOT,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("gunicorn did not start within 30s")
+
+
+# CLI
+
+def print_table(scenarios: dict):
+    print(f"{'scenario':<34} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>9} {'sql':>5}  status")
+    for name, row in scenarios.items():
+        print(
+            f"{name:<34} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} "
+            f"{row['throughput_rps']:>9.1f} {row.get('queries', '-'):>5}  {row['statuses']}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every route of the API")
+    add_arguments(parser)
+    parser.add_argument("--target", choices=["client", "gunicorn", "uvicorn"], default="client",
+                        help="in-process test client, gunicorn sync workers, or gunicorn + uvicorn (ASGI)")
+    parser.add_argument("--iterations", type=int, default=50, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="load-generator threads (default 1 for client, 8 for servers)")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    parser.add_argument("--only", action="append", help="scenario name prefix (repeatable)")
+    parser.add_argument("--out", help="write results JSON here (e.g. a new baseline)")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    parser.add_argument("--slack-ms", type=float, default=1.0,
+                        help="absolute p95 headroom, absorbs noise on sub-ms routes")
+    args = parser.parse_args(argv)
+
+    seeded = volumes(args)
+    app = create_app("BenchmarkConfig")
+    with app.app_context():
+        seed(**seeded)
+
+    concurrency = args.concurrency or (1 if args.target == "client" else 8)
+    server = None
+    if args.target == "client":
+        driver = ClientDriver(app)
+    else:
+        port = _free_port()
+        server = start_gunicorn(args.workers, port, asgi=args.target == "uvicorn")
+        driver = HTTPDriver("127.0.0.1", port)
+
+    try:
+        scenarios = run_suite(driver, seeded, args.iterations, args.warmup, concurrency, args.only)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    results = {
+        "meta": {
+            "target": args.target,
+            "workers": args.workers if args.target != "client" else None,
+            "concurrency": concurrency,
+            "iterations": args.iterations,
+            "volumes": seeded,
+            "python": platform.python_version(),
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        },
+        "scenarios": scenarios,
+    }
+    print_table(scenarios)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failures = compare(baseline, results, args.max_regression, args.slack_ms)
+        if failures:
+            print("\nREGRESSIONS:")
+            for failure in failures:
+                print(f"  {failure}")
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,9 +5,46 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def engine_options(uri: str) -> dict:
+    """
+    Engine / pool profile (create_engine kwargs) for a database URI,
+    tunable from the environment.
+    """
+    if not uri or not uri.startswith(("postgres://", "postgresql")):
+        # SQLite: how long a writer waits on a locked file before erroring
+        return {"connect_args": {"timeout": float(os.environ.get("DB_BUSY_TIMEOUT", 15))}}
+
+    statement_timeout_ms = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 5000))
+    return {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),  # wait for a free connection
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),  # before server/proxy idle cutoffs
+        "pool_pre_ping": True,  # drop connections the server closed, instead of failing a request
+        "pool_use_lifo": True,  # reuse hot connections; idle extras can age out
+        "connect_args": {
+            "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+            "options": f"-c statement_timeout={statement_timeout_ms}",
+            "application_name": "mechanic-shop-api",
+        },
+    }
+
+
 class BaseConfig:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Read replicas, comma separated. GET/HEAD requests read from them
+    # (round-robin, health-checked); writes go to SQLALCHEMY_DATABASE_URI.
+    REPLICA_DATABASE_URIS = [
+        uri.strip() for uri in os.environ.get("REPLICA_DATABASE_URIS", "").split(",") if uri.strip()
+    ]
+    REPLICA_HEALTH_INTERVAL = float(os.environ.get("REPLICA_HEALTH_INTERVAL", 5))  # seconds
+    # After a write the client reads from the primary this long: keep it above replica lag
+    REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 5))
+
+    # Physical connections each worker opens at boot (gunicorn.conf.py)
+    DB_POOL_WARMUP = int(os.environ.get("DB_POOL_WARMUP", 0))
+
     # Secret key read from environment, with a safe fallback
     SECRET_KEY = os.environ.get("SECRET_KEY") or "super-saiyan-secret"
 
@@ -15,12 +52,60 @@ class BaseConfig:
     JWT_ALGORITHM = "HS256"
     JWT_EXPIRE_MINUTES = int(os.environ.get("JWT_EXPIRE_MINUTES", 60))
 
-    # Flask-Limiter default rate limit (blanket protection)
+    # Password hashing: werkzeug method string incl. cost, e.g. "scrypt:32768:8:1"
+    # or "pbkdf2:sha256:600000". Changing it rehashes each customer on next login.
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    # Concurrent KDFs per process, plus how many may wait before login answers
+    # 503. Only bites with several request threads (gthread / ASGI workers).
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 4))
+    PASSWORD_HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", 16))
+
+    # token_required caches verified tokens + "customer exists" lookups
+    AUTH_CACHE_SIZE = int(os.environ.get("AUTH_CACHE_SIZE", 1024))
+    AUTH_CACHE_TTL = int(os.environ.get("AUTH_CACHE_TTL", 60))  # seconds
+    # Trust the signed customer_id claim alone (no DB existence check at all)
+    JWT_TRUST_CLAIMS = os.environ.get("JWT_TRUST_CLAIMS", "false").lower() == "true"
+
+    # Flask-Limiter default rate limit (blanket protection). ENABLED is set
+    # explicitly: the limiter is shared, and otherwise keeps the last app's value.
+    RATELIMIT_ENABLED = os.environ.get("RATELIMIT_ENABLED", "true").lower() == "true"
     RATELIMIT_DEFAULT = os.environ.get("RATELIMIT_DEFAULT", "100 per hour")
+    # memory:// counts per worker. For one shared count use a SQLite file on the
+    # host (sqlite:////tmp/ratelimit.db?timeout=0.05) or redis://host:6379.
+    # Checks that error out or time out are let through (fail open) and counted;
+    # with IN_MEMORY_FALLBACK_ENABLED they count per worker until storage recovers.
+    RATELIMIT_SWALLOW_ERRORS = os.environ.get("RATELIMIT_SWALLOW_ERRORS", "true").lower() == "true"
+    RATELIMIT_IN_MEMORY_FALLBACK_ENABLED = (
+        os.environ.get("RATELIMIT_IN_MEMORY_FALLBACK_ENABLED", "false").lower() == "true"
+    )
+    RATELIMIT_STORAGE_URI = os.environ.get("RATELIMIT_STORAGE_URI", "memory://")
+    RATELIMIT_STRATEGY = os.environ.get("RATELIMIT_STRATEGY", "moving-window")
+
+    # Per-route timing/SQL metrics, Server-Timing headers and GET /metrics
+    INSTRUMENTATION_ENABLED = os.environ.get("INSTRUMENTATION_ENABLED", "false").lower() == "true"
+
+    # ASGI entry point (asgi_app.py): threads per worker for the routes
+    # without an async twin (writes, auth, streamed exports)
+    ASGI_SYNC_THREADS = int(os.environ.get("ASGI_SYNC_THREADS", 8))
+
+    # Cache the parts-cost reports (/service-tickets/costs, /customers/spend,
+    # /mechanics/revenue); entries are invalidated by writes to their tables
+    COSTS_CACHE_ENABLED = os.environ.get("COSTS_CACHE_ENABLED", "true").lower() == "true"
+
+    # Swagger UI at /api/docs
+    API_DOCS_ENABLED = os.environ.get("API_DOCS_ENABLED", "true").lower() == "true"
+
+    # Max items accepted by the POST /<resource>/bulk endpoints
+    BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", 5000))
 
     # Flask-Caching
-    CACHE_TYPE = "SimpleCache"
+    # SimpleCache is per-process. Use FileSystemCache (CACHE_DIR) or RedisCache
+    # (CACHE_REDIS_URL) so every gunicorn worker shares one cache.
+    CACHE_TYPE = os.environ.get("CACHE_TYPE", "SimpleCache")
     CACHE_DEFAULT_TIMEOUT = 60
+    CACHE_DIR = os.environ.get("CACHE_DIR", "/tmp/mechanic_shop_cache")
+    CACHE_THRESHOLD = int(os.environ.get("CACHE_THRESHOLD", 5000))
+    CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL")
 
 
 class DevelopmentConfig(BaseConfig):
@@ -29,18 +114,40 @@ class DevelopmentConfig(BaseConfig):
         "DEV_DATABASE_URI",
         "sqlite:///mechanic_shop_advanced.db",
     )
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
 
 
 class TestingConfig(BaseConfig):
     TESTING = True
     DEBUG = True
+    # Cheap KDF so the suite stays fast
+    PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
+    API_DOCS_ENABLED = False
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         "TEST_DATABASE_URI",
         "sqlite:///testing.db",
     )
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
+
+class BenchmarkConfig(BaseConfig):
+    # benchmarks/suite.py: seeded scratch database, no rate limiting
+    RATELIMIT_ENABLED = False
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        "BENCH_DATABASE_URI",
+        "sqlite:///benchmark.db",
+    )
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
 
 
 class ProductionConfig(BaseConfig):
     DEBUG = False
+    # Shared across workers on the same host by default
+    CACHE_TYPE = os.environ.get("CACHE_TYPE", "FileSystemCache")
+    RATELIMIT_STORAGE_URI = os.environ.get(
+        "RATELIMIT_STORAGE_URI", "sqlite:////tmp/mechanic_shop_ratelimit.db"
+    )
     # On Render, this is set via Environment settings
     SQLALCHEMY_DATABASE_URI = os.environ.get("SQLALCHEMY_DATABASE_URI")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    DB_POOL_WARMUP = int(os.environ.get("DB_POOL_WARMUP", 2))
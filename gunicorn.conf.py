@@ -0,0 +1,20 @@
+# Picked up automatically by `gunicorn flask_app:app` (./gunicorn.conf.py)
+
+
+def post_worker_init(worker):
+    """
+    Runs in each worker after the app is loaded. Drops any connections
+    inherited from the master (--preload), then pre-opens DB_POOL_WARMUP
+    connections so the first requests don't pay for the connect.
+    """
+    from app.dbpool import warm_pool
+    from app.extensions import db
+    from app.replicas import replica_engines
+
+    # The ASGI entry point (app/asgi.py) wraps the Flask app
+    app = getattr(worker.wsgi, "flask_app", worker.wsgi)
+    with app.app_context():
+        for engine in [*db.engines.values(), *replica_engines(app).values()]:
+            engine.dispose(close=False)
+            warm_pool(engine, app.config.get("DB_POOL_WARMUP", 0))
+    worker.log.info("Database pool warmed up (%s connections)", app.config.get("DB_POOL_WARMUP", 0))
@@ -0,0 +1,76 @@
+"""baseline schema (tables as previously created by db.create_all)
+
+Revision ID: 0001_baseline
+Revises: 
+Create Date: 2026-10-18 15:10:00.000000
+
+Existing databases that were built by db.create_all() already have these
+tables: run `flask db stamp 0001_baseline` once, then `flask db upgrade`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('customers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_table('inventory',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('mechanics',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('specialization', sa.String(length=255), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('service_tickets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('description', sa.String(length=500), nullable=False),
+    sa.Column('vehicle', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('mechanic_service_ticket',
+    sa.Column('mechanic_id', sa.Integer(), nullable=False),
+    sa.Column('service_ticket_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['mechanic_id'], ['mechanics.id'], ),
+    sa.ForeignKeyConstraint(['service_ticket_id'], ['service_tickets.id'], ),
+    sa.PrimaryKeyConstraint('mechanic_id', 'service_ticket_id')
+    )
+    op.create_table('ticket_inventory',
+    sa.Column('inventory_id', sa.Integer(), nullable=False),
+    sa.Column('service_ticket_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['inventory_id'], ['inventory.id'], ),
+    sa.ForeignKeyConstraint(['service_ticket_id'], ['service_tickets.id'], ),
+    sa.PrimaryKeyConstraint('inventory_id', 'service_ticket_id')
+    )
+
+
+def downgrade():
+    op.drop_table('ticket_inventory')
+    op.drop_table('mechanic_service_ticket')
+    op.drop_table('service_tickets')
+    op.drop_table('mechanics')
+    op.drop_table('inventory')
+    op.drop_table('customers')
@@ -0,0 +1,35 @@
+"""materialized mechanics.ticket_count
+
+Revision ID: 0002_mechanic_ticket_count
+Revises: 0001_baseline
+Create Date: 2026-10-18 15:11:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_mechanic_ticket_count'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('mechanics', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('ticket_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index('ix_mechanics_ticket_count', [sa.text('ticket_count DESC'), 'id'], unique=False)
+
+    # Backfill from the existing assignments
+    op.execute(
+        "UPDATE mechanics SET ticket_count = ("
+        "SELECT COUNT(*) FROM mechanic_service_ticket "
+        "WHERE mechanic_service_ticket.mechanic_id = mechanics.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('mechanics', schema=None) as batch_op:
+        batch_op.drop_index('ix_mechanics_ticket_count')
+        batch_op.drop_column('ticket_count')
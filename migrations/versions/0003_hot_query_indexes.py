@@ -0,0 +1,41 @@
+"""indexes for hot filters and reverse association lookups
+
+Revision ID: 0003_hot_query_indexes
+Revises: 0002_mechanic_ticket_count
+Create Date: 2026-10-18 15:12:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_hot_query_indexes'
+down_revision = '0002_mechanic_ticket_count'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('service_tickets', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_service_tickets_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_service_tickets_customer_id'), ['customer_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_service_tickets_status'), ['status'], unique=False)
+
+    with op.batch_alter_table('mechanic_service_ticket', schema=None) as batch_op:
+        batch_op.create_index('ix_mechanic_service_ticket_ticket', ['service_ticket_id', 'mechanic_id'], unique=False)
+
+    with op.batch_alter_table('ticket_inventory', schema=None) as batch_op:
+        batch_op.create_index('ix_ticket_inventory_ticket', ['service_ticket_id', 'inventory_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ticket_inventory', schema=None) as batch_op:
+        batch_op.drop_index('ix_ticket_inventory_ticket')
+
+    with op.batch_alter_table('mechanic_service_ticket', schema=None) as batch_op:
+        batch_op.drop_index('ix_mechanic_service_ticket_ticket')
+
+    with op.batch_alter_table('service_tickets', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_service_tickets_status'))
+        batch_op.drop_index(batch_op.f('ix_service_tickets_customer_id'))
+        batch_op.drop_index(batch_op.f('ix_service_tickets_created_at'))
@@ -0,0 +1,91 @@
+"""full-text search over ticket description, vehicle and part names
+
+Revision ID: 0004_ticket_search
+Revises: 0003_hot_query_indexes
+Create Date: 2026-10-18 15:30:00.000000
+
+SQLite: FTS5 table service_tickets_fts (rowid = ticket id).
+Postgres: service_tickets_fts (ticket_id, tsvector) with a GIN index.
+Both are kept current by triggers; see app/search.py.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_ticket_search'
+down_revision = '0003_hot_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS service_tickets_fts USING fts5(description, vehicle, parts, tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS service_tickets_fts_ai AFTER INSERT ON service_tickets BEGIN INSERT INTO service_tickets_fts (rowid, description, vehicle, parts) VALUES (new.id, new.description, coalesce(new.vehicle, ''), ''); END",
+    "CREATE TRIGGER IF NOT EXISTS service_tickets_fts_au AFTER UPDATE OF description, vehicle ON service_tickets BEGIN UPDATE service_tickets_fts SET description = new.description, vehicle = coalesce(new.vehicle, '') WHERE rowid = new.id; END",
+    'CREATE TRIGGER IF NOT EXISTS service_tickets_fts_ad AFTER DELETE ON service_tickets BEGIN DELETE FROM service_tickets_fts WHERE rowid = old.id; END',
+    "CREATE TRIGGER IF NOT EXISTS service_tickets_fts_parts_ai AFTER INSERT ON ticket_inventory BEGIN UPDATE service_tickets_fts SET parts = (SELECT coalesce(group_concat(i.name, ' '), '') FROM ticket_inventory ti JOIN inventory i ON i.id = ti.inventory_id WHERE ti.service_ticket_id = new.service_ticket_id) WHERE rowid = new.service_ticket_id; END",
+    "CREATE TRIGGER IF NOT EXISTS service_tickets_fts_parts_ad AFTER DELETE ON ticket_inventory BEGIN UPDATE service_tickets_fts SET parts = (SELECT coalesce(group_concat(i.name, ' '), '') FROM ticket_inventory ti JOIN inventory i ON i.id = ti.inventory_id WHERE ti.service_ticket_id = old.service_ticket_id) WHERE rowid = old.service_ticket_id; END",
+    "CREATE TRIGGER IF NOT EXISTS service_tickets_fts_inventory_au AFTER UPDATE OF name ON inventory BEGIN UPDATE service_tickets_fts SET parts = (SELECT coalesce(group_concat(i.name, ' '), '') FROM ticket_inventory ti JOIN inventory i ON i.id = ti.inventory_id WHERE ti.service_ticket_id = service_tickets_fts.rowid) WHERE rowid IN (SELECT service_ticket_id FROM ticket_inventory WHERE inventory_id = new.id); END",
+]
+
+POSTGRES_DDL = [
+    'CREATE TABLE IF NOT EXISTS service_tickets_fts (ticket_id INTEGER PRIMARY KEY REFERENCES service_tickets (id) ON DELETE CASCADE, document TSVECTOR NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS ix_service_tickets_fts_document ON service_tickets_fts USING GIN (document)',
+    "CREATE OR REPLACE FUNCTION service_tickets_fts_refresh(tid INTEGER) RETURNS void AS $$ INSERT INTO service_tickets_fts (ticket_id, document) SELECT t.id, setweight(to_tsvector('english', coalesce(t.description, '')), 'A') || setweight(to_tsvector('english', coalesce(t.vehicle, '')), 'B') || setweight(to_tsvector('english', coalesce((SELECT string_agg(i.name, ' ') FROM ticket_inventory ti JOIN inventory i ON i.id = ti.inventory_id WHERE ti.service_ticket_id = t.id), '')), 'C') FROM service_tickets t WHERE t.id = tid ON CONFLICT (ticket_id) DO UPDATE SET document = EXCLUDED.document; $$ LANGUAGE sql",
+    'CREATE OR REPLACE FUNCTION service_tickets_fts_ticket_trg() RETURNS trigger AS $$ BEGIN PERFORM service_tickets_fts_refresh(NEW.id); RETURN NULL; END $$ LANGUAGE plpgsql',
+    "CREATE OR REPLACE FUNCTION service_tickets_fts_parts_trg() RETURNS trigger AS $$ BEGIN IF TG_OP = 'DELETE' THEN PERFORM service_tickets_fts_refresh(OLD.service_ticket_id); ELSE PERFORM service_tickets_fts_refresh(NEW.service_ticket_id); END IF; RETURN NULL; END $$ LANGUAGE plpgsql",
+    'CREATE OR REPLACE FUNCTION service_tickets_fts_inventory_trg() RETURNS trigger AS $$ BEGIN PERFORM service_tickets_fts_refresh(ti.service_ticket_id) FROM ticket_inventory ti WHERE ti.inventory_id = NEW.id; RETURN NULL; END $$ LANGUAGE plpgsql',
+    'DROP TRIGGER IF EXISTS service_tickets_fts_ticket ON service_tickets',
+    'CREATE TRIGGER service_tickets_fts_ticket AFTER INSERT OR UPDATE OF description, vehicle ON service_tickets FOR EACH ROW EXECUTE FUNCTION service_tickets_fts_ticket_trg()',
+    'DROP TRIGGER IF EXISTS service_tickets_fts_parts ON ticket_inventory',
+    'CREATE TRIGGER service_tickets_fts_parts AFTER INSERT OR DELETE ON ticket_inventory FOR EACH ROW EXECUTE FUNCTION service_tickets_fts_parts_trg()',
+    'DROP TRIGGER IF EXISTS service_tickets_fts_inventory ON inventory',
+    'CREATE TRIGGER service_tickets_fts_inventory AFTER UPDATE OF name ON inventory FOR EACH ROW EXECUTE FUNCTION service_tickets_fts_inventory_trg()',
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        op.execute(
+            "INSERT INTO service_tickets_fts (rowid, description, vehicle, parts) "
+            "SELECT t.id, t.description, coalesce(t.vehicle, ''), "
+            "(SELECT coalesce(group_concat(i.name, ' '), '') FROM ticket_inventory ti "
+            "JOIN inventory i ON i.id = ti.inventory_id WHERE ti.service_ticket_id = t.id) "
+            "FROM service_tickets t"
+        )
+    elif dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            op.execute(statement)
+        op.execute("SELECT service_tickets_fts_refresh(id) FROM service_tickets")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        for trigger in (
+            "service_tickets_fts_ai",
+            "service_tickets_fts_au",
+            "service_tickets_fts_ad",
+            "service_tickets_fts_parts_ai",
+            "service_tickets_fts_parts_ad",
+            "service_tickets_fts_inventory_au",
+        ):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS service_tickets_fts")
+    elif dialect == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS service_tickets_fts_ticket ON service_tickets")
+        op.execute("DROP TRIGGER IF EXISTS service_tickets_fts_parts ON ticket_inventory")
+        op.execute("DROP TRIGGER IF EXISTS service_tickets_fts_inventory ON inventory")
+        op.execute("DROP TABLE IF EXISTS service_tickets_fts")
+        for function in (
+            "service_tickets_fts_ticket_trg()",
+            "service_tickets_fts_parts_trg()",
+            "service_tickets_fts_inventory_trg()",
+            "service_tickets_fts_refresh(INTEGER)",
+        ):
+            op.execute(f"DROP FUNCTION IF EXISTS {function}")
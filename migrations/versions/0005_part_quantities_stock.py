@@ -0,0 +1,31 @@
+"""part quantities on tickets, inventory stock
+
+Revision ID: 0005_part_quantities_stock
+Revises: 0004_ticket_search
+Create Date: 2026-10-18 16:05:00.000000
+
+Plain ADD/DROP COLUMN rather than batch mode: a batch rebuild of
+ticket_inventory / inventory on SQLite would drop the search triggers
+from 0004_ticket_search.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_part_quantities_stock'
+down_revision = '0004_ticket_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing links were one unit each
+    op.add_column('ticket_inventory', sa.Column('quantity', sa.Integer(), server_default='1', nullable=False))
+    # NULL = not stock-tracked, so existing items stay addable
+    op.add_column('inventory', sa.Column('stock', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('inventory', 'stock')
+    op.drop_column('ticket_inventory', 'quantity')
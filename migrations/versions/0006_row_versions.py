@@ -0,0 +1,30 @@
+"""row versions for optimistic concurrency
+
+Revision ID: 0006_row_versions
+Revises: 0005_part_quantities_stock
+Create Date: 2026-10-18 16:40:00.000000
+
+Plain ADD/DROP COLUMN (no batch rebuild) so SQLite keeps the search
+triggers on service_tickets and inventory.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_row_versions'
+down_revision = '0005_part_quantities_stock'
+branch_labels = None
+depends_on = None
+
+TABLES = ('mechanics', 'service_tickets', 'inventory')
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('version_id', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    for table in TABLES:
+        op.drop_column(table, 'version_id')
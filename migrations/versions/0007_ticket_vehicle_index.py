@@ -0,0 +1,24 @@
+"""index for the ?vehicle= ticket filter
+
+Revision ID: 0007_ticket_vehicle_index
+Revises: 0006_row_versions
+Create Date: 2026-10-18 17:20:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_ticket_vehicle_index'
+down_revision = '0006_row_versions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Not batch mode: a table rebuild would drop the search triggers (0004)
+    op.create_index(op.f('ix_service_tickets_vehicle'), 'service_tickets', ['vehicle'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_service_tickets_vehicle'), table_name='service_tickets')
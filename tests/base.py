@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+from app import create_app
+from app.auth import encode_token
+from app.extensions import db
+
+_engine = None
+
+
+def temp_database_uri(testcase: unittest.TestCase) -> str:
+    """
+    URI of a new, empty SQLite file, removed after the test. For tests that
+    need a real database file of their own (migrations, a second process or
+    driver); never the tracked instance/ database.
+    """
+    handle, path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+
+    def remove():
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    testcase.addCleanup(remove)
+    return f"sqlite:///{path}"
+
+
+def shared_engine():
+    """
+    The in-memory SQLite database DatabaseTestCase runs on. The schema is
+    created once per process; every process (e.g. each `pytest -n` worker)
+    has its own database.
+    """
+    global _engine
+    if _engine is None:
+        engine = create_engine(
+            "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+        )
+
+        # pysqlite starts transactions lazily and would let the first
+        # SAVEPOINT begin (and its RELEASE commit) the outer transaction.
+        # Let SQLAlchemy emit BEGIN itself instead.
+        @event.listens_for(engine, "connect")
+        def _no_implicit_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def _begin(connection):
+            connection.exec_driver_sql("BEGIN")
+
+        # create_app has imported the models and the search DDL by now
+        db.metadata.create_all(engine)
+        _engine = engine
+    return _engine
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """
+    A fresh TestingConfig app per test on the shared in-memory schema.
+    Each test runs inside one transaction that is rolled back afterwards:
+    db.session joins it, and every commit (in the app or in the test)
+    only releases a SAVEPOINT.
+    """
+
+    config_name = "TestingConfig"
+
+    def create_app(self):
+        return create_app(self.config_name)
+
+    def setUp(self):
+        self.app = self.create_app()
+        engine = shared_engine()
+        with self.app.app_context():
+            # Swap out the app's own engine (not connected yet) so db.engine,
+            # QueryCounter etc. see the shared one
+            db.engines[None] = engine
+
+        self.connection = engine.connect()
+        self.transaction = self.connection.begin()
+        factory = db.session.session_factory
+        self._session_options = dict(factory.kw)
+        factory.configure(bind=self.connection, join_transaction_mode="create_savepoint")
+        self.addCleanup(self._rollback)
+
+        self.client = self.app.test_client()
+
+    def _rollback(self):
+        db.session.session_factory.kw = self._session_options
+        self.transaction.rollback()
+        self.connection.close()
+
+    def auth_header_for(self, customer_id: int) -> dict:
+        """
+        Authorization header with a token minted directly (no login request).
+        """
+        with self.app.app_context():
+            return {"Authorization": f"Bearer {encode_token(customer_id)}"}
@@ -0,0 +1,51 @@
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.extensions import db
+
+# Emitted instead of BEGIN / COMMIT under DatabaseTestCase (tests/base.py)
+SAVEPOINT = re.compile(r"^(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT) ")
+
+
+class QueryCounter:
+    """
+    Counts SQL statements sent to the app's engine while active.
+    """
+
+    def __init__(self, app):
+        with app.app_context():
+            self.engine = db.engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if not SAVEPOINT.match(statement):
+            self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+        return False
+
+
+@contextmanager
+def assert_max_queries(testcase, app, max_queries):
+    """
+    Fail `testcase` if the block issues more than `max_queries` SQL statements.
+    """
+    with QueryCounter(app) as counter:
+        yield counter
+    testcase.assertLessEqual(
+        counter.count,
+        max_queries,
+        f"Expected at most {max_queries} queries, got {counter.count}:\n"
+        + "\n".join(counter.statements),
+    )
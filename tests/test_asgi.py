@@ -0,0 +1,192 @@
+import asyncio
+import json
+import threading
+import unittest
+from unittest import mock
+
+from sqlalchemy.engine import make_url
+
+import config
+from app.asgi import async_engine_options, async_engine_url, create_asgi_app
+from app.caching import tag_versions
+from app.extensions import db
+from app.models import Customer, Inventory, Mechanic, ServiceTicket
+from app.ratelimit import ratelimit_stats
+from tests.base import temp_database_uri
+
+
+class TestAsyncEngineConfig(unittest.TestCase):
+    def test_driver_urls(self):
+        self.assertEqual(
+            async_engine_url("sqlite:////tmp/shop.db").drivername, "sqlite+aiosqlite"
+        )
+        self.assertEqual(
+            async_engine_url("postgresql+psycopg2://u@db/shop").drivername, "postgresql+asyncpg"
+        )
+        with self.assertRaises(ValueError):
+            async_engine_url("mysql://u@db/shop")
+
+    def test_postgres_connect_args_translated(self):
+        uri = "postgresql://u@db/shop"
+        options = async_engine_options(config.engine_options(uri), make_url(uri))
+        self.assertIn("pool_size", options)
+        self.assertNotIn("poolclass", options)
+        connect_args = options["connect_args"]
+        self.assertNotIn("options", connect_args)
+        self.assertIn("timeout", connect_args)
+        self.assertIn("statement_timeout", connect_args["server_settings"])
+        self.assertEqual(connect_args["server_settings"]["application_name"], "mechanic-shop-api")
+
+
+class TestAsgiApp(unittest.TestCase):
+    def setUp(self):
+        with mock.patch.object(config.TestingConfig, "SQLALCHEMY_DATABASE_URI", temp_database_uri(self)):
+            self.asgi = create_asgi_app("TestingConfig")
+        self.app = self.asgi.flask_app
+        self.loop = asyncio.new_event_loop()
+
+        with self.app.app_context():
+            db.create_all()
+
+            customer = Customer(name="Owner", email="owner@example.com", password="pw")
+            mechanics = [Mechanic(name="Alex"), Mechanic(name="Sam", specialization="Brakes")]
+            parts = [Inventory(name="Brake Pad", price=49.99), Inventory(name="Oil", price=9.5)]
+            tickets = [
+                ServiceTicket(description="Brakes", status="open", customer=customer),
+                ServiceTicket(description="Oil change", status="closed", customer=customer),
+            ]
+            tickets[0].mechanics.extend(mechanics)
+            tickets[0].parts.extend(parts)
+            tickets[1].mechanics.append(mechanics[1])
+            db.session.add_all([customer, *mechanics, *parts, *tickets])
+            db.session.commit()
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.asgi.engine.dispose())
+        self.loop.close()
+        with self.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+    def request(self, method, path, query="", headers=None, body=b""):
+        """
+        One request through the ASGI app. Returns (status, headers, body).
+        """
+        headers = dict(headers or {})
+        if body:
+            headers["Content-Length"] = str(len(body))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "root_path": "",
+            "query_string": query.encode(),
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        messages = []
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+
+        self.loop.run_until_complete(self.asgi(scope, receive, send))
+        start = messages[0]
+        response_headers = {k.decode(): v.decode() for k, v in start["headers"]}
+        data = b"".join(m.get("body", b"") for m in messages[1:])
+        return start["status"], response_headers, data
+
+    def test_async_views_match_flask(self):
+        client = self.app.test_client()
+        cases = [
+            ("/mechanics/", ""),
+            ("/mechanics/", "limit=1"),
+            ("/mechanics/", "limit=abc"),
+            ("/mechanics/by-ticket-count", "limit=1"),
+            ("/inventory/", ""),
+            ("/inventory/1", ""),
+            ("/inventory/999", ""),
+            ("/service-tickets/", ""),
+            ("/service-tickets/", "status=open&fields=id,status,mechanics,parts"),
+            ("/service-tickets/", "limit=1&include_total=true"),
+            ("/service-tickets/", "sort=nope"),
+        ]
+        # None of these may reach the Flask (WSGI) fallback
+        with mock.patch.object(self.asgi, "wsgi", side_effect=AssertionError("fallback")):
+            results = [self.request("GET", path, query) for path, query in cases]
+
+        for (path, query), (status, _, body) in zip(cases, results):
+            expected = client.get(f"{path}?{query}")
+            self.assertEqual(status, expected.status_code, f"{path}?{query}")
+            self.assertEqual(json.loads(body), expected.json, f"{path}?{query}")
+
+    def test_blocking_calls_run_off_the_event_loop(self):
+        threads = {}
+
+        def record(name, f):
+            def wrapper(*args, **kwargs):
+                threads.setdefault(name, set()).add(threading.get_ident())
+                return f(*args, **kwargs)
+
+            return wrapper
+
+        self.app.before_request(record("before_request", lambda: None))
+        self.app.after_request(record("after_request", lambda response: response))
+        with mock.patch("app.caching.tag_versions", record("cache", tag_versions)):
+            status, _, _ = self.request("GET", "/mechanics/")
+        self.assertEqual(status, 200)
+
+        # The loop runs on this thread (run_until_complete)
+        self.assertEqual(set(threads), {"before_request", "after_request", "cache"})
+        for name, idents in threads.items():
+            self.assertNotIn(threading.get_ident(), idents, name)
+
+    def test_async_view_runs_request_hooks(self):
+        checks = ratelimit_stats()["checks"]
+        status, headers, _ = self.request("GET", "/inventory/")
+        self.assertEqual(status, 200)
+        self.assertEqual(ratelimit_stats()["checks"], checks + 1)
+        self.assertIn("etag", headers)
+
+        status, _, body = self.request(
+            "GET", "/inventory/", headers={"If-None-Match": headers["etag"]}
+        )
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b"")
+
+    def test_head_has_no_body(self):
+        status, headers, body = self.request("HEAD", "/mechanics/")
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b"")
+        self.assertGreater(int(headers["content-length"]), 0)
+
+    def test_writes_and_streams_fall_back_to_flask(self):
+        status, _, body = self.request(
+            "POST",
+            "/mechanics/",
+            headers={"Content-Type": "application/json"},
+            body=json.dumps({"name": "New Hire"}).encode(),
+        )
+        self.assertEqual(status, 201)
+
+        # The commit invalidated the cached list the async view serves
+        status, _, body = self.request("GET", "/mechanics/")
+        self.assertIn("New Hire", [m["name"] for m in json.loads(body)])
+
+        status, _, body = self.request("GET", "/mechanics/", query="stream=true")
+        self.assertEqual(status, 200)
+        self.assertEqual(len(json.loads(body)), 3)
+
+        status, _, _ = self.request("GET", "/no-such-route")
+        self.assertEqual(status, 404)
@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+import config
+from benchmarks.startup import probe
+from benchmarks.suite import compare, main, percentile
+
+
+def _result(p95=10.0, rps=100.0, queries=2, **meta):
+    return {
+        "meta": {"target": "client", "workers": None, "concurrency": 1, "volumes": {}, **meta},
+        "scenarios": {"mechanics.list": {"p95_ms": p95, "throughput_rps": rps, "queries": queries}},
+    }
+
+
+class TestRegressionGate(unittest.TestCase):
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_within_tolerance_passes(self):
+        self.assertEqual(compare(_result(), _result(p95=12.0, rps=90.0)), [])
+
+    def test_slower_fewer_or_more_queries_fail(self):
+        failures = compare(_result(), _result(p95=20.0, rps=50.0, queries=3))
+        self.assertEqual(len(failures), 3)
+        self.assertTrue(any("queries" in f for f in failures))
+
+    def test_different_settings_are_not_compared(self):
+        failures = compare(_result(), _result(target="gunicorn"))
+        self.assertEqual(len(failures), 1)
+        self.assertIn("target", failures[0])
+
+
+class TestSuiteSmoke(unittest.TestCase):
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.out = self.db_path + ".json"
+
+    def tearDown(self):
+        for path in (self.db_path, self.out):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_client_run_records_and_gates(self):
+        patches = [
+            mock.patch.object(config.BenchmarkConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{self.db_path}"),
+            mock.patch.object(config.BenchmarkConfig, "PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000"),
+        ]
+        argv = [
+            "--customers", "3", "--mechanics", "3", "--parts", "3", "--tickets", "10",
+            "--iterations", "2", "--warmup", "0", "--only", "mechanics", "--only", "service_tickets.list",
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        with redirect_stdout(StringIO()):
+            self.assertEqual(main(argv + ["--out", self.out]), 0)
+
+        with open(self.out) as f:
+            results = json.load(f)
+        scenarios = results["scenarios"]
+        self.assertIn("mechanics.delete", scenarios)
+        self.assertIn("service_tickets.list", scenarios)
+        self.assertEqual(scenarios["mechanics.delete"]["statuses"], {"200": 2})
+        for row in scenarios.values():
+            self.assertIn("queries", row)
+            self.assertLessEqual(row["p50_ms"], row["p99_ms"])
+
+        # A fresh run against its own baseline passes the gate (generous slack)
+        with redirect_stdout(StringIO()):
+            self.assertEqual(main(argv + ["--baseline", self.out, "--slack-ms", "1000", "--max-regression", "0.95"]), 0)
+
+
+class TestStartup(unittest.TestCase):
+    def test_boot_skips_lazy_modules(self):
+        result = probe("TestingConfig")
+        self.assertEqual(result["modules"], [])
+        self.assertGreater(result["total_ms"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+from datetime import datetime
+
+from app.extensions import db
+from app.models import Customer, Inventory, Mechanic, ServiceTicket
+from tests.base import DatabaseTestCase
+from tests.query_counter import assert_max_queries
+
+
+class TestCosts(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+
+        with self.app.app_context():
+            ann = Customer(name="Ann", email="ann@example.com", password="pw")
+            bob = Customer(name="Bob", email="bob@example.com", password="pw")
+            alex = Mechanic(name="Alex")
+            sam = Mechanic(name="Sam")
+            pads = Inventory(name="Brake Pad", price=49.99)
+            oil = Inventory(name="Oil", price=10.0)
+            filter_ = Inventory(name="Filter", price=5.5)
+
+            january = ServiceTicket(
+                description="Brakes", status="closed", customer=ann, created_at=datetime(2024, 1, 10)
+            )
+            january.parts.extend([pads, oil])
+            january.mechanics.extend([alex, sam])
+            february = ServiceTicket(
+                description="Oil change", status="open", customer=bob, created_at=datetime(2024, 2, 5)
+            )
+            february.parts.extend([oil, filter_])
+            february.mechanics.append(sam)
+            march = ServiceTicket(description="Look", status="open", customer=ann, created_at=datetime(2024, 3, 1))
+
+            db.session.add_all([january, february, march])
+            db.session.commit()
+            self.ids = {
+                "ann": ann.id, "bob": bob.id, "alex": alex.id, "sam": sam.id,
+                "january": january.id, "march": march.id, "filter": filter_.id,
+            }
+
+    def test_ticket_cost(self):
+        response = self.client.get(f"/service-tickets/{self.ids['january']}/cost")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {"ticket_id": self.ids["january"], "parts": 2, "parts_total": 59.99})
+
+        response = self.client.get(f"/service-tickets/{self.ids['march']}/cost")
+        self.assertEqual(response.json["parts_total"], 0)
+
+        self.assertEqual(self.client.get("/service-tickets/999/cost").status_code, 404)
+
+    def test_ticket_costs_with_filters(self):
+        with assert_max_queries(self, self.app, 1):
+            response = self.client.get("/service-tickets/costs")
+        self.assertEqual(response.json, {"tickets": 3, "parts": 4, "parts_total": 75.49})
+
+        response = self.client.get("/service-tickets/costs?created_after=2024-02-01&created_before=2024-03-01")
+        self.assertEqual(response.json, {"tickets": 1, "parts": 2, "parts_total": 15.5})
+
+        response = self.client.get("/service-tickets/costs?status=open")
+        self.assertEqual(response.json["tickets"], 2)
+
+        response = self.client.get("/service-tickets/costs?created_after=last-week")
+        self.assertEqual(response.status_code, 400)
+
+    def test_customer_spend(self):
+        with assert_max_queries(self, self.app, 1):
+            response = self.client.get("/customers/spend")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, [
+            {"id": self.ids["ann"], "name": "Ann", "tickets": 2, "parts": 2, "parts_total": 59.99},
+            {"id": self.ids["bob"], "name": "Bob", "tickets": 1, "parts": 2, "parts_total": 15.5},
+        ])
+
+        response = self.client.get("/customers/spend?limit=1")
+        self.assertEqual([row["name"] for row in response.json], ["Ann"])
+
+        response = self.client.get(f"/customers/spend?customer_id={self.ids['bob']}&created_before=2024-02-01")
+        self.assertEqual(response.json, [])
+
+        self.assertEqual(self.client.get("/customers/spend?limit=0").status_code, 400)
+
+    def test_mechanic_revenue(self):
+        with assert_max_queries(self, self.app, 1):
+            response = self.client.get("/mechanics/revenue")
+        self.assertEqual(response.status_code, 200)
+        # The January ticket counts in full for both of its mechanics
+        self.assertEqual(response.json, [
+            {"id": self.ids["sam"], "name": "Sam", "tickets": 2, "parts": 4, "parts_total": 75.49},
+            {"id": self.ids["alex"], "name": "Alex", "tickets": 1, "parts": 2, "parts_total": 59.99},
+        ])
+
+        response = self.client.get("/mechanics/revenue?created_after=2024-02-01")
+        self.assertEqual([row["name"] for row in response.json], ["Sam"])
+
+        # Everyone on the tickets Alex worked
+        response = self.client.get(f"/mechanics/revenue?mechanic_id={self.ids['alex']}")
+        self.assertEqual([row["parts_total"] for row in response.json], [59.99, 59.99])
+
+    def test_totals_are_cached_until_parts_change(self):
+        first = self.client.get("/service-tickets/costs")
+        self.assertEqual(first.headers["X-Cache"], "MISS")
+        self.assertEqual(self.client.get("/service-tickets/costs").headers["X-Cache"], "HIT")
+
+        with self.app.app_context():
+            ticket = db.session.get(ServiceTicket, self.ids["march"])
+            ticket.parts.append(db.session.get(Inventory, self.ids["filter"]))
+            db.session.commit()
+
+        response = self.client.get("/service-tickets/costs")
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        self.assertEqual(response.json["parts_total"], 80.99)
+
+        self.app.config["COSTS_CACHE_ENABLED"] = False
+        self.assertNotIn("X-Cache", self.client.get("/service-tickets/costs").headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,20 +1,20 @@
 import unittest
-from app import create_app
+from unittest import mock
+
+from werkzeug.security import check_password_hash
+
 from app.extensions import db
 from app.models import Customer, ServiceTicket
+from app.passwords import PasswordHasher
+from tests.base import DatabaseTestCase
+from tests.query_counter import QueryCounter
 
 
-class TestCustomers(unittest.TestCase):
+class TestCustomers(DatabaseTestCase):
     def setUp(self):
-        self.app = create_app("TestingConfig")
+        super().setUp()
         self.app.config["WTF_CSRF_ENABLED"] = False
 
-        with self.app.app_context():
-            db.drop_all()
-            db.create_all()
-
-        self.client = self.app.test_client()
-
     # Creates a customer directly in DB
     def _create_customer_in_db(self, name="Test User", email="test@example.com", password="password"):
         with self.app.app_context():
@@ -23,18 +23,13 @@ class TestCustomers(unittest.TestCase):
             db.session.commit()
             return customer
 
-    # Get token via login endpoint
-    def _get_token_for_customer(self, email="test@example.com", password="password"):
-        # Ensure customer exists
-        self._create_customer_in_db(email=email, password=password)
-
-        credentials = {
-            "email": email,
-            "password": password,
-        }
-        response = self.client.post("/customers/login", json=credentials)
-        self.assertEqual(response.status_code, 200)
-        return response.json["token"]
+    # Auth header for a new customer (token minted directly, no login request)
+    def _auth_header_for_new_customer(self, email="test@example.com", password="password"):
+        with self.app.app_context():
+            customer = Customer(name="Test User", email=email, password=password)
+            db.session.add(customer)
+            db.session.commit()
+            return self.auth_header_for(customer.id)
 
     def test_create_customer_success(self):
         payload = {
@@ -48,6 +43,65 @@ class TestCustomers(unittest.TestCase):
         self.assertEqual(response.json["name"], "John Doe")
         self.assertEqual(response.json["email"], "john@example.com")
 
+    def test_create_customer_stores_password_hash(self):
+        payload = {"name": "Hashed", "email": "hashed@example.com", "password": "secret123"}
+        self.assertEqual(self.client.post("/customers/", json=payload).status_code, 201)
+
+        with self.app.app_context():
+            stored = Customer.query.filter_by(email="hashed@example.com").first().password
+        self.assertNotEqual(stored, "secret123")
+        self.assertTrue(stored.startswith("pbkdf2:sha256:1000$"))
+
+        login = self.client.post(
+            "/customers/login", json={"email": "hashed@example.com", "password": "secret123"}
+        )
+        self.assertEqual(login.status_code, 200)
+
+    def test_login_rehashes_plain_and_outdated_passwords(self):
+        # Row from before hashing existed: plain text
+        self._create_customer_in_db(email="legacy@example.com", password="mypw")
+        credentials = {"email": "legacy@example.com", "password": "mypw"}
+
+        self.assertEqual(self.client.post("/customers/login", json=credentials).status_code, 200)
+        with self.app.app_context():
+            stored = Customer.query.filter_by(email="legacy@example.com").first().password
+        self.assertTrue(stored.startswith("pbkdf2:sha256:1000$"))
+
+        # Cost raised: next successful login upgrades the hash
+        self.app.config["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256:2000"
+        self.assertEqual(self.client.post("/customers/login", json=credentials).status_code, 200)
+        with self.app.app_context():
+            stored = Customer.query.filter_by(email="legacy@example.com").first().password
+        self.assertTrue(stored.startswith("pbkdf2:sha256:2000$"))
+
+        wrong = {"email": "legacy@example.com", "password": "nope"}
+        self.assertEqual(self.client.post("/customers/login", json=wrong).status_code, 401)
+
+    def test_method_without_cost_does_not_rehash_every_login(self):
+        self.app.config["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256"  # werkzeug's default cost
+        self.client.post("/customers/", json={"name": "Ann", "email": "ann@example.com", "password": "pw"})
+        with self.app.app_context():
+            stored = Customer.query.filter_by(email="ann@example.com").first().password
+        self.assertRegex(stored, r"^pbkdf2:sha256:\d+\$")
+
+        credentials = {"email": "ann@example.com", "password": "pw"}
+        with mock.patch("app.blueprints.customers.routes.hash_password") as rehash:
+            self.assertEqual(self.client.post("/customers/login", json=credentials).status_code, 200)
+        rehash.assert_not_called()
+
+    def test_login_returns_503_when_hash_pool_is_saturated(self):
+        payload = {"name": "Busy", "email": "busy@example.com", "password": "pw"}
+        self.client.post("/customers/", json=payload)
+
+        hasher = PasswordHasher(workers=1, queue=0)
+        hasher._slots.acquire()  # the only slot is taken
+        self.app.extensions["password_hasher"] = hasher
+
+        response = self.client.post(
+            "/customers/login", json={"email": "busy@example.com", "password": "pw"}
+        )
+        self.assertEqual(response.status_code, 503)
+
     def test_create_customer_missing_email(self):
         payload = {
             "name": "No Email",
@@ -59,6 +113,48 @@ class TestCustomers(unittest.TestCase):
         self.assertIn("error", response.json)
         self.assertIn("name, email, and password are required", response.json["error"])
 
+    def test_create_customers_bulk(self):
+        payload = [
+            {"name": f"Bulk{i}", "email": f"bulk{i}@example.com", "password": "pw"}
+            for i in range(3)
+        ]
+        response = self.client.post("/customers/bulk", json=payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json["created"], 3)
+        self.assertEqual(len(response.json["ids"]), 3)
+
+        with self.app.app_context():
+            self.assertEqual(Customer.query.count(), 3)
+
+    def test_create_customers_bulk_reports_errors_per_item(self):
+        self._create_customer_in_db(email="taken@example.com")
+        payload = [
+            {"name": "Ok", "email": "ok@example.com", "password": "pw"},
+            {"name": "No Password", "email": "nopw@example.com"},
+            {"name": "Taken", "email": "taken@example.com", "password": "pw"},
+            {"name": "Dup", "email": "ok@example.com", "password": "pw"},
+        ]
+        response = self.client.post("/customers/bulk", json=payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sorted(response.json["errors"]), ["1", "2", "3"])
+
+        # All-or-nothing: the valid row wasn't inserted either
+        with self.app.app_context():
+            self.assertEqual(Customer.query.count(), 1)
+
+    def test_create_customers_bulk_rejects_bad_types(self):
+        payload = [
+            {"name": "Ok", "email": "ok@example.com", "password": "pw"},
+            {"name": "List", "email": ["a@example.com"], "password": "pw"},
+            {"name": "Dict", "email": {"x": 1}, "password": "pw"},
+            {"name": "Not an email", "email": "notanemail", "password": "pw"},
+            {"name": "", "email": "empty@example.com", "password": "pw"},
+        ]
+        response = self.client.post("/customers/bulk", json=payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sorted(response.json["errors"]), ["1", "2", "3", "4"])
+        self.assertIn("email", response.json["errors"]["3"])
+
     def test_get_customers_paginated(self):
         # Seed a few customers
         with self.app.app_context():
@@ -72,6 +168,27 @@ class TestCustomers(unittest.TestCase):
         self.assertIn("items", response.json)
         self.assertLessEqual(len(response.json["items"]), 5)
 
+    def test_get_customers_cursor_pages(self):
+        with self.app.app_context():
+            for i in range(7):
+                c = Customer(name=f"User{i}", email=f"user{i}@example.com", password="pw")
+                db.session.add(c)
+            db.session.commit()
+
+        first = self.client.get("/customers/?limit=5&include_total=true")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.json["items"]), 5)
+        self.assertEqual(first.json["total"], 7)
+        self.assertIsNotNone(first.json["next_cursor"])
+
+        cursor = first.json["next_cursor"]
+        second = self.client.get(f"/customers/?after={cursor}&limit=5")
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(len(second.json["items"]), 2)
+        self.assertIsNone(second.json["next_cursor"])
+        self.assertNotIn("total", second.json)
+        self.assertEqual(second.json["items"][0]["name"], "User5")
+
     def test_login_success(self):
         # Create user in DB
         self._create_customer_in_db(email="login@example.com", password="mypw")
@@ -94,6 +211,19 @@ class TestCustomers(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json["error"], "Invalid email or password")
 
+    def test_login_runs_kdf_for_unknown_email(self):
+        self.client.post("/customers/", json={"name": "A", "email": "known@example.com", "password": "pw"})
+
+        with mock.patch("app.passwords.check_password_hash", wraps=check_password_hash) as kdf:
+            for email in ("known@example.com", "unknown@example.com"):
+                kdf.reset_mock()
+                response = self.client.post("/customers/login", json={"email": email, "password": "wrong"})
+                self.assertEqual(response.status_code, 401)
+                self.assertEqual(kdf.call_count, 1, email)
+                # Same method and cost either way
+                stored = kdf.call_args.args[0]
+                self.assertTrue(stored.startswith("pbkdf2:sha256:1000$"), email)
+
     def test_my_tickets_requires_token(self):
         response = self.client.get("/customers/my-tickets")
         self.assertEqual(response.status_code, 401)
@@ -114,22 +244,37 @@ class TestCustomers(unittest.TestCase):
             )
             db.session.add(ticket)
             db.session.commit()
+            headers = self.auth_header_for(customer.id)
 
-        # Login to get token
-        credentials = {
-            "email": "owner@example.com",
-            "password": "pw",
-        }
-        login_resp = self.client.post("/customers/login", json=credentials)
-        self.assertEqual(login_resp.status_code, 200)
-        token = login_resp.json["token"]
-
-        headers = {"Authorization": f"Bearer {token}"}
         response = self.client.get("/customers/my-tickets", headers=headers)
         self.assertEqual(response.status_code, 200)
         self.assertIsInstance(response.json, list)
         self.assertGreaterEqual(len(response.json), 1)
 
+    def test_token_required_caches_customer_lookup(self):
+        headers = self._auth_header_for_new_customer()
+
+        self.assertEqual(self.client.get("/customers/my-tickets", headers=headers).status_code, 200)
+
+        # Second call: token + customer existence come from the cache
+        with QueryCounter(self.app) as counter:
+            response = self.client.get("/customers/my-tickets", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any("FROM customers" in sql for sql in counter.statements))
+
+    def test_token_rejected_after_customer_deleted(self):
+        headers = self._auth_header_for_new_customer()
+        self.assertEqual(self.client.get("/customers/my-tickets", headers=headers).status_code, 200)
+
+        with self.app.app_context():
+            customer = Customer.query.filter_by(email="test@example.com").first()
+            db.session.delete(customer)
+            db.session.commit()
+
+        response = self.client.get("/customers/my-tickets", headers=headers)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json["error"], "Customer not found")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+import config
+from app import create_app
+from app.dbpool import TimedQueuePool, pool_stats, warm_pool
+from app.extensions import db
+from tests.base import temp_database_uri
+
+
+class TestPoolProfile(unittest.TestCase):
+    def test_postgres_profile(self):
+        options = config.engine_options("postgresql://user@db/shop")
+        self.assertTrue(options["pool_pre_ping"])
+        self.assertIn("pool_size", options)
+        self.assertIn("pool_recycle", options)
+        self.assertIn("statement_timeout", options["connect_args"]["options"])
+
+    def test_sqlite_profile_has_no_server_options(self):
+        options = config.engine_options("sqlite:///testing.db")
+        self.assertEqual(set(options), {"connect_args"})
+        self.assertIn("timeout", options["connect_args"])
+
+    def test_app_engine_uses_timed_pool(self):
+        with mock.patch.object(config.TestingConfig, "SQLALCHEMY_DATABASE_URI", temp_database_uri(self)):
+            app = create_app("TestingConfig")
+        with app.app_context():
+            self.assertIsInstance(db.engine.pool, TimedQueuePool)
+            db.session.execute(text("SELECT 1"))
+            stats = pool_stats(db.engine)
+            db.session.remove()
+            db.engine.dispose()
+        self.assertGreaterEqual(stats["checkouts"], 1)
+        self.assertEqual(stats["checked_out"], 1)
+
+
+class TestTimedQueuePool(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.engine = create_engine(
+            f"sqlite:///{self.path}",
+            poolclass=TimedQueuePool,
+            pool_size=2,
+            max_overflow=0,
+            pool_timeout=0.2,
+        )
+
+    def tearDown(self):
+        self.engine.dispose()
+        os.remove(self.path)
+
+    def test_warm_up_opens_pool_size_connections(self):
+        warm_pool(self.engine, 10)  # capped at pool_size
+        stats = pool_stats(self.engine)
+        self.assertEqual(stats["connects"], 2)
+        self.assertEqual(stats["checked_in"], 2)
+        self.assertEqual(stats["checked_out"], 0)
+
+        # Later checkouts reuse the warm connections
+        with self.engine.connect():
+            pass
+        self.assertEqual(pool_stats(self.engine)["connects"], 2)
+
+    def test_exhausted_pool_records_wait_and_timeout(self):
+        held = [self.engine.connect(), self.engine.connect()]
+        errors = []
+
+        def checkout():
+            try:
+                self.engine.connect()
+            except PoolTimeout as e:
+                errors.append(e)
+
+        worker = threading.Thread(target=checkout)
+        worker.start()
+        worker.join()
+        for conn in held:
+            conn.close()
+
+        stats = pool_stats(self.engine)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertGreaterEqual(stats["wait_seconds_max"], 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import re
+import time
+import unittest
+from unittest import mock
+
+from flask import g
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import config
+from app import create_app
+from app.blueprints.service_tickets.schemas import service_ticket_schema
+from app.extensions import db
+from app.instrumentation import _start_request
+from app.models import Customer, Mechanic, ServiceTicket
+from tests.base import temp_database_uri
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        with mock.patch.multiple(
+            config.TestingConfig,
+            SQLALCHEMY_DATABASE_URI=temp_database_uri(self),
+            INSTRUMENTATION_ENABLED=True,
+            create=True,
+        ):
+            self.app = create_app("TestingConfig")
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            customer = Customer(name="Owner", email="owner@example.com", password="pw")
+            mechanic = Mechanic(name="Mia", specialization="Brakes")
+            ticket = ServiceTicket(description="Brakes", vehicle="Civic", customer=customer)
+            ticket.mechanics.append(mechanic)
+            db.session.add(ticket)
+            db.session.commit()
+            self.ticket_id = ticket.id
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+    def _metric(self, body: str, name: str, endpoint: str) -> float:
+        match = re.search(
+            rf'^{name}{{endpoint="{re.escape(endpoint)}",method="GET"}} (\S+)$', body, re.M
+        )
+        self.assertIsNotNone(match, f"{name} for {endpoint} missing")
+        return float(match.group(1))
+
+    def test_server_timing_header(self):
+        response = self.client.get("/service-tickets/")
+        self.assertEqual(response.status_code, 200)
+
+        timing = response.headers["Server-Timing"]
+        for name in ("app", "db", "serialize", "ratelimit"):
+            self.assertRegex(timing, rf"\b{name};dur=[\d.]+")
+        self.assertRegex(timing, r'desc="\d+ queries"')
+
+    def test_metrics_endpoint_reports_per_route_numbers(self):
+        self.client.get("/service-tickets/")
+        self.client.get("/service-tickets/")
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.mimetype.startswith("text/plain"))
+        body = response.get_data(as_text=True)
+
+        endpoint = "service_tickets_bp.get_tickets"
+        self.assertIn(
+            f'http_requests_total{{endpoint="{endpoint}",method="GET",status="200"}} 2', body
+        )
+        self.assertIn(
+            f'http_request_duration_seconds_count{{endpoint="{endpoint}",method="GET"}} 2', body
+        )
+        self.assertGreater(self._metric(body, "db_queries_total", endpoint), 0)
+        self.assertGreater(self._metric(body, "http_response_bytes_total", endpoint), 0)
+        # Relationships are eager-loaded: dumping the list issues no SQL
+        self.assertEqual(self._metric(body, "serialization_db_queries_total", endpoint), 0)
+        self.assertIn("ratelimit_check_duration_seconds_count", body)
+        self.assertIn('cache_requests_total{result="hit"}', body)
+        self.assertIn('db_pool_checkouts_total{bind="default"}', body)
+        self.assertIn('db_pool_checked_out{bind="default"}', body)
+
+    def test_lazy_loads_during_dump_are_counted(self):
+        with self.app.test_request_context("/"):
+            _start_request()
+            ticket = db.session.get(ServiceTicket, self.ticket_id)  # no eager loading
+            service_ticket_schema.dump(ticket)
+
+            self.assertGreater(g._instrumentation["serialize_queries"], 0)
+            self.assertGreater(g._instrumentation["serialize_seconds"], 0)
+
+    def test_failed_statement_leaves_no_start_time(self):
+        with self.app.test_request_context("/"):
+            _start_request()
+            with self.assertRaises(OperationalError):
+                db.session.execute(text("SELECT * FROM no_such_table"))
+            db.session.rollback()
+
+            failed_at = time.perf_counter()
+            time.sleep(0.05)
+
+            start = time.perf_counter()
+            db.session.execute(text("SELECT 1"))
+            elapsed = time.perf_counter() - start
+
+            # Only the successful statement, timed from its own start
+            self.assertEqual(g._instrumentation["sql_queries"], 1)
+            self.assertLessEqual(g._instrumentation["sql_seconds"], elapsed)
+            self.assertLess(g._instrumentation["sql_seconds"], start - failed_at)
+
+    def test_only_the_apps_engines_are_timed(self):
+        other = create_engine("sqlite://")
+        with self.app.test_request_context("/"):
+            _start_request()
+            with other.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            self.assertEqual(g._instrumentation["sql_queries"], 0)
+
+            db.session.execute(text("SELECT 1"))
+            self.assertEqual(g._instrumentation["sql_queries"], 1)
+        other.dispose()
+
+    def test_disabled_by_default(self):
+        app = create_app("TestingConfig")
+        self.assertEqual(app.test_client().get("/metrics").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
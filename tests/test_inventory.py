@@ -1,18 +1,12 @@
 import unittest
-from app import create_app
 from app.extensions import db
-from app.models import Customer, Inventory
+from app.models import Customer, Inventory, ServiceTicket
+from tests.base import DatabaseTestCase
 
 
-class TestInventory(unittest.TestCase):
+class TestInventory(DatabaseTestCase):
     def setUp(self):
-        self.app = create_app("TestingConfig")
-
-        with self.app.app_context():
-            db.drop_all()
-            db.create_all()
-
-        self.client = self.app.test_client()
+        super().setUp()
 
         # Create a default customer + token so we can hit token-protected inventory routes
         with self.app.app_context():
@@ -23,14 +17,9 @@ class TestInventory(unittest.TestCase):
             )
             db.session.add(self.customer)
             db.session.commit()
+            customer_id = self.customer.id
 
-        login_resp = self.client.post(
-            "/customers/login",
-            json={"email": "inv@example.com", "password": "pw"},
-        )
-        self.assertEqual(login_resp.status_code, 200)
-        self.token = login_resp.json["token"]
-        self.auth_header = {"Authorization": f"Bearer {self.token}"}
+        self.auth_header = self.auth_header_for(customer_id)
 
     def test_create_inventory_item(self):
         payload = {
@@ -46,6 +35,19 @@ class TestInventory(unittest.TestCase):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.json["name"], "Oil Filter")
 
+    def test_create_inventory_bulk(self):
+        payload = [{"name": f"Part {i}", "price": 1.5 * i} for i in range(50)]
+        response = self.client.post(
+            "/inventory/bulk",
+            json=payload,
+            headers=self.auth_header,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json["created"], 50)
+
+        with self.app.app_context():
+            self.assertEqual(Inventory.query.count(), 50)
+
     def test_get_inventory_list(self):
         with self.app.app_context():
             part = Inventory(name="Spark Plug", price=9.99)
@@ -57,6 +59,23 @@ class TestInventory(unittest.TestCase):
         self.assertIsInstance(response.json, list)
         self.assertGreaterEqual(len(response.json), 1)
 
+    def test_get_inventory_stream(self):
+        with self.app.app_context():
+            db.session.add_all(
+                [Inventory(name=f"Part {i}", price=1.0 + i) for i in range(3)]
+            )
+            db.session.commit()
+
+        response = self.client.get("/inventory/?stream=true")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertEqual([item["name"] for item in response.json], ["Part 0", "Part 1", "Part 2"])
+
+    def test_get_inventory_invalid_cursor(self):
+        response = self.client.get("/inventory/?after=not-a-cursor")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json["error"], "Invalid cursor")
+
     def test_get_single_inventory_item(self):
         with self.app.app_context():
             part = Inventory(name="Alternator", price=199.99)
@@ -87,6 +106,45 @@ class TestInventory(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json["price"], 20.0)
 
+    def test_update_inventory_item_if_match(self):
+        with self.app.app_context():
+            part = Inventory(name="Air Filter", price=25.0, stock=10)
+            ticket = ServiceTicket(description="Job", customer_id=self.customer.id)
+            db.session.add_all([part, ticket])
+            db.session.commit()
+            pid, tid = part.id, ticket.id
+
+        response = self.client.get(f"/inventory/{pid}")
+        etag = response.headers["ETag"]
+        self.assertEqual(etag, '"1"')
+        not_modified = self.client.get(f"/inventory/{pid}", headers={"If-None-Match": etag})
+        self.assertEqual(not_modified.status_code, 304)
+
+        # Taking stock changes the item, so a price edit based on the old read is refused
+        self.client.put(f"/service-tickets/{tid}/add-part/{pid}", headers=self.auth_header)
+        headers = {**self.auth_header, "If-Match": etag}
+        response = self.client.put(f"/inventory/{pid}", json={"price": 20.0}, headers=headers)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response.headers["ETag"], '"2"')
+
+        headers["If-Match"] = response.headers["ETag"]
+        response = self.client.put(f"/inventory/{pid}", json={"price": 20.0}, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["stock"], 9)
+        self.assertEqual(response.headers["ETag"], '"3"')
+
+    def test_delete_inventory_item_if_match(self):
+        with self.app.app_context():
+            part = Inventory(name="Spare", price=5.0)
+            db.session.add(part)
+            db.session.commit()
+            pid = part.id
+
+        headers = {**self.auth_header, "If-Match": '"2"'}
+        self.assertEqual(self.client.delete(f"/inventory/{pid}", headers=headers).status_code, 412)
+        headers["If-Match"] = self.client.get(f"/inventory/{pid}").headers["ETag"]
+        self.assertEqual(self.client.delete(f"/inventory/{pid}", headers=headers).status_code, 200)
+
     def test_delete_inventory_item(self):
         with self.app.app_context():
             part = Inventory(name="To Delete", price=5.0)
@@ -1,18 +1,17 @@
 import unittest
-from app import create_app
-from app.extensions import db
-from app.models import Mechanic, ServiceTicket, Customer
+from unittest import mock
 
+from sqlalchemy import update
 
-class TestMechanics(unittest.TestCase):
-    def setUp(self):
-        self.app = create_app("TestingConfig")
+from app.blueprints.mechanics.schemas import MechanicSchema
+from app.extensions import db
+from app.models import Mechanic, ServiceTicket, Customer
+from app.ticket_counts import refresh_ticket_counts
+from tests.base import DatabaseTestCase
+from tests.query_counter import assert_max_queries
 
-        with self.app.app_context():
-            db.drop_all()
-            db.create_all()
 
-        self.client = self.app.test_client()
+class TestMechanics(DatabaseTestCase):
 
     def test_create_mechanic(self):
         payload = {
@@ -24,6 +23,35 @@ class TestMechanics(unittest.TestCase):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.json["name"], "Alex Wrench")
 
+    def test_create_mechanics_bulk(self):
+        payload = [
+            {"name": "Bulk One", "specialization": "Engine"},
+            {"name": "Bulk Two"},
+        ]
+        response = self.client.post("/mechanics/bulk", json=payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json["created"], 2)
+
+        with self.app.app_context():
+            m = db.session.get(Mechanic, response.json["ids"][1])
+            self.assertEqual(m.name, "Bulk Two")
+            self.assertTrue(m.is_active)
+
+    def test_create_mechanics_bulk_is_one_multi_row_insert(self):
+        payload = [{"name": f"Hire {i}"} for i in range(50)]
+        with assert_max_queries(self, self.app, 1):
+            response = self.client.post("/mechanics/bulk", json=payload)
+        self.assertEqual(response.status_code, 201)
+
+        with self.app.app_context():
+            names = [db.session.get(Mechanic, i).name for i in response.json["ids"]]
+        self.assertEqual(names, [row["name"] for row in payload])
+
+    def test_create_mechanics_bulk_validation_error(self):
+        response = self.client.post("/mechanics/bulk", json=[{"name": "Ok"}, {"specialization": "x"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("1", response.json["errors"])
+
     def test_get_mechanics(self):
         # Seed a mechanic
         with self.app.app_context():
@@ -36,6 +64,26 @@ class TestMechanics(unittest.TestCase):
         self.assertIsInstance(response.json, list)
         self.assertGreaterEqual(len(response.json), 1)
 
+    def test_get_mechanics_cache_invalidated_on_commit(self):
+        first = self.client.get("/mechanics/")
+        self.assertEqual(first.headers["X-Cache"], "MISS")
+        self.assertEqual(first.json, [])
+
+        second = self.client.get("/mechanics/")
+        self.assertEqual(second.headers["X-Cache"], "HIT")
+
+        self.client.post("/mechanics/", json={"name": "New Hire"})
+
+        third = self.client.get("/mechanics/")
+        self.assertEqual(third.headers["X-Cache"], "MISS")
+        self.assertEqual([m["name"] for m in third.json], ["New Hire"])
+
+        # Bulk inserts bypass the flush but still invalidate
+        self.client.post("/mechanics/bulk", json=[{"name": "Bulk Hire"}])
+        fourth = self.client.get("/mechanics/")
+        self.assertEqual(fourth.headers["X-Cache"], "MISS")
+        self.assertEqual(len(fourth.json), 2)
+
     def test_update_mechanic(self):
         with self.app.app_context():
             m = Mechanic(name="Old Name", specialization="General")
@@ -50,6 +98,130 @@ class TestMechanics(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json["name"], "New Name")
 
+    def test_update_mechanic_if_match(self):
+        with self.app.app_context():
+            m = Mechanic(name="Old Name", specialization="General")
+            db.session.add(m)
+            db.session.commit()
+            mid = m.id
+
+        first = self.client.put(f"/mechanics/{mid}", json={"name": "A"}, headers={"If-Match": '"1"'})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["ETag"], '"2"')
+        self.assertNotIn("version_id", first.json)
+
+        # A second desk still holding version 1 doesn't overwrite "A"
+        stale = self.client.put(f"/mechanics/{mid}", json={"name": "B"}, headers={"If-Match": '"1"'})
+        self.assertEqual(stale.status_code, 412)
+        self.assertEqual(stale.headers["ETag"], '"2"')
+
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Mechanic, mid).name, "A")
+
+    def test_update_mechanic_conflicting_commit(self):
+        with self.app.app_context():
+            m = Mechanic(name="Old Name")
+            db.session.add(m)
+            db.session.commit()
+            mid = m.id
+
+        load = MechanicSchema.load
+
+        def load_then_concurrent_update(schema, *args, **kwargs):
+            # Another request commits between this one's read and its UPDATE
+            db.session.execute(
+                update(Mechanic).where(Mechanic.id == mid).values(name="Other", version_id=Mechanic.version_id + 1)
+                .execution_options(synchronize_session=False)
+            )
+            return load(schema, *args, **kwargs)
+
+        with mock.patch.object(MechanicSchema, "load", load_then_concurrent_update):
+            response = self.client.put(f"/mechanics/{mid}", json={"name": "Mine"})
+        self.assertEqual(response.status_code, 412)
+
+    def test_get_mechanic_etag_flow(self):
+        with self.app.app_context():
+            m = Mechanic(name="Alex")
+            db.session.add(m)
+            db.session.commit()
+            mid = m.id
+
+        response = self.client.get(f"/mechanics/{mid}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["name"], "Alex")
+        etag = response.headers["ETag"]
+        self.assertEqual(self.client.get(f"/mechanics/{mid}", headers={"If-None-Match": etag}).status_code, 304)
+
+        # Read -> conditional write, no blind PUT needed
+        response = self.client.put(f"/mechanics/{mid}", json={"name": "Alexa"}, headers={"If-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(f"/mechanics/{mid}").headers["ETag"], response.headers["ETag"])
+
+        self.assertEqual(self.client.get("/mechanics/999").status_code, 404)
+
+    def test_ticket_count_change_moves_mechanic_etag(self):
+        with self.app.app_context():
+            customer = Customer(name="Owner", email="etag-owner@example.com", password="pw")
+            m = Mechanic(name="Alex")
+            db.session.add_all([customer, m])
+            db.session.commit()
+            mid, cid = m.id, customer.id
+
+        etag = self.client.get(f"/mechanics/{mid}").headers["ETag"]
+        with self.app.app_context():
+            ticket = ServiceTicket(description="Job", customer_id=cid)
+            ticket.mechanics.append(db.session.get(Mechanic, mid))
+            db.session.add(ticket)
+            db.session.commit()
+            tid = ticket.id
+
+        response = self.client.get(f"/mechanics/{mid}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["ticket_count"], 1)
+        etag = response.headers["ETag"]
+
+        # A recount that changes nothing leaves the version alone
+        with self.app.app_context():
+            refresh_ticket_counts(db.session, {mid})
+            db.session.commit()
+        self.assertEqual(self.client.get(f"/mechanics/{mid}").headers["ETag"], etag)
+
+        # Assignment changes through /edit (Core statements) move it too
+        response = self.client.put(
+            f"/service-tickets/{tid}/edit", json={"remove_ids": [mid]}, headers=self.auth_header_for(cid)
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(f"/mechanics/{mid}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["ticket_count"], 0)
+
+    def test_delete_mechanic_if_match_and_conflict(self):
+        with self.app.app_context():
+            m = Mechanic(name="Delete Me")
+            db.session.add(m)
+            db.session.commit()
+            mid = m.id
+
+        stale = self.client.delete(f"/mechanics/{mid}", headers={"If-Match": '"7"'})
+        self.assertEqual(stale.status_code, 412)
+
+        delete = db.session.delete
+
+        def delete_after_concurrent_update(obj):
+            # Another request commits between this one's read and its DELETE
+            db.session.execute(
+                update(Mechanic).where(Mechanic.id == mid).values(version_id=Mechanic.version_id + 1)
+                .execution_options(synchronize_session=False)
+            )
+            delete(obj)
+
+        with mock.patch.object(db.session, "delete", delete_after_concurrent_update):
+            response = self.client.delete(f"/mechanics/{mid}")
+        self.assertEqual(response.status_code, 412)
+
+        with self.app.app_context():
+            self.assertIsNotNone(db.session.get(Mechanic, mid))
+
     def test_delete_mechanic(self):
         with self.app.app_context():
             m = Mechanic(name="Delete Me", specialization="None")
@@ -92,6 +264,37 @@ class TestMechanics(unittest.TestCase):
         # Busy Mech should be first
         self.assertGreaterEqual(len(response.json), 1)
         self.assertEqual(response.json[0]["name"], "Busy Mech")
+        self.assertEqual(response.json[0]["ticket_count"], 2)
+        self.assertEqual(response.json[1]["ticket_count"], 0)
+
+    def test_ticket_count_follows_ticket_edits(self):
+        with self.app.app_context():
+            c = Customer(name="Cust", email="cust@example.com", password="pw")
+            m1 = Mechanic(name="First", specialization="Engine")
+            m2 = Mechanic(name="Second", specialization="Brakes")
+            db.session.add_all([c, m1, m2])
+            db.session.commit()
+            t = ServiceTicket(description="Job", vehicle="Car", status="open", customer_id=c.id)
+            db.session.add(t)
+            db.session.commit()
+            tid, m1_id, m2_id, c_id = t.id, m1.id, m2.id, c.id
+
+        headers = self.auth_header_for(c_id)
+
+        self.client.put(f"/service-tickets/{tid}/edit", json={"add_ids": [m1_id, m2_id]}, headers=headers)
+        self.client.put(f"/service-tickets/{tid}/edit", json={"remove_ids": [m1_id]}, headers=headers)
+
+        response = self.client.get("/mechanics/by-ticket-count?limit=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, [
+            {"id": m2_id, "name": "Second", "specialization": "Brakes", "ticket_count": 1}
+        ])
+
+        # Deleting the ticket drops its assignments (ORM path)
+        with self.app.app_context():
+            db.session.delete(db.session.get(ServiceTicket, tid))
+            db.session.commit()
+            self.assertEqual(db.session.get(Mechanic, m2_id).ticket_count, 0)
 
 
 if __name__ == "__main__":
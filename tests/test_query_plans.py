@@ -0,0 +1,135 @@
+import os
+import re
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import upgrade
+from sqlalchemy import inspect, select, text
+
+import config
+from app import create_app
+from app.cli import init_migrate
+from app.extensions import db, include_in_migrations
+from app.models import Mechanic, ServiceTicket, mechanic_service_ticket, ticket_inventory
+from tests.base import temp_database_uri
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "migrations")
+
+# "SCAN service_tickets" with nothing after it = full table scan
+FULL_SCAN = re.compile(r"^SCAN \w+$")
+
+
+class TestQueryPlans(unittest.TestCase):
+    """
+    Builds the schema through the real migrations, then checks with
+    EXPLAIN QUERY PLAN that the hot queries are served by an index.
+    """
+
+    def setUp(self):
+        with mock.patch.object(config.TestingConfig, "SQLALCHEMY_DATABASE_URI", temp_database_uri(self)):
+            self.app = create_app("TestingConfig")
+        init_migrate(self.app)
+
+        with self.app.app_context():
+            upgrade(directory=MIGRATIONS_DIR)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+    def _plan(self, stmt) -> list:
+        with self.app.app_context():
+            sql = stmt.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+            rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+            return [row[-1] for row in rows]
+
+    def assertIndexed(self, stmt):
+        plan = self._plan(stmt)
+        for step in plan:
+            self.assertNotRegex(step, FULL_SCAN, f"Full table scan in plan: {plan}")
+            self.assertNotIn("TEMP B-TREE", step, f"Sort without index in plan: {plan}")
+
+    def test_migrations_match_models(self):
+        with self.app.app_context():
+            context = MigrationContext.configure(
+                db.session.connection(), opts={"include_name": include_in_migrations}
+            )
+            self.assertEqual(compare_metadata(context, db.metadata), [])
+
+    def test_my_tickets_uses_customer_index(self):
+        self.assertIndexed(select(ServiceTicket).where(ServiceTicket.customer_id == 1))
+
+    def test_ticket_filters_use_indexes(self):
+        self.assertIndexed(select(ServiceTicket).where(ServiceTicket.status == "open"))
+        self.assertIndexed(select(ServiceTicket).where(ServiceTicket.vehicle == "Honda"))
+        self.assertIndexed(
+            select(ServiceTicket).where(ServiceTicket.created_at >= datetime(2025, 1, 1))
+        )
+
+    def test_ticket_to_mechanics_and_parts_use_reverse_indexes(self):
+        # The shape of selectinload(ServiceTicket.mechanics / .parts)
+        self.assertIndexed(
+            select(mechanic_service_ticket.c.mechanic_id).where(
+                mechanic_service_ticket.c.service_ticket_id.in_([1, 2, 3])
+            )
+        )
+        self.assertIndexed(
+            select(ticket_inventory.c.inventory_id).where(
+                ticket_inventory.c.service_ticket_id.in_([1, 2, 3])
+            )
+        )
+
+    def test_keyset_page_and_leaderboard_need_no_sort(self):
+        self.assertIndexed(
+            select(ServiceTicket).where(ServiceTicket.id > 100).order_by(ServiceTicket.id).limit(20)
+        )
+        self.assertIndexed(
+            select(Mechanic).order_by(Mechanic.ticket_count.desc(), Mechanic.id).limit(10)
+        )
+
+
+class TestDeployDb(unittest.TestCase):
+    """`flask deploy-db`, the schema step of a deploy."""
+
+    def setUp(self):
+        with mock.patch.object(config.TestingConfig, "SQLALCHEMY_DATABASE_URI", temp_database_uri(self)):
+            self.app = create_app("TestingConfig")
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.engine.dispose()
+
+    def _deploy(self):
+        result = self.app.test_cli_runner().invoke(args=["deploy-db"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        with self.app.app_context():
+            version = db.session.execute(text("SELECT version_num FROM alembic_version")).scalar()
+            columns = {c["name"] for c in inspect(db.engine).get_columns("mechanics")}
+        return result.output, version, columns
+
+    def test_empty_database_is_upgraded_to_head(self):
+        output, version, columns = self._deploy()
+        self.assertNotIn("stamping", output)
+        self.assertEqual(version, "0007_ticket_vehicle_index")
+        self.assertIn("version_id", columns)
+
+    def test_pre_migration_database_is_stamped_then_upgraded(self):
+        # Tables as db.create_all used to leave them: baseline schema, no alembic_version
+        init_migrate(self.app)
+        with self.app.app_context():
+            upgrade(directory=MIGRATIONS_DIR, revision="0001_baseline")
+            db.session.execute(text("DROP TABLE alembic_version"))
+            db.session.commit()
+
+        output, version, columns = self._deploy()
+        self.assertIn("stamping 0001_baseline", output)
+        self.assertEqual(version, "0007_ticket_vehicle_index")
+        self.assertIn("ticket_count", columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from limits import parse
+from limits.strategies import MovingWindowRateLimiter
+
+import config
+from app import create_app
+from app.extensions import db
+from app.ratelimit import SQLiteStorage, ratelimit_stats
+from tests.base import temp_database_uri
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.uri = f"sqlite:///{self.path}"
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def test_workers_share_one_moving_window(self):
+        # Two storages on the same file = two gunicorn workers
+        worker_a = MovingWindowRateLimiter(SQLiteStorage(self.uri))
+        worker_b = MovingWindowRateLimiter(SQLiteStorage(self.uri))
+        limit = parse("3 per minute")
+
+        self.assertTrue(worker_a.hit(limit, "login", "1.2.3.4"))
+        self.assertTrue(worker_b.hit(limit, "login", "1.2.3.4"))
+        self.assertTrue(worker_a.hit(limit, "login", "1.2.3.4"))
+        self.assertFalse(worker_b.hit(limit, "login", "1.2.3.4"))
+        # Other clients have their own window
+        self.assertTrue(worker_b.hit(limit, "login", "5.6.7.8"))
+
+        stats = worker_a.get_window_stats(limit, "login", "1.2.3.4")
+        self.assertEqual(stats.remaining, 0)
+
+    def test_fixed_window_counters(self):
+        storage = SQLiteStorage(self.uri)
+        self.assertEqual(storage.incr("k", 60), 1)
+        self.assertEqual(storage.incr("k", 60, amount=2), 3)
+        self.assertEqual(storage.get("k"), 3)
+        storage.clear("k")
+        self.assertEqual(storage.get("k"), 0)
+
+
+class TestLimiterStorage(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        uri = f"sqlite:///{self.path}?timeout=0.01"
+
+        with mock.patch.multiple(
+            config.TestingConfig,
+            SQLALCHEMY_DATABASE_URI=temp_database_uri(self),
+            RATELIMIT_STORAGE_URI=uri,
+            create=True,
+        ):
+            self.app = create_app("TestingConfig")
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def test_login_limit_uses_shared_storage(self):
+        credentials = {"email": "nobody@example.com", "password": "x"}
+        checks = ratelimit_stats()["checks"]
+        statuses = [self.client.post("/customers/login", json=credentials).status_code for _ in range(6)]
+        self.assertEqual(statuses, [401] * 5 + [429])
+        # One timed check per request, the breached one included
+        self.assertEqual(ratelimit_stats()["checks"], checks + 6)
+
+        # The hits landed in the shared file, not in process memory
+        conn = sqlite3.connect(self.path)
+        (events,) = conn.execute("SELECT count(*) FROM ratelimit_events").fetchone()
+        conn.close()
+        self.assertGreaterEqual(events, 5)
+
+    def test_locked_storage_fails_open_and_is_counted(self):
+        before = ratelimit_stats()
+
+        blocker = sqlite3.connect(self.path, isolation_level=None)
+        blocker.execute("BEGIN EXCLUSIVE")
+        try:
+            response = self.client.get("/mechanics/")
+        finally:
+            blocker.execute("ROLLBACK")
+            blocker.close()
+
+        self.assertEqual(response.status_code, 200)
+        after = ratelimit_stats()
+        self.assertGreater(after["failures"], before["failures"])
+        self.assertGreater(after["checks"], before["checks"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine, text
+
+import config
+from app import create_app
+from app.extensions import cache, db
+from app.models import Mechanic
+from app.replicas import ReplicaSet, replica_engines, replica_stats
+
+
+class TestReadReplicas(unittest.TestCase):
+    """
+    Primary and replica are two SQLite files that are never synced, so
+    which one served a read shows in the data (= infinite replica lag).
+    """
+
+    def setUp(self):
+        self.paths = []
+        primary = self._tempdb()
+        replica = self._tempdb()
+        self.app = self._create_app(primary, [replica])
+
+        with self.app.app_context():
+            db.create_all()
+            self.replica = replica_engines(self.app)["replica_0"]
+            db.metadata.create_all(self.replica)
+            db.session.add(Mechanic(name="On Primary"))
+            db.session.commit()
+
+            with self.replica.begin() as conn:
+                conn.execute(text("INSERT INTO mechanics (name, is_active, ticket_count) VALUES ('On Replica', 1, 0)"))
+        # Seeding counts as a write: start with the replica caught up
+        self._replica_caught_up("mechanics")
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.engine.dispose()
+        self.replica.dispose()
+        for path in self.paths:
+            os.remove(path)
+
+    def _tempdb(self) -> str:
+        handle, path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.paths.append(path)
+        return f"sqlite:///{path}"
+
+    def _create_app(self, primary, replicas):
+        with mock.patch.multiple(
+            config.TestingConfig,
+            SQLALCHEMY_DATABASE_URI=primary,
+            REPLICA_DATABASE_URIS=replicas,
+        ):
+            return create_app("TestingConfig")
+
+    def _replica_caught_up(self, *tags):
+        # What REPLICA_STICKY_SECONDS passing does to the recent-write marks
+        with self.app.app_context():
+            cache.delete_many(*[f"replica:recent:{tag}" for tag in tags])
+
+    def _names(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [m["name"] for m in response.json]
+
+    def test_get_reads_from_replica(self):
+        before = replica_stats()
+        self.assertEqual(self._names(self.client.get("/mechanics/")), ["On Replica"])
+        self.assertEqual(replica_stats()["replica"], before["replica"] + 1)
+
+    def test_writes_go_to_primary(self):
+        response = self.client.post("/mechanics/", json={"name": "New Hire"})
+        self.assertEqual(response.status_code, 201)
+
+        with self.app.app_context():
+            with self.replica.connect() as conn:
+                names = conn.execute(text("SELECT name FROM mechanics")).scalars().all()
+            primary_names = db.session.execute(text("SELECT name FROM mechanics")).scalars().all()
+        self.assertEqual(names, ["On Replica"])
+        self.assertEqual(primary_names, ["On Primary", "New Hire"])
+
+    def test_writer_reads_its_own_writes(self):
+        self.client.post("/mechanics/", json={"name": "New Hire"})
+
+        # Same client: pinned to the primary for REPLICA_STICKY_SECONDS
+        self.assertEqual(
+            self._names(self.client.get("/mechanics/")), ["On Primary", "New Hire"]
+        )
+        # Anyone else reads from the replica again once it has had
+        # REPLICA_STICKY_SECONDS to catch up with the write
+        self._replica_caught_up("mechanics")
+        other = self.client.get("/mechanics/", environ_base={"REMOTE_ADDR": "10.0.0.9"})
+        self.assertEqual(self._names(other), ["On Replica"])
+
+    def test_writer_bypasses_response_cache(self):
+        # Another client caches what the (lagging) replica says
+        other = self.client.get("/mechanics/", environ_base={"REMOTE_ADDR": "10.0.0.9"})
+        self.assertEqual(self._names(other), ["On Replica"])
+
+        self.client.post("/mechanics/", json={"name": "New Hire"})
+        response = self.client.get("/mechanics/")
+        self.assertNotIn("X-Cache", response.headers)
+        self.assertEqual(self._names(response), ["On Primary", "New Hire"])
+
+    def test_lagging_replica_not_cached_after_write(self):
+        self.client.post("/mechanics/", json={"name": "New Hire"})
+        before = replica_stats()
+
+        # Not pinned, but the replica may still be behind the new tag
+        # version: read from the primary, so that's what gets cached and ETagged
+        other = {"REMOTE_ADDR": "10.0.0.9"}
+        first = self.client.get("/mechanics/", environ_base=other)
+        self.assertEqual(first.headers["X-Cache"], "MISS")
+        self.assertEqual(self._names(first), ["On Primary", "New Hire"])
+        self.assertEqual(replica_stats()["recent_write_reads"], before["recent_write_reads"] + 1)
+
+        third = {"REMOTE_ADDR": "10.0.0.10"}
+        hit = self.client.get("/mechanics/", environ_base=third)
+        self.assertEqual(hit.headers["X-Cache"], "HIT")
+        self.assertEqual(self._names(hit), ["On Primary", "New Hire"])
+
+        revalidated = self.client.get(
+            "/mechanics/", environ_base=third, headers={"If-None-Match": first.headers["ETag"]}
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        missing = "sqlite:///" + os.path.join(tempfile.gettempdir(), "no-such-dir", "replica.db")
+        app = self._create_app(self.app.config["SQLALCHEMY_DATABASE_URI"], [missing])
+
+        before = replica_stats()
+        response = app.test_client().get("/mechanics/")
+        self.assertEqual(self._names(response), ["On Primary"])
+        self.assertEqual(replica_stats()["health_failures"], before["health_failures"] + 1)
+
+    def test_no_replicas_configured(self):
+        app = create_app("TestingConfig")
+        self.assertNotIn("replicas", app.extensions)
+        self.assertEqual(replica_engines(app), {})
+
+
+class TestReplicaSet(unittest.TestCase):
+    def setUp(self):
+        self.engines = {
+            "replica_0": create_engine("sqlite://"),
+            "replica_1": create_engine("sqlite://"),
+            "replica_2": create_engine("sqlite:////no-such-dir/replica.db"),
+        }
+
+    def test_round_robin_skips_unhealthy(self):
+        replicas = ReplicaSet(self.engines, check_interval=60)
+        picked = [replicas.pick() for _ in range(4)]
+        self.assertEqual(
+            picked,
+            [
+                self.engines["replica_0"],
+                self.engines["replica_1"],
+                self.engines["replica_0"],  # replica_2 is down
+                self.engines["replica_1"],
+            ],
+        )
+
+    def test_all_down(self):
+        engines = {"replica_2": self.engines["replica_2"]}
+        self.assertIsNone(ReplicaSet(engines, check_interval=60).pick())
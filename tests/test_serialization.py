@@ -0,0 +1,142 @@
+import json
+import unittest
+import uuid
+from types import SimpleNamespace
+from datetime import datetime
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+from marshmallow import Schema, post_dump
+
+from app import create_app
+from app.blueprints.customers.schemas import customers_schema
+from app.blueprints.inventory.schemas import inventory_schema
+from app.blueprints.mechanics.schemas import mechanics_schema
+from app.blueprints.service_tickets.filters import TICKET_COLUMNS, TICKET_RELATIONSHIPS
+from app.blueprints.service_tickets.schemas import (
+    service_ticket_schema,
+    service_tickets_projection,
+    service_tickets_schema,
+)
+from app.instrumentation import TimedSchema
+from app.models import Customer, Inventory, Mechanic, ServiceTicket, TicketPart
+from app.serialization import CompiledSchema, FastJSONProvider, compile_serializer
+
+
+class TestCompiledSerializers(unittest.TestCase):
+    def setUp(self):
+        self.customer = Customer(
+            id=1, name="Ann", email="ann@example.com", password="x", created_at=datetime(2024, 5, 1, 8, 30)
+        )
+        self.mechanics = [Mechanic(id=1, name="Alex", is_active=True, ticket_count=2), Mechanic(id=2, name="Sam")]
+        self.part = Inventory(id=7, name="Brake Pad", price=49.99)
+        self.ticket = ServiceTicket(
+            id=3, description="Brakes", vehicle=None, status="open", created_at=datetime(2024, 5, 2), customer_id=1
+        )
+        self.ticket.customer = self.customer
+        self.ticket.mechanics = self.mechanics
+        self.ticket.parts = [self.part]
+        self.ticket.part_links = [TicketPart(service_ticket_id=3, inventory_id=7, quantity=2)]
+
+    def assertSameDump(self, schema, obj):
+        # Schema.dump is plain marshmallow, schema.dump the compiled path
+        self.assertEqual(schema.dump(obj), Schema.dump(schema, obj))
+
+    def test_matches_marshmallow(self):
+        self.assertSameDump(customers_schema, [self.customer])
+        self.assertSameDump(mechanics_schema, self.mechanics)
+        self.assertSameDump(inventory_schema, self.part)
+        self.assertSameDump(service_tickets_schema, [self.ticket])
+        self.assertSameDump(service_tickets_projection(("id", "status", "parts")), [self.ticket])
+
+    def _registered_schemas(self):
+        # Every compiled schema class in the app, plus the sparse-fieldset ones
+        classes, pending = [], [CompiledSchema]
+        while pending:
+            cls = pending.pop()
+            pending.extend(cls.__subclasses__())
+            if cls.__module__.startswith("app.blueprints.") and hasattr(cls.Meta, "model"):
+                classes.append(cls)
+        self.assertGreaterEqual(len(classes), 5)
+
+        schemas = [cls() for cls in classes]
+        schemas += [service_tickets_projection((name,)) for name in TICKET_COLUMNS + TICKET_RELATIONSHIPS]
+        return schemas
+
+    def test_every_schema_matches_marshmallow(self):
+        populated = {
+            Customer: self.customer,
+            Mechanic: self.mechanics[0],
+            Inventory: self.part,
+            ServiceTicket: self.ticket,
+            TicketPart: self.ticket.part_links[0],
+        }
+        for schema in self._registered_schemas():
+            model = schema.opts.model
+            with self.subTest(schema=type(schema).__name__, only=schema.only):
+                objs = [
+                    populated[model],
+                    model(),  # nothing set: columns None, relationships empty / None
+                    SimpleNamespace(id=5),  # not a model, attributes missing: keys left out
+                ]
+                for obj in objs:
+                    self.assertEqual(
+                        schema.dump(obj, many=False), Schema.dump(schema, obj, many=False)
+                    )
+                self.assertEqual(schema.dump(objs, many=True), Schema.dump(schema, objs, many=True))
+
+    def test_related_ids(self):
+        data = service_ticket_schema.dump(self.ticket)
+        self.assertEqual(data["customer"], 1)
+        self.assertEqual(data["mechanics"], [1, 2])
+        self.assertEqual(data["parts"], [7])
+        self.assertEqual(data["part_quantities"], [{"id": 7, "quantity": 2}])
+
+        unassigned = ServiceTicket(id=4, description="New")
+        self.assertSameDump(service_ticket_schema, unassigned)
+        self.assertIsNone(service_ticket_schema.dump(unassigned)["customer"])
+
+    def test_dicts_use_marshmallow(self):
+        row = {"id": 1, "name": "Alex", "specialization": None, "is_active": True, "ticket_count": 0}
+        self.assertEqual(mechanics_schema.dump([row]), Schema.dump(mechanics_schema, [row]))
+
+    def test_dump_hooks_are_not_compiled(self):
+        class HookedSchema(TimedSchema):
+            class Meta:
+                model = Mechanic
+
+            @post_dump
+            def shout(self, data, **kwargs):
+                data["name"] = data["name"].upper()
+                return data
+
+        self.assertIsNone(compile_serializer(HookedSchema()))
+        self.assertEqual(HookedSchema().dump(self.mechanics[0])["name"], "ALEX")
+
+
+class TestFastJSONProvider(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        self.fast = FastJSONProvider(self.app)
+        self.stdlib = DefaultJSONProvider(self.app)
+
+    def test_same_values_as_stdlib(self):
+        data = {
+            "b": [1, 2.5, None, True, "héllo"],
+            "a": {"when": datetime(2024, 5, 1, 8, 30), "price": Decimal("9.99")},
+            "id": uuid.UUID(int=1),
+            "errors": {0: "name is required"},
+        }
+        self.assertEqual(json.loads(self.fast.dumps(data)), json.loads(self.stdlib.dumps(data)))
+
+    def test_sorted_and_indented_like_flask(self):
+        data = {"b": [1, {"d": None, "c": "x"}], "a": []}
+        # The arguments Flask's response() passes (compact / debug)
+        compact = {"separators": (",", ":")}
+        self.assertEqual(self.fast.dumps(data, **compact), self.stdlib.dumps(data, **compact))
+        self.assertEqual(self.fast.dumps(data, indent=2), self.stdlib.dumps(data, indent=2))
+
+    def test_app_uses_it(self):
+        self.assertIsInstance(self.app.json, FastJSONProvider)
+        with self.app.test_request_context():
+            self.assertEqual(self.app.json.loads(b'{"a": [1]}'), {"a": [1]})
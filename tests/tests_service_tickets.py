@@ -1,17 +1,19 @@
+import json
 import unittest
-from app import create_app
+
+from sqlalchemy import select
+
 from app.extensions import db
-from app.models import Customer, ServiceTicket, Mechanic, Inventory
+from app.models import Customer, ServiceTicket, Mechanic, Inventory, ticket_inventory
+from tests.base import DatabaseTestCase
+from tests.query_counter import QueryCounter, assert_max_queries
 
 
-class TestServiceTickets(unittest.TestCase):
+class TestServiceTickets(DatabaseTestCase):
     def setUp(self):
-        self.app = create_app("TestingConfig")
+        super().setUp()
 
         with self.app.app_context():
-            db.drop_all()
-            db.create_all()
-
             # Create a default customer in the test DB
             customer = Customer(
                 name="Ticket Owner",
@@ -24,16 +26,7 @@ class TestServiceTickets(unittest.TestCase):
             # Store the integer ID so we don't depend on a live session
             self.customer_id = customer.id
 
-        self.client = self.app.test_client()
-
-        # Login to get token using the login endpoint
-        login_resp = self.client.post(
-            "/customers/login",
-            json={"email": "owner@example.com", "password": "pw"},
-        )
-        self.assertEqual(login_resp.status_code, 200)
-        self.token = login_resp.json["token"]
-        self.auth_header = {"Authorization": f"Bearer {self.token}"}
+        self.auth_header = self.auth_header_for(self.customer_id)
 
     def test_create_ticket(self):
         payload = {
@@ -49,6 +42,40 @@ class TestServiceTickets(unittest.TestCase):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.json["description"], "Brake job")
 
+    def test_create_tickets_bulk(self):
+        payload = [
+            {"description": "Oil change", "vehicle": "Van 1"},
+            {"description": "Tires", "vehicle": "Van 2", "status": "in_progress"},
+        ]
+        response = self.client.post(
+            "/service-tickets/bulk",
+            json=payload,
+            headers=self.auth_header,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json["created"], 2)
+
+        with self.app.app_context():
+            tickets = ServiceTicket.query.order_by(ServiceTicket.id).all()
+            self.assertEqual([t.customer_id for t in tickets], [self.customer_id] * 2)
+            self.assertEqual(tickets[1].status, "in_progress")
+
+    def test_create_tickets_bulk_validation_errors(self):
+        payload = [
+            {"description": "Ok"},
+            {"description": {"text": "dict"}},
+            {"description": ["list"]},
+            {"vehicle": "No description"},
+            {"description": ""},
+        ]
+        response = self.client.post("/service-tickets/bulk", json=payload, headers=self.auth_header)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sorted(response.json["errors"]), ["1", "2", "3", "4"])
+        self.assertIn("description", response.json["errors"]["1"])
+
+        with self.app.app_context():
+            self.assertEqual(ServiceTicket.query.count(), 0)
+
     def test_get_tickets(self):
         # Seed a ticket
         with self.app.app_context():
@@ -66,6 +93,213 @@ class TestServiceTickets(unittest.TestCase):
         self.assertIsInstance(response.json, list)
         self.assertGreaterEqual(len(response.json), 1)
 
+    def test_get_tickets_conditional_request(self):
+        first = self.client.get("/service-tickets/")
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers["ETag"]
+
+        # Unchanged: 304 with no SQL at all
+        with assert_max_queries(self, self.app, 0):
+            second = self.client.get("/service-tickets/", headers={"If-None-Match": etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.get_data(), b"")
+
+        self.client.post(
+            "/service-tickets/",
+            json={"description": "New job"},
+            headers=self.auth_header,
+        )
+        third = self.client.get("/service-tickets/", headers={"If-None-Match": etag})
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third.headers["ETag"], etag)
+        self.assertEqual(len(third.json), 1)
+
+    def test_get_tickets_query_count_is_constant(self):
+        # 10 tickets, each with a mechanic and a part
+        with self.app.app_context():
+            mech = Mechanic(name="Mech", specialization="Engine")
+            part = Inventory(name="Filter", price=5.0)
+            for i in range(10):
+                t = ServiceTicket(
+                    description=f"Job {i}",
+                    vehicle="Car",
+                    status="open",
+                    customer_id=self.customer_id,
+                )
+                t.mechanics.append(mech)
+                t.parts.append(part)
+                db.session.add(t)
+            db.session.commit()
+
+        # 1 for tickets + 1 per relationship (selectinload), not 3 per ticket
+        with assert_max_queries(self, self.app, 3):
+            response = self.client.get("/service-tickets/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json), 10)
+        self.assertEqual(len(response.json[0]["mechanics"]), 1)
+        self.assertEqual(len(response.json[0]["parts"]), 1)
+
+    def test_get_tickets_ndjson_stream(self):
+        with self.app.app_context():
+            for i in range(3):
+                db.session.add(
+                    ServiceTicket(
+                        description=f"Job {i}",
+                        vehicle="Car",
+                        status="open",
+                        customer_id=self.customer_id,
+                    )
+                )
+            db.session.commit()
+
+        response = self.client.get(
+            "/service-tickets/",
+            headers={"Accept": "application/x-ndjson"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])["description"], "Job 0")
+
+    def test_stream_tickets_with_mechanics_and_parts(self):
+        with self.app.app_context():
+            mechanic = Mechanic(name="Streamer", specialization="Brakes")
+            part = Inventory(name="Pad", price=10.0)
+            for i in range(5):
+                ticket = ServiceTicket(
+                    description=f"Job {i}", vehicle="Car", customer_id=self.customer_id
+                )
+                ticket.mechanics.append(mechanic)
+                ticket.parts.append(part)
+                db.session.add(ticket)
+            db.session.commit()
+
+        # main yield_per query + one batch load (joined customer, 2 IN queries)
+        with assert_max_queries(self, self.app, 4):
+            response = self.client.get("/service-tickets/?stream=true")
+            body = json.loads(response.get_data(as_text=True))
+
+        self.assertEqual(len(body), 5)
+        self.assertEqual(len(body[0]["mechanics"]), 1)
+        self.assertEqual(len(body[4]["parts"]), 1)
+
+    def test_stream_tickets_sparse_fields_load_only_those_columns(self):
+        with self.app.app_context():
+            db.session.add_all(
+                ServiceTicket(description=f"Job {i}", vehicle="Car", customer_id=self.customer_id)
+                for i in range(3)
+            )
+            db.session.commit()
+
+        with QueryCounter(self.app) as counter:
+            response = self.client.get("/service-tickets/?stream=true&fields=id,status")
+            body = json.loads(response.get_data(as_text=True))
+
+        self.assertEqual(body[0].keys(), {"id", "status"})
+        self.assertEqual(len(body), 3)
+        selects = [s for s in counter.statements if s.startswith("SELECT")]
+        self.assertTrue(selects)
+        for statement in selects:
+            self.assertNotIn("service_tickets.description", statement)
+
+    def _seed_filterable_tickets(self):
+        with self.app.app_context():
+            mech = Mechanic(name="Filter Mech", specialization="Engine")
+            tickets = [
+                ServiceTicket(description="Brakes", vehicle="Honda", status="open",
+                              customer_id=self.customer_id),
+                ServiceTicket(description="Oil", vehicle="Toyota", status="closed",
+                              customer_id=self.customer_id),
+                ServiceTicket(description="Tires", vehicle="Honda", status="open",
+                              customer_id=self.customer_id),
+            ]
+            tickets[2].mechanics.append(mech)
+            db.session.add_all(tickets)
+            db.session.commit()
+            return [t.id for t in tickets], mech.id
+
+    def test_get_tickets_filters_and_sort(self):
+        ids, mech_id = self._seed_filterable_tickets()
+
+        response = self.client.get("/service-tickets/?status=open&vehicle=Honda&sort=-id")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t["id"] for t in response.json], [ids[2], ids[0]])
+
+        response = self.client.get(f"/service-tickets/?mechanic_id={mech_id}")
+        self.assertEqual([t["id"] for t in response.json], [ids[2]])
+
+        response = self.client.get("/service-tickets/?created_before=2000-01-01")
+        self.assertEqual(response.json, [])
+
+    def test_get_tickets_sparse_fields(self):
+        self._seed_filterable_tickets()
+
+        # Columns only: a single query, no relationship loads
+        with assert_max_queries(self, self.app, 1):
+            response = self.client.get("/service-tickets/?fields=id,status&status=closed")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json), 1)
+        self.assertEqual(set(response.json[0]), {"id", "status"})
+
+        response = self.client.get("/service-tickets/?fields=description,mechanics")
+        self.assertEqual(set(response.json[0]), {"description", "mechanics"})
+
+        response = self.client.get("/service-tickets/?fields=id,part_quantities")
+        self.assertEqual(set(response.json[0]), {"id", "part_quantities"})
+
+    def test_get_tickets_invalid_query_params(self):
+        self.assertEqual(self.client.get("/service-tickets/?fields=password").status_code, 400)
+        self.assertEqual(self.client.get("/service-tickets/?sort=vehicle").status_code, 400)
+        self.assertEqual(self.client.get("/service-tickets/?customer_id=abc").status_code, 400)
+        self.assertEqual(self.client.get("/service-tickets/?sort=id&limit=5").status_code, 400)
+
+    def test_search_tickets_ranked_and_incremental(self):
+        with self.app.app_context():
+            brake_job = ServiceTicket(description="Brake pads squeal", vehicle="Honda Civic",
+                                      status="open", customer_id=self.customer_id)
+            oil_job = ServiceTicket(description="Oil change", vehicle="Toyota",
+                                    status="open", customer_id=self.customer_id)
+            db.session.add_all([brake_job, oil_job])
+            db.session.commit()
+            brake_id, oil_id = brake_job.id, oil_job.id
+
+        response = self.client.get("/service-tickets/search?q=brakes")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t["id"] for t in response.json["items"]], [brake_id])
+        self.assertFalse(response.json["has_more"])
+
+        # Part names are indexed as soon as the part is attached
+        with self.app.app_context():
+            part = Inventory(name="Brake Rotor", price=40.0)
+            oil_ticket = db.session.get(ServiceTicket, oil_id)
+            oil_ticket.parts.append(part)
+            db.session.commit()
+
+        response = self.client.get("/service-tickets/search?q=brake")
+        # Description match outranks a part-name match
+        self.assertEqual([t["id"] for t in response.json["items"]], [brake_id, oil_id])
+
+        response = self.client.get("/service-tickets/search?q=brake&per_page=1&page=2")
+        self.assertEqual([t["id"] for t in response.json["items"]], [oil_id])
+
+        # Updates re-index the row
+        with self.app.app_context():
+            brake_ticket = db.session.get(ServiceTicket, brake_id)
+            brake_ticket.vehicle = "Subaru"
+            db.session.commit()
+        response = self.client.get("/service-tickets/search?q=honda")
+        self.assertEqual(response.json["items"], [])
+
+    def test_search_tickets_requires_query(self):
+        self.assertEqual(self.client.get("/service-tickets/search?q=").status_code, 400)
+        # Punctuation only: nothing to match, not an FTS syntax error
+        response = self.client.get('/service-tickets/search?q="*(')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["items"], [])
+
     def test_edit_ticket_mechanics(self):
         with self.app.app_context():
             # Create mechanic + ticket
@@ -100,6 +334,108 @@ class TestServiceTickets(unittest.TestCase):
         self.assertIn("mechanics", response.json)
         self.assertEqual(len(response.json["mechanics"]), 2)
 
+    def test_edit_ticket_mechanics_add_and_remove_in_bulk(self):
+        with self.app.app_context():
+            mechs = [Mechanic(name=f"Mech{i}", specialization="General") for i in range(5)]
+            ticket = ServiceTicket(
+                description="Fleet job",
+                vehicle="Van",
+                status="open",
+                customer_id=self.customer_id,
+            )
+            ticket.mechanics.extend(mechs[:3])
+            db.session.add_all(mechs + [ticket])
+            db.session.commit()
+            tid = ticket.id
+            ids = [m.id for m in mechs]
+
+        payload = {
+            # ids[1] is already assigned, 9999 doesn't exist
+            "add_ids": [ids[1], ids[3], ids[4], ids[4], 9999],
+            "remove_ids": [ids[0], ids[2]],
+        }
+        with assert_max_queries(self, self.app, 6):
+            response = self.client.put(
+                f"/service-tickets/{tid}/edit",
+                json=payload,
+                headers=self.auth_header,
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.json["mechanics"]), [ids[1], ids[3], ids[4]])
+
+    def test_edit_ticket_mechanics_if_match(self):
+        with self.app.app_context():
+            ticket = ServiceTicket(description="Job", status="open", customer_id=self.customer_id)
+            mechanic = Mechanic(name="Alex")
+            db.session.add_all([ticket, mechanic])
+            db.session.commit()
+            tid, mid = ticket.id, mechanic.id
+
+        url = f"/service-tickets/{tid}/edit"
+        headers = {**self.auth_header, "If-Match": '"1"'}
+        response = self.client.put(url, json={"add_ids": [mid]}, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["ETag"], '"2"')
+
+        # Same stale version again: refused, nothing removed
+        response = self.client.put(url, json={"remove_ids": [mid]}, headers=headers)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response.headers["ETag"], '"2"')
+        with self.app.app_context():
+            self.assertEqual(len(db.session.get(ServiceTicket, tid).mechanics), 1)
+
+        # Without If-Match the edit still bumps the version
+        response = self.client.put(url, json={"remove_ids": [mid]}, headers=self.auth_header)
+        self.assertEqual(response.headers["ETag"], '"3"')
+
+        response = self.client.put("/service-tickets/999/edit", json={}, headers=headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_ticket_etag_then_edit(self):
+        with self.app.app_context():
+            ticket = ServiceTicket(description="Job", status="open", customer_id=self.customer_id)
+            mechanic = Mechanic(name="Sam")
+            db.session.add_all([ticket, mechanic])
+            db.session.commit()
+            tid, mid = ticket.id, mechanic.id
+
+        response = self.client.get(f"/service-tickets/{tid}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["description"], "Job")
+        etag = response.headers["ETag"]
+        self.assertEqual(
+            self.client.get(f"/service-tickets/{tid}", headers={"If-None-Match": etag}).status_code, 304
+        )
+
+        response = self.client.put(
+            f"/service-tickets/{tid}/edit",
+            json={"add_ids": [mid]},
+            headers={**self.auth_header, "If-Match": etag},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(f"/service-tickets/{tid}").headers["ETag"], response.headers["ETag"])
+
+        self.assertEqual(self.client.get("/service-tickets/999").status_code, 404)
+
+    def test_edit_ticket_mechanics_rejects_bad_ids(self):
+        with self.app.app_context():
+            ticket = ServiceTicket(
+                description="Job",
+                vehicle="Car",
+                status="open",
+                customer_id=self.customer_id,
+            )
+            db.session.add(ticket)
+            db.session.commit()
+            tid = ticket.id
+
+        response = self.client.put(
+            f"/service-tickets/{tid}/edit",
+            json={"add_ids": "1,2"},
+            headers=self.auth_header,
+        )
+        self.assertEqual(response.status_code, 400)
+
     def test_add_part_to_ticket(self):
         with self.app.app_context():
             ticket = ServiceTicket(
@@ -122,6 +458,93 @@ class TestServiceTickets(unittest.TestCase):
         self.assertIn("parts", response.json)
         self.assertEqual(len(response.json["parts"]), 1)
 
+    def test_add_part_changes_ticket_etag(self):
+        tid, part_id = self._ticket_and_part(stock=None)
+        etag = self.client.get(f"/service-tickets/{tid}").headers["ETag"]
+
+        response = self.client.put(f"/service-tickets/{tid}/add-part/{part_id}", headers=self.auth_header)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+        # The client's copy predates the part: no 304, and no edit on top of it
+        response = self.client.get(f"/service-tickets/{tid}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json["parts"]), 1)
+        response = self.client.put(
+            f"/service-tickets/{tid}/edit", json={}, headers={**self.auth_header, "If-Match": etag}
+        )
+        self.assertEqual(response.status_code, 412)
+
+    def _ticket_and_part(self, stock):
+        with self.app.app_context():
+            ticket = ServiceTicket(description="Job", status="open", customer_id=self.customer_id)
+            part = Inventory(name="Oil Filter", price=12.5, stock=stock)
+            db.session.add_all([ticket, part])
+            db.session.commit()
+            return ticket.id, part.id
+
+    def _link_quantity(self, tid, part_id):
+        with self.app.app_context():
+            return db.session.execute(
+                select(ticket_inventory.c.quantity).where(
+                    ticket_inventory.c.service_ticket_id == tid,
+                    ticket_inventory.c.inventory_id == part_id,
+                )
+            ).scalar_one()
+
+    def test_add_part_quantity_takes_stock(self):
+        tid, part_id = self._ticket_and_part(stock=5)
+        url = f"/service-tickets/{tid}/add-part/{part_id}"
+
+        response = self.client.put(url, json={"quantity": 2}, headers=self.auth_header)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["parts"], [part_id])
+        self.assertEqual(response.json["part_quantities"], [{"id": part_id, "quantity": 2}])
+        # Adding the same part again adds to the quantity, still one link row
+        response = self.client.put(url, json={"quantity": 3}, headers=self.auth_header)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["parts"], [part_id])
+        self.assertEqual(response.json["part_quantities"], [{"id": part_id, "quantity": 5}])
+        self.assertEqual(self._link_quantity(tid, part_id), 5)
+
+        response = self.client.put(url, headers=self.auth_header)
+        self.assertEqual(response.status_code, 409)
+
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Inventory, part_id).stock, 0)
+
+        response = self.client.get(f"/service-tickets/{tid}/cost")
+        self.assertEqual(response.json, {"ticket_id": tid, "parts": 5, "parts_total": 62.5})
+
+    def test_add_part_not_enough_stock_changes_nothing(self):
+        tid, part_id = self._ticket_and_part(stock=1)
+
+        response = self.client.put(
+            f"/service-tickets/{tid}/add-part/{part_id}", json={"quantity": 2}, headers=self.auth_header
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json["error"], "Not enough stock")
+
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Inventory, part_id).stock, 1)
+            self.assertEqual(db.session.get(ServiceTicket, tid).parts, [])
+
+    def test_add_untracked_part_and_bad_quantity(self):
+        tid, part_id = self._ticket_and_part(stock=None)
+        url = f"/service-tickets/{tid}/add-part/{part_id}"
+
+        response = self.client.put(url, json={"quantity": 100}, headers=self.auth_header)
+        self.assertEqual(response.status_code, 200)
+        with self.app.app_context():
+            self.assertIsNone(db.session.get(Inventory, part_id).stock)
+
+        for quantity in (0, -1, "2", True):
+            response = self.client.put(url, json={"quantity": quantity}, headers=self.auth_header)
+            self.assertEqual(response.status_code, 400)
+
+        response = self.client.put(f"/service-tickets/{tid}/add-part/999", headers=self.auth_header)
+        self.assertEqual(response.status_code, 404)
+
 
 if __name__ == "__main__":
     unittest.main()